@@ -0,0 +1,72 @@
+"""
+Merging many workbooks: one after another (load_from_xlsx + merge_from per file,
+as the GUI did) against bulk_merge.merge_workbooks with a process pool. By
+default 12 files of 5k guests each, with 1, 2 and 4 workers.
+
+    python benchmarks/bench_bulk_merge.py [files] [guests per file]
+
+Also checks that every run ends with the same plan.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench_json_io import build_plan
+from wedding_planner.bulk_merge import merge_workbooks
+from wedding_planner.dedup import GuestDeduplicator
+from wedding_planner.excel_io import ExcelIO
+from wedding_planner.models import SeatingPlan
+
+
+def sequential_merge(filenames):
+    plan = SeatingPlan()
+    dedup = GuestDeduplicator(plan)
+    for filename in filenames:
+        loaded = SeatingPlan()
+        ExcelIO.load_from_xlsx(filename, loaded)
+        plan.merge_from(loaded, dedup=dedup)
+        plan.validate(repair=True)
+    return plan
+
+
+def bulk_merge(filenames, workers):
+    plan = SeatingPlan()
+    merge_workbooks(filenames, plan, workers=workers, dedup=GuestDeduplicator(plan))
+    return plan
+
+
+def main():
+    file_count = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    guest_count = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000
+    tmp = tempfile.mkdtemp()
+    filenames = []
+    for n in range(file_count):
+        plan = build_plan(guest_count)
+        # Different names per file so the files do not all collapse into the first
+        for guest in plan.guests.values():
+            guest.name = f"{guest.name} {n}"
+        filename = os.path.join(tmp, f"family{n}.xlsx")
+        ExcelIO.save_to_xlsx(plan, filename)
+        filenames.append(filename)
+    print(f"{file_count} files x {guest_count} guests, {os.cpu_count()} CPUs")
+
+    start = time.perf_counter()
+    expected = sequential_merge(filenames).fingerprint()
+    print(f"  {'sequential':<12} {(time.perf_counter() - start) * 1000:8.0f} ms")
+    for workers in (1, 2, 4):
+        start = time.perf_counter()
+        plan = bulk_merge(filenames, workers)
+        elapsed = time.perf_counter() - start
+        same = "same plan" if plan.fingerprint() == expected else "DIFFERENT PLAN"
+        print(f"  {f'{workers} worker(s)':<12} {elapsed * 1000:8.0f} ms  {same}")
+
+    shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
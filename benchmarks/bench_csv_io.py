@@ -0,0 +1,82 @@
+"""
+Group import and plan export through CSV against the openpyxl (xlsx) path,
+at 10k and 100k rows by default.
+
+    python benchmarks/bench_csv_io.py [rows ...]
+
+Best of three for each step.
+"""
+import csv
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from openpyxl import Workbook
+
+from bench_json_io import build_plan
+from wedding_planner.csv_io import CsvIO
+from wedding_planner.excel_io import ExcelIO
+from wedding_planner.models import SeatingPlan
+
+
+def best_of(runs, fn):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def write_groups(row_count, csv_file, xlsx_file):
+    rows = [[f"Family {i} כהן", i % 6 + 1, f"Side {i % 3}"] for i in range(row_count)]
+    with open(csv_file, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Group", "Count", "Side"])
+        writer.writerows(rows)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(["Group", "Count", "Side"])
+    for row in rows:
+        ws.append(row)
+    wb.save(xlsx_file)
+
+
+def import_groups(io, filename):
+    plan = SeatingPlan()
+    io.import_groups_to_plan(filename, "Group", "Count", plan, "Side")
+    return plan
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    tmp = tempfile.mkdtemp()
+    csv_file, xlsx_file = os.path.join(tmp, "groups.csv"), os.path.join(tmp, "groups.xlsx")
+    out_csv, out_xlsx = os.path.join(tmp, "plan.csv"), os.path.join(tmp, "plan.xlsx")
+    for row_count in sizes:
+        runs = 3 if row_count <= 10_000 else 1
+        write_groups(row_count, csv_file, xlsx_file)
+        plan = build_plan(row_count)
+        results = {
+            "import csv": best_of(runs, lambda: import_groups(CsvIO, csv_file)),
+            "import xlsx": best_of(runs, lambda: import_groups(ExcelIO, xlsx_file)),
+            "export csv": best_of(runs, lambda: CsvIO.save_to_csv(plan, out_csv)),
+            "export xlsx": best_of(runs, lambda: ExcelIO.save_to_xlsx(plan, out_xlsx)),
+        }
+        print(f"{row_count} rows")
+        for label, elapsed in results.items():
+            print(f"  {label:<12} {elapsed * 1000:8.0f} ms")
+        print(f"  import speed-up x{results['import xlsx'] / results['import csv']:.1f}, "
+              f"export speed-up x{results['export xlsx'] / results['export csv']:.1f}")
+
+    for name in os.listdir(tmp):
+        os.remove(os.path.join(tmp, name))
+    os.rmdir(tmp)
+
+
+if __name__ == "__main__":
+    main()
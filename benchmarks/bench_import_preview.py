@@ -0,0 +1,51 @@
+"""
+Opening the group import dialog on a large guest list: the old header read
+(ExcelIO.get_headers through openpyxl) against preview.read_sample plus a
+preview of the first 50 rows. Workbooks are tried without a <dimension>
+(write-only saves) and with one (as Excel and openpyxl's normal save write
+them); 100k rows by default.
+
+    python benchmarks/bench_import_preview.py [rows ...]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import openpyxl
+
+from bench_csv_io import write_groups
+from wedding_planner.excel_io import ExcelIO
+from wedding_planner.preview import read_sample
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000]
+    tmp = tempfile.mkdtemp()
+    csv_file, unsized = os.path.join(tmp, "groups.csv"), os.path.join(tmp, "unsized.xlsx")
+    sized = os.path.join(tmp, "sized.xlsx")
+    for row_count in sizes:
+        write_groups(row_count, csv_file, unsized)
+        # A normal save adds <dimension> and a shared strings table
+        openpyxl.load_workbook(unsized).save(sized)
+        print(f"{row_count} rows")
+        for label, filename in (("xlsx, no dimension", unsized), ("xlsx", sized), ("csv", csv_file)):
+            headers_ms, _ = timed(lambda: ExcelIO.get_headers(filename)) if filename != csv_file else (0, None)
+            preview_ms, preview = timed(lambda: read_sample(filename).preview("Group", "Count", "Side"))
+            old = f"get_headers {headers_ms:6.0f} ms  " if filename != csv_file else " " * 24
+            print(f"  {label:<19} {old}preview {preview_ms:5.0f} ms  {preview.summary().splitlines()[0]}")
+    shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
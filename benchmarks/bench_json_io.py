@@ -0,0 +1,131 @@
+"""
+Save/load time and peak memory of the streaming JSON format against the old
+json.dump(indent=4) / json.load code, on a generated 100k-guest plan.
+
+    python benchmarks/bench_json_io.py [guests]
+
+Each load runs in a fresh interpreter so its peak RSS is not polluted by the
+others.
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wedding_planner.models import SeatingPlan, Guest, Table
+
+
+def build_plan(guest_count):
+    plan = SeatingPlan()
+    table_count = max(1, guest_count // 50)
+    with plan.batch(validate=False):
+        for t_id in range(1, table_count + 1):
+            plan.insert_table(Table(id=t_id, name=f"Table {t_id}", capacity=200, x=t_id * 10, y=t_id * 5))
+        for g_id in range(1, guest_count + 1):
+            table_id = g_id % table_count + 1 if g_id % 3 else None
+            plan.insert_guest(Guest(id=g_id, name=f"Guest {g_id} כהן", category=f"Group {g_id % 40}",
+                                    size=g_id % 4 + 1, table_id=table_id))
+    return plan
+
+
+def legacy_save(plan, filename):
+    data = {
+        "guests": [g.to_dict() for g in plan.guests.values()],
+        "tables": [t.to_dict() for t in plan.tables.values()],
+        "next_guest_id": plan.next_guest_id,
+        "next_table_id": plan.next_table_id
+    }
+    with open(filename, 'w') as f:
+        json.dump(data, f, indent=4)
+
+
+def legacy_load(plan, filename):
+    with open(filename, 'r') as f:
+        data = json.load(f)
+    with plan.batch(validate=False):
+        plan.clear()
+        for g_data in data.get("guests", []):
+            plan.insert_guest(Guest.from_dict(g_data))
+        for t_data in data.get("tables", []):
+            plan.insert_table(Table.from_dict(t_data))
+        plan.next_guest_id = data.get("next_guest_id", 1)
+        plan.next_table_id = data.get("next_table_id", 1)
+        plan.validate(repair=True)  # as load_from_file does
+
+
+def measure_save(label, save, plan, filename):
+    start = time.perf_counter()
+    save(plan, filename)
+    elapsed = time.perf_counter() - start
+    # Second run under tracemalloc for the allocation peak (it distorts timings)
+    tracemalloc.start()
+    save(plan, filename)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    size = os.path.getsize(filename)
+    print(f"save {label:<12} {elapsed * 1000:8.0f} ms   peak alloc {peak / 2**20:7.1f} MiB   file {size / 2**20:6.1f} MiB")
+
+
+def peak_rss_kib():
+    # VmHWM is the resident high-water mark; ru_maxrss is the portable fallback
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def child_load(variant, filename):
+    plan = SeatingPlan()
+    base = peak_rss_kib()
+    start = time.perf_counter()
+    if variant == "legacy":
+        legacy_load(plan, filename)
+    else:
+        plan.load_from_file(filename)
+    elapsed = time.perf_counter() - start
+    peak = peak_rss_kib()
+    print(json.dumps({"ms": elapsed * 1000, "rss_kib": peak - base, "guests": len(plan.guests)}))
+
+
+def main():
+    guest_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    plan = build_plan(guest_count)
+    tmp = tempfile.mkdtemp()
+    files = {
+        "legacy": os.path.join(tmp, "legacy.json"),
+        "streaming": os.path.join(tmp, "plan.json"),
+        "gzip": os.path.join(tmp, "plan.json.gz"),
+    }
+    print(f"{guest_count} guests, {len(plan.tables)} tables")
+    measure_save("legacy", legacy_save, plan, files["legacy"])
+    measure_save("streaming", lambda p, f: p.save_to_file(f), plan, files["streaming"])
+    measure_save("gzip", lambda p, f: p.save_to_file(f), plan, files["gzip"])
+
+    for label, variant, filename in [("legacy", "legacy", files["legacy"]),
+                                     ("streaming", "streaming", files["streaming"]),
+                                     ("gzip", "streaming", files["gzip"])]:
+        out = subprocess.run([sys.executable, __file__, "--load", variant, filename],
+                             capture_output=True, text=True, check=True).stdout
+        result = json.loads(out)
+        print(f"load {label:<12} {result['ms']:8.0f} ms   peak RSS +{result['rss_kib'] / 1024:6.1f} MiB")
+
+    for filename in files.values():
+        os.remove(filename)
+    os.rmdir(tmp)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--load":
+        child_load(sys.argv[2], sys.argv[3])
+    else:
+        main()
@@ -0,0 +1,62 @@
+"""
+Open/save time of the packed .seatplan format against compact JSON, on a
+generated plan (100k guests, 2k tables by default).
+
+    python benchmarks/bench_seatplan.py [guests]
+
+Each open runs in a fresh interpreter, best of five.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench_json_io import build_plan
+from wedding_planner.models import SeatingPlan
+
+
+def child_open(filename):
+    times = []
+    for _ in range(5):
+        plan = SeatingPlan()
+        start = time.perf_counter()
+        plan.load_from_file(filename)
+        times.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    first = plan.search_guests("guest 777")  # first name search decodes the names
+    search = time.perf_counter() - start
+    print(json.dumps({"ms": min(times) * 1000, "search_ms": search * 1000, "matches": len(first)}))
+
+
+def main():
+    guest_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    plan = build_plan(guest_count)
+    tmp = tempfile.mkdtemp()
+    files = {"json": os.path.join(tmp, "plan.json"), "seatplan": os.path.join(tmp, "plan.seatplan")}
+    print(f"{guest_count} guests, {len(plan.tables)} tables")
+    for label, filename in files.items():
+        start = time.perf_counter()
+        plan.save_to_file(filename)
+        elapsed = time.perf_counter() - start
+        print(f"save {label:<10} {elapsed * 1000:8.0f} ms   file {os.path.getsize(filename) / 2**20:6.1f} MiB")
+    for label, filename in files.items():
+        out = subprocess.run([sys.executable, __file__, "--open", filename],
+                             capture_output=True, text=True, check=True).stdout
+        result = json.loads(out)
+        print(f"open {label:<10} {result['ms']:8.1f} ms   then first name search {result['search_ms']:6.1f} ms")
+
+    for filename in files.values():
+        os.remove(filename)
+    os.rmdir(tmp)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--open":
+        child_open(sys.argv[2])
+    else:
+        main()
@@ -0,0 +1,56 @@
+"""
+The group import dialog on a large workbook: header detection, an import, and
+a second import after changing the column mapping, with and without a warm
+ExcelIO.cache (in memory, then from the disk cache in a new cache object).
+100k rows by default.
+
+    python benchmarks/bench_workbook_cache.py [rows ...]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench_csv_io import write_groups
+from wedding_planner.excel_io import ExcelIO
+from wedding_planner.models import SeatingPlan
+from wedding_planner.workbook_cache import WorkbookCache
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def dialog_session(filename):
+    # Headers, an import, then the same file again with another category column
+    return [timed(lambda: ExcelIO.get_headers(filename)),
+            timed(lambda: ExcelIO.import_groups_to_plan(filename, "Group", "Count", SeatingPlan(), "Side")),
+            timed(lambda: ExcelIO.import_groups_to_plan(filename, "Group", "Count", SeatingPlan()))]
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000]
+    tmp = tempfile.mkdtemp()
+    xlsx_file = os.path.join(tmp, "groups.xlsx")
+    for row_count in sizes:
+        write_groups(row_count, os.path.join(tmp, "groups.csv"), xlsx_file)
+        print(f"{row_count} rows")
+        # max_cells=0 keeps nothing: every call parses the workbook, as before the cache
+        for label, cache in (("no cache", WorkbookCache(max_cells=0)),
+                             ("cold cache", WorkbookCache(directory=os.path.join(tmp, "cache"))),
+                             ("disk cache", WorkbookCache(directory=os.path.join(tmp, "cache")))):
+            ExcelIO.cache = cache
+            headers, first, second = dialog_session(xlsx_file)
+            print(f"  {label:<11} headers {headers:7.0f} ms  import {first:7.0f} ms  re-import {second:7.0f} ms")
+        shutil.rmtree(os.path.join(tmp, "cache"))
+    shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Load time and peak memory of ExcelIO.load_from_xlsx (read-only, streamed rows)
+against the previous full-mode openpyxl load, on generated plans of 10k, 50k
+and 200k guests by default.
+
+    python benchmarks/bench_xlsx_load.py [guests ...]
+
+Each load runs in a fresh interpreter so its peak RSS is not polluted by the
+others.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import openpyxl
+
+from bench_json_io import build_plan, peak_rss_kib
+from wedding_planner.excel_io import ExcelIO
+from wedding_planner.models import SeatingPlan
+
+
+def full_mode_load(filename, plan):
+    # What load_from_xlsx did before: every cell of every sheet built up front
+    wb = openpyxl.load_workbook(filename, data_only=False)
+    with plan.batch(validate=False):
+        ExcelIO._load_workbook(wb, plan, True)
+        plan.validate(repair=True)
+
+
+def child_load(variant, filename):
+    plan = SeatingPlan()
+    base = peak_rss_kib()
+    start = time.perf_counter()
+    if variant == "full":
+        full_mode_load(filename, plan)
+    else:
+        ExcelIO.load_from_xlsx(filename, plan)
+    elapsed = time.perf_counter() - start
+    peak = peak_rss_kib()
+    print(json.dumps({"ms": elapsed * 1000, "rss_kib": peak - base, "guests": len(plan.guests)}))
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 50_000, 200_000]
+    tmp = tempfile.mkdtemp()
+    filename = os.path.join(tmp, "plan.xlsx")
+    for guest_count in sizes:
+        plan = build_plan(guest_count)
+        ExcelIO.save_to_xlsx(plan, filename)
+        print(f"{guest_count} guests, {len(plan.tables)} tables, file {os.path.getsize(filename) / 2**20:.1f} MiB")
+        for variant in ("full", "streaming"):
+            out = subprocess.run([sys.executable, __file__, "--load", variant, filename],
+                                 capture_output=True, text=True, check=True).stdout
+            result = json.loads(out)
+            assert result["guests"] == guest_count
+            print(f"  load {variant:<10} {result['ms']:8.0f} ms   peak RSS +{result['rss_kib'] / 1024:7.1f} MiB")
+    os.remove(filename)
+    os.rmdir(tmp)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--load":
+        child_load(sys.argv[2], sys.argv[3])
+    else:
+        main()
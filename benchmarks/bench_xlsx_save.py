@@ -0,0 +1,91 @@
+"""
+Save time and peak memory of ExcelIO.save_to_xlsx (write-only workbook) against
+the previous in-memory Workbook, on generated plans of 10k, 50k and 200k guests
+by default.
+
+    python benchmarks/bench_xlsx_save.py [guests ...]
+
+Each save runs in a fresh interpreter; the peak RSS is reset (Linux) after the
+plan is built, so only the save counts.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from openpyxl import Workbook
+
+from bench_json_io import build_plan, peak_rss_kib
+from wedding_planner.excel_io import ExcelIO
+
+
+def in_memory_save(plan, filename):
+    # What save_to_xlsx did before: every row held in the workbook until wb.save
+    wb = Workbook()
+    ws_guests = wb.active
+    ws_guests.title = "Guests"
+    ws_guests.append(["ID", "Name", "Category", "Capacity", "Table ID"])
+    ws_tables = wb.create_sheet("Tables")
+    ws_tables.append(["ID", "Name", "Capacity", "X", "Y"])
+    rows = {}
+    for idx, table in enumerate(plan.tables.values(), start=2):
+        ws_tables.append([table.id, table.name, table.capacity, table.x, table.y])
+        rows[table.id] = idx
+    for guest in plan.guests.values():
+        seat = f"=Tables!A{rows[guest.table_id]}" if guest.table_id in rows else guest.table_id or ""
+        ws_guests.append([guest.id, guest.name, guest.category, guest.size, seat])
+    ws_meta = wb.create_sheet("Metadata")
+    ws_meta.append(["Next Guest ID", "Next Table ID"])
+    ws_meta.append([plan.next_guest_id, plan.next_table_id])
+    wb.save(filename)
+
+
+def reset_peak_rss():
+    # Linux: "5" resets VmHWM to the current RSS, so building the plan does not count
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def child_save(variant, guest_count, filename):
+    plan = build_plan(guest_count)
+    reset_peak_rss()
+    base = peak_rss_kib()
+    start = time.perf_counter()
+    if variant == "in-memory":
+        in_memory_save(plan, filename)
+    else:
+        ExcelIO.save_to_xlsx(plan, filename)
+    elapsed = time.perf_counter() - start
+    peak = peak_rss_kib()
+    print(json.dumps({"ms": elapsed * 1000, "rss_kib": peak - base, "bytes": os.path.getsize(filename)}))
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 50_000, 200_000]
+    tmp = tempfile.mkdtemp()
+    filename = os.path.join(tmp, "plan.xlsx")
+    for guest_count in sizes:
+        print(f"{guest_count} guests")
+        for variant in ("in-memory", "write-only"):
+            out = subprocess.run([sys.executable, __file__, "--save", variant, str(guest_count), filename],
+                                 capture_output=True, text=True, check=True).stdout
+            result = json.loads(out)
+            print(f"  save {variant:<11} {result['ms']:8.0f} ms   peak RSS +{result['rss_kib'] / 1024:7.1f} MiB"
+                  f"   file {result['bytes'] / 2**20:5.1f} MiB")
+    os.remove(filename)
+    os.rmdir(tmp)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 5 and sys.argv[1] == "--save":
+        child_save(sys.argv[2], int(sys.argv[3]), sys.argv[4])
+    else:
+        main()
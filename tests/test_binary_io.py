@@ -0,0 +1,153 @@
+import os
+import tempfile
+import time
+import unittest
+from wedding_planner.models import SeatingPlan, Guest, Table
+from wedding_planner.storage import PackedGuestStore
+
+class TestPackedFormat(unittest.TestCase):
+    def setUp(self):
+        self.plan = SeatingPlan()
+        self.t1 = self.plan.add_table("שולחן 1", 10, x=120, y=80)
+        self.t2 = self.plan.add_table("T2", 4)
+        for i, name in enumerate(["דוד כהן", "Émile", "Nul\0Byte", "Plain", "Zoë"]):
+            g = self.plan.add_guest(name, "Family" if i % 2 else "חברים", size=i % 3 + 1)
+            if i < 3:
+                self.plan.assign_guest_to_table(g.id, self.t1.id if i else self.t2.id)
+
+    def temp_file(self, suffix=".seatplan"):
+        fd, filename = tempfile.mkstemp(suffix=suffix)
+        os.close(fd)
+        self.addCleanup(os.remove, filename)
+        return filename
+
+    def reload(self, plan):
+        filename = self.temp_file()
+        plan.save_to_file(filename)
+        loaded = SeatingPlan()
+        report = loaded.load_from_file(filename)
+        return loaded, report
+
+    def assert_same_plan(self, loaded, plan):
+        self.assertEqual(loaded.fingerprint(), plan.fingerprint())
+        self.assertEqual([(t.id, list(t.guest_ids)) for t in loaded.tables.values()],
+                         [(t.id, list(t.guest_ids)) for t in plan.tables.values()])
+        self.assertEqual(list(loaded.guests), list(plan.guests))
+        self.assertEqual((loaded.next_guest_id, loaded.next_table_id), (plan.next_guest_id, plan.next_table_id))
+        self.assertEqual((loaded.total_head_count, loaded.seated_head_count, loaded.total_capacity),
+                         (plan.total_head_count, plan.seated_head_count, plan.total_capacity))
+
+    def test_round_trip(self):
+        loaded, report = self.reload(self.plan)
+        self.assertTrue(report.ok)
+        self.assertIsInstance(loaded.guests, PackedGuestStore)
+        self.assertEqual(loaded.guests.built_count, 0)
+        self.assert_same_plan(loaded, self.plan)
+        self.assertEqual(loaded.guests[3].name, "Nul\0Byte")
+        self.assertEqual(loaded.unseated_ids, self.plan.unseated_ids)
+        self.assertEqual(loaded.search_guests("cohen"), set())
+        self.assertEqual(loaded.search_guests("כהן"), {1})
+        self.assertEqual(loaded.guests_in_category("Family"), {2, 4})
+
+    def test_edits_after_load(self):
+        loaded, _ = self.reload(self.plan)
+        for plan in (self.plan, loaded):
+            plan.update_guest(2, name="Emile", size=3)
+            plan.remove_guest(4)
+            plan.remove_table(self.t2.id)
+            added = plan.add_guest("New", "Work")
+            plan.assign_guest_to_table(added.id, self.t1.id)
+            plan.insert_guest(Guest(id=40, name="Late", category="Work"))
+        self.assertNotIn(4, loaded.guests)
+        self.assertEqual(len(loaded.guests), len(self.plan.guests))
+        self.assert_same_plan(loaded, self.plan)
+
+        again, report = self.reload(loaded)
+        self.assertTrue(report.ok)
+        self.assert_same_plan(again, self.plan)
+
+    def test_out_of_order_ids(self):
+        plan = SeatingPlan()
+        with plan.batch():
+            plan.insert_table(Table(id=5, name="T", capacity=10))
+            for g_id in (9, 3, 7):
+                plan.insert_guest(Guest(id=g_id, name=f"G{g_id}", table_id=5 if g_id != 3 else None))
+        loaded, report = self.reload(plan)
+        self.assertTrue(report.ok)
+        self.assert_same_plan(loaded, plan)
+        self.assertEqual(loaded.guests[7].table_id, 5)
+        self.assertNotIn(4, loaded.guests)
+
+    def test_inconsistent_file_is_validated(self):
+        plan = SeatingPlan()
+        with plan.batch(validate=False):
+            plan.insert_table(Table(id=1, name="T1", capacity=2, guest_ids=[1, 2, 42]))
+            plan.insert_guest(Guest(id=1, name="A", table_id=1, size=2))
+            plan.insert_guest(Guest(id=2, name="B", table_id=1))
+            plan.insert_guest(Guest(id=3, name="C", table_id=9))
+        expected = plan.validate().counts()
+
+        filename = self.temp_file()
+        plan.save_to_file(filename)
+        loaded = SeatingPlan()
+        self.assertEqual(loaded.load_from_file(filename, repair=False).counts(), expected)
+        report = loaded.load_from_file(filename)
+        self.assertTrue(report.repaired)
+        self.assertTrue(loaded.validate().ok)
+
+    def test_corrupt_files_are_rejected(self):
+        filename = self.temp_file()
+        self.plan.save_to_file(filename)
+        with open(filename, "rb") as f:
+            data = f.read()
+
+        flipped = bytearray(data)
+        flipped[-3] ^= 0xFF
+        for bad in (bytes(flipped), data[:len(data) // 2], data[:20]):
+            with open(filename, "wb") as f:
+                f.write(bad)
+            loaded = SeatingPlan()
+            loaded.add_guest("Kept")
+            with self.assertRaises(ValueError):
+                loaded.load_from_file(filename)
+            self.assertEqual([g.name for g in loaded.guests.values()], ["Kept"])
+
+    def test_non_integer_fields_are_refused(self):
+        self.plan.move_table(self.t1.id, 10.5, 3)
+        with self.assertRaises(ValueError):
+            self.plan.save_to_file(self.temp_file())
+
+    def test_snapshot_of_packed_plan(self):
+        loaded, _ = self.reload(self.plan)
+        loaded.guests[1]  # built before the snapshot
+        snapshot = loaded.snapshot()
+        loaded.update_guest(1, name="Renamed")
+        loaded.update_guest(2, name="Renamed too")
+        loaded.remove_guest(5)
+        self.assertEqual(snapshot.guests[1].name, "דוד כהן")
+        self.assertEqual(snapshot.guests[2].name, "Émile")
+        self.assertIn(5, snapshot.guests)
+        self.assertEqual(snapshot.fingerprint(), self.plan.fingerprint())
+
+    def test_large_plan_opens_fast(self):
+        plan = SeatingPlan()
+        with plan.batch(validate=False):
+            for t_id in range(1, 2001):
+                plan.insert_table(Table(id=t_id, name=f"Table {t_id}", capacity=200))
+            for g_id in range(1, 100001):
+                plan.insert_guest(Guest(id=g_id, name=f"Guest {g_id}", category=f"C{g_id % 30}",
+                                        table_id=g_id % 2000 + 1 if g_id % 3 else None))
+        filename = self.temp_file()
+        plan.save_to_file(filename)
+
+        loaded = SeatingPlan()
+        start = time.perf_counter()
+        report = loaded.load_from_file(filename)
+        elapsed = time.perf_counter() - start
+        self.assertTrue(report.ok)
+        self.assertEqual(loaded.guests.built_count, 0)
+        self.assertEqual(loaded.seated_head_count, plan.seated_head_count)
+        self.assertLess(elapsed, 0.5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from wedding_planner.models import SeatingPlan
+from wedding_planner.bulk_merge import merge_workbooks, read_workbooks
+from wedding_planner.dedup import GuestDeduplicator
+from wedding_planner.excel_io import ExcelIO
+
+class TestBulkMerge(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        # Every file numbers its tables and guests from 1, so ids collide across files
+        self.files = []
+        for n in range(4):
+            plan = SeatingPlan()
+            tables = [plan.add_table(f"File {n} table {i}", 6, x=i * 100, y=n * 100) for i in range(3)]
+            for i in range(12):
+                guest = plan.add_guest(f"Guest {n}-{i}" if i % 4 else "משפחת כהן", f"Side {i % 2}", size=i % 3 + 1)
+                if i % 3:
+                    plan.assign_guest_to_table(guest.id, tables[i % 3].id)
+            filename = os.path.join(self.dir, f"family{n}.xlsx")
+            ExcelIO.save_to_xlsx(plan, filename)
+            self.files.append(filename)
+
+    def sequential(self, plan):
+        # What the GUI did per file: load it on its own, then merge and repair
+        dedup = GuestDeduplicator(plan)
+        for filename in self.files:
+            loaded = SeatingPlan()
+            ExcelIO.load_from_xlsx(filename, loaded)
+            plan.merge_from(loaded, dedup=dedup)
+            plan.validate(repair=True)
+        return dedup
+
+    def base_plan(self):
+        plan = SeatingPlan()
+        t = plan.add_table("Head table", 10)
+        plan.assign_guest_to_table(plan.add_guest("Guest 2-1", "Side 1").id, t.id)
+        return plan
+
+    def test_same_plan_as_sequential_merge(self):
+        expected = self.base_plan()
+        expected_dedup = self.sequential(expected)
+        self.assertGreater(len(expected_dedup.duplicates), 3)
+
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                plan = self.base_plan()
+                events = []
+                plan.subscribe(lambda *args: events.append(args))
+                dedup = GuestDeduplicator(plan)
+                with mock.patch.object(SeatingPlan, "validate", autospec=True, side_effect=SeatingPlan.validate) as validate:
+                    report = merge_workbooks(self.files, plan, workers=workers, dedup=dedup)
+                # Once for the merged plan, not after each file
+                self.assertEqual([call.args[0] for call in validate.call_args_list].count(plan), 1)
+                self.assertTrue(report.ok)
+                self.assertEqual(len(events), 1)
+                self.assertEqual(plan.fingerprint(), expected.fingerprint())
+                self.assertEqual([(g.id, g.name, g.table_id) for g in plan.guests.values()],
+                                 [(g.id, g.name, g.table_id) for g in expected.guests.values()])
+                self.assertEqual({t.id: list(t.guest_ids) for t in plan.tables.values()},
+                                 {t.id: list(t.guest_ids) for t in expected.tables.values()})
+                self.assertEqual((plan.next_guest_id, plan.next_table_id),
+                                 (expected.next_guest_id, expected.next_table_id))
+                self.assertEqual(len(dedup.duplicates), len(expected_dedup.duplicates))
+
+    def test_records_pickle_and_keep_file_order(self):
+        seen = []
+        records = read_workbooks(reversed(self.files), workers=2, progress=lambda done, total: seen.append((done, total)))
+        self.assertEqual([r.filename for r in records], self.files[::-1])
+        self.assertEqual(seen, [(1, 4), (2, 4), (3, 4), (4, 4)])
+        again = pickle.loads(pickle.dumps(records[0]))
+        self.assertEqual(again.guest_rows, records[0].guest_rows)
+        self.assertEqual(len(again.guests), 12)
+
+    def test_cancel_leaves_plan_untouched(self):
+        plan = self.base_plan()
+        before = plan.fingerprint()
+
+        def cancel(done, total):
+            raise RuntimeError("cancelled")
+
+        with self.assertRaises(RuntimeError):
+            merge_workbooks(self.files, plan, workers=2, progress=cancel)
+        self.assertEqual(plan.fingerprint(), before)
+
+if __name__ == '__main__':
+    unittest.main()
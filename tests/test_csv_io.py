@@ -0,0 +1,91 @@
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+from wedding_planner.models import SeatingPlan
+from wedding_planner.csv_io import CsvIO, group_reader, sniff_encoding
+from wedding_planner.excel_io import ExcelIO
+from wedding_planner.rsvp_sync import RsvpSync
+
+ROWS = [["Group Name", "Count", "Side"], ["משפחת כהן", "4", "כלה"], ["عائلة حداد", "2", ""], ["Levi", "x", "Groom"],
+        ["", "3", "Groom"], ["Short", "2"]]
+
+class TestCsvIO(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def write(self, name, encoding, delimiter=",", rows=ROWS):
+        filename = os.path.join(self.dir, name)
+        with open(filename, "w", newline="", encoding=encoding) as f:
+            csv.writer(f, delimiter=delimiter).writerows(rows)
+        return filename
+
+    def test_encodings_and_delimiters(self):
+        cases = [("a.csv", "utf-8", ",", "utf-8"), ("b.csv", "utf-8-sig", ";", "utf-8-sig"),
+                 ("c.tsv", "utf-16", "\t", "utf-16"), ("d.csv", "utf-16-le", ",", "utf-16-le"),
+                 ("e.csv", "utf-16-be", ",", "utf-16-be")]
+        for name, encoding, delimiter, sniffed in cases:
+            with self.subTest(name):
+                filename = self.write(name, encoding, delimiter)
+                self.assertEqual(sniff_encoding(filename), sniffed)
+                self.assertEqual(CsvIO.get_headers(filename), ["Group Name", "Count", "Side"])
+                plan = SeatingPlan()
+                CsvIO.import_groups_to_plan(filename, "Group Name", "Count", plan, "Side")
+                self.assertEqual([(g.name, g.size, g.category) for g in plan.guests.values()],
+                                 [("משפחת כהן", 4, "כלה"), ("عائلة حداد", 2, "عائلة حداد"), ("Levi", 1, "Groom"),
+                                  ("Short", 2, "Short")])
+
+    def test_legacy_code_pages(self):
+        hebrew = self.write("h.csv", "cp1255", rows=[["Name", "Count"], ["משפחת כהן", "4"]])
+        arabic = self.write("a.csv", "cp1256", rows=[["Name", "Count"], ["عائلة حداد", "2"]])
+        self.assertEqual(sniff_encoding(hebrew), "cp1255")
+        self.assertEqual(sniff_encoding(arabic), "cp1256")
+        plan = SeatingPlan()
+        CsvIO.import_groups_to_plan(arabic, "Name", "Count", plan)
+        self.assertEqual(plan.guests[1].name, "عائلة حداد")
+
+    def test_missing_column(self):
+        filename = self.write("a.csv", "utf-8")
+        with self.assertRaises(ValueError):
+            CsvIO.import_groups_to_plan(filename, "Nope", "Count", SeatingPlan())
+
+    def test_same_groups_as_excel(self):
+        filename = self.write("a.csv", "utf-8")
+        xlsx = os.path.join(self.dir, "a.xlsx")
+        from openpyxl import Workbook
+        wb = Workbook()
+        for row in ROWS:
+            wb.active.append([int(cell) if cell.isdigit() else cell or None for cell in row])
+        wb.save(xlsx)
+        args = ("Group Name", "Count", "Side")
+        self.assertEqual(CsvIO.read_groups(filename, *args), ExcelIO.read_groups(xlsx, *args))
+        self.assertIs(group_reader(filename), CsvIO)
+        self.assertIs(group_reader(xlsx), ExcelIO)
+
+        plan = SeatingPlan()
+        self.assertEqual(len(RsvpSync(plan, filename, *args).sync().added), 4)
+
+    def test_export(self):
+        plan = SeatingPlan()
+        t = plan.add_table("שולחן 1", 10, x=5, y=6)
+        plan.assign_guest_to_table(plan.add_guest("דוד, \"הגדול\"", "משפחה", size=2).id, t.id)
+        plan.add_guest("Eli")
+        filename = os.path.join(self.dir, "plan.tsv")
+        CsvIO.save_to_csv(plan, filename)
+
+        self.assertEqual(sniff_encoding(filename), "utf-8-sig")
+        with open(filename, newline="", encoding="utf-8-sig") as f:
+            rows = list(csv.reader(f, delimiter="\t"))
+        self.assertEqual(rows, [["ID", "Name", "Category", "Capacity", "Table ID"],
+                                ["1", "דוד, \"הגדול\"", "משפחה", "2", str(t.id)], ["2", "Eli", "General", "1", ""]])
+        with open(os.path.join(self.dir, "plan.tables.tsv"), newline="", encoding="utf-8-sig") as f:
+            self.assertEqual(list(csv.reader(f, delimiter="\t"))[1], [str(t.id), "שולחן 1", "10", "5", "6"])
+
+        imported = SeatingPlan()
+        CsvIO.import_groups_to_plan(filename, "Name", "Capacity", imported, "Category")
+        self.assertEqual([(g.name, g.size) for g in imported.guests.values()], [("דוד, \"הגדול\"", 2), ("Eli", 1)])
+
+if __name__ == '__main__':
+    unittest.main()
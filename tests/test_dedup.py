@@ -0,0 +1,148 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from openpyxl import Workbook
+from wedding_planner.models import SeatingPlan, Guest
+from wedding_planner.excel_io import ExcelIO
+from wedding_planner.dedup import GuestDeduplicator, find_duplicates, name_signature
+
+class TestNameSignature(unittest.TestCase):
+    def test_normalization(self):
+        self.assertEqual(name_signature("  David   COHEN "), "david cohen")
+        self.assertEqual(name_signature("דָּוִד כֹּהֵן"), "דוד כהן")
+        self.assertEqual(name_signature("\ufb35\u05d3"), name_signature("\u05d5\u05d3"))  # presentation form
+        self.assertEqual(name_signature("مُحَمَّد"), "محمد")
+        self.assertEqual(name_signature("محـــمد"), "محمد")
+        self.assertEqual(name_signature(None), "")
+
+    def test_find_duplicates(self):
+        plan = SeatingPlan()
+        for name, category in [("דָּנָה", "Family"), ("Eli", "Friends"), ("דנה ", "Work"), ("eli", "Friends")]:
+            plan.add_guest(name, category)
+        self.assertEqual(find_duplicates(plan), [[1, 3], [2, 4]])
+        self.assertEqual(find_duplicates(plan, by_category=True), [[2, 4]])
+
+class TestMergeDedup(unittest.TestCase):
+    def setUp(self):
+        self.plan = SeatingPlan()
+        self.table = self.plan.add_table("T1", 10)
+        self.free = self.plan.add_table("T2", 10)
+        seated = self.plan.add_guest("Cohen Family", "Family", size=4)
+        self.plan.assign_guest_to_table(seated.id, self.table.id)
+        self.plan.add_guest("Levi", "Friends", size=2)
+
+        self.other = SeatingPlan()
+        t = self.other.add_table("Other", 10)
+        for name, category in [("cohen  family", "Family"), ("LEVI", "Friends"), ("Levi", "Work"), ("New", "Work")]:
+            self.other.add_guest(name, category)
+        self.other.assign_guest_to_table(1, t.id)
+
+    def test_collapse_keeps_existing_seats(self):
+        dedup = GuestDeduplicator(self.plan)
+        mapping = self.plan.merge_from(self.other, renumber=True, dedup=dedup)
+        self.assertEqual([g.name for g in self.plan.guests.values()], ["Cohen Family", "Levi", "New"])
+        self.assertEqual([mapping[1], mapping[2], mapping[3]], [1, 2, 2])
+        self.assertEqual(self.plan.guests[1].table_id, self.table.id)
+        self.assertEqual(self.plan.guests[1].size, 4)
+        self.assertEqual([d.kept_id for d in dedup.duplicates], [1, 2, 2])
+        self.assertTrue(self.plan.validate().ok)
+
+    def test_unseated_guest_takes_the_duplicates_seat(self):
+        self.plan.unseat_guest(1)
+        self.plan.merge_from(self.other, renumber=True, dedup=GuestDeduplicator(self.plan))
+        self.assertEqual(self.plan.guests[1].table_id, 3)  # the merged "Other" table
+        self.assertTrue(self.plan.validate().ok)
+
+    def test_report_only_and_by_category(self):
+        dedup = GuestDeduplicator(self.plan, by_category=True, collapse=False)
+        self.plan.merge_from(self.other, renumber=True, dedup=dedup)
+        self.assertEqual(len(self.plan.guests), 6)
+        self.assertEqual([(d.kept_id, d.name) for d in dedup.duplicates], [(1, "cohen  family"), (2, "LEVI")])
+        self.assertEqual(dedup.summary(), "2 duplicate guest(s) found.")
+
+    def test_rollback_forgets_an_undone_merge(self):
+        dedup = GuestDeduplicator(self.plan, by_category=True, collapse=False)
+        mark = len(dedup.duplicates)
+        with self.assertRaises(KeyError):
+            with self.plan.batch():
+                self.plan.merge_from(self.other, renumber=True, dedup=dedup)
+                raise KeyError("aborted")
+        dedup.rollback(mark)
+        self.assertEqual(dedup.duplicates, [])
+        self.plan.merge_from(self.other, renumber=True, dedup=dedup)
+        self.assertEqual([d.kept_id for d in dedup.duplicates], [1, 2])
+
+    def test_same_name_on_both_sides(self):
+        plan = SeatingPlan()
+        plan.add_guest("Cohen", "Bride side", size=4)
+        other = SeatingPlan()
+        other.add_guest("Cohen", "Groom side", size=3)
+        other.add_guest("Cohen", "Bride side", size=4)
+        dedup = GuestDeduplicator(plan, by_category=True, collapse=False)
+        plan.merge_from(other, renumber=True, dedup=dedup)
+        self.assertEqual([(g.category, g.size) for g in plan.guests.values()],
+                         [("Bride side", 4), ("Groom side", 3), ("Bride side", 4)])
+        self.assertEqual([(d.kept_id, d.category, d.size) for d in dedup.duplicates], [(1, "Bride side", 4)])
+
+    def test_large_merge_is_linear(self):
+        other = SeatingPlan()
+        with self.plan.batch(validate=False), other.batch(validate=False):
+            for i in range(50000):
+                self.plan.insert_guest(Guest(id=i + 10, name=f"Guest {i}"))
+                other.insert_guest(Guest(id=i + 1, name=f"GUEST  {i * 2}"))
+        dedup = GuestDeduplicator(self.plan)
+        start = time.perf_counter()
+        with self.plan.batch(validate=False):
+            self.plan.merge_from(other, renumber=True, dedup=dedup)
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertEqual(len(dedup.duplicates), 25000)
+
+class TestExcelDedup(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def test_merging_the_same_workbook_twice(self):
+        plan = SeatingPlan()
+        t = plan.add_table("T1", 10)
+        for name in ("A", "B"):
+            plan.assign_guest_to_table(plan.add_guest(name).id, t.id)
+        filename = os.path.join(self.dir, "plan.xlsx")
+        ExcelIO.save_to_xlsx(plan, filename)
+        fingerprint = plan.fingerprint()
+
+        dedup = GuestDeduplicator(plan)
+        ExcelIO.load_from_xlsx(filename, plan, clear=False, dedup=dedup)
+        self.assertEqual(len(plan.guests), 2)
+        self.assertEqual(len(plan.tables), 2)  # tables are not deduplicated
+        self.assertEqual(len(dedup.duplicates), 2)
+        self.assertEqual([g.table_id for g in plan.guests.values()], [t.id, t.id])
+        self.assertNotEqual(plan.fingerprint(), fingerprint)
+
+    def test_group_import(self):
+        filename = os.path.join(self.dir, "rsvp.xlsx")
+        wb = Workbook()
+        ws = wb.active
+        ws.append(["Group", "Count"])
+        for row in (["משפחת כֹּהֵן", 4], ["Dana", 2], ["משפחת כהן", 3], ["DANA", 2]):
+            ws.append(row)
+        wb.save(filename)
+
+        plan = SeatingPlan()
+        plan.add_guest("dana", "Friends", size=2)
+        dedup = GuestDeduplicator(plan)
+        ExcelIO.import_groups_to_plan(filename, "Group", "Count", plan, dedup=dedup)
+        # Rows of one list are never merged with each other, only with guests already there
+        self.assertEqual([(g.name, g.size) for g in plan.guests.values()],
+                         [("dana", 2), ("משפחת כֹּהֵן", 4), ("משפחת כהן", 3)])
+        self.assertEqual(len(dedup.duplicates), 2)
+
+        # A second list is checked against both
+        ExcelIO.import_groups_to_plan(filename, "Group", "Count", plan, dedup=dedup)
+        self.assertEqual(len(plan.guests), 3)
+        self.assertEqual(len(dedup.duplicates), 6)
+
+if __name__ == '__main__':
+    unittest.main()
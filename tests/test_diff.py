@@ -0,0 +1,94 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from wedding_planner.models import SeatingPlan, Guest, Table
+from wedding_planner.excel_io import ExcelIO
+from wedding_planner.diff import diff_plans, diff_files
+
+class TestPlanDiff(unittest.TestCase):
+    def setUp(self):
+        self.old = SeatingPlan()
+        self.t1 = self.old.add_table("שולחן 1", 10, x=100, y=100)
+        self.t2 = self.old.add_table("T2", 8)
+        for i, name in enumerate(["דוד", "Dana", "Eli", "Noa"]):
+            g = self.old.add_guest(name, "Family", size=i % 2 + 1)
+            if i < 3:
+                self.old.assign_guest_to_table(g.id, self.t1.id if i < 2 else self.t2.id)
+
+    def copy(self):
+        new = SeatingPlan()
+        new.merge_from(self.old)
+        return new
+
+    def test_identical(self):
+        diff = diff_plans(self.old, self.copy())
+        self.assertTrue(diff.identical)
+        self.assertEqual(diff.summary(), "The plans are identical.")
+
+    def test_reports_each_kind_of_change(self):
+        new = self.copy()
+        new.update_guest(1, name="David")
+        new.update_guest(2, category="Friends", size=4)
+        new.assign_guest_to_table(3, self.t1.id)
+        new.remove_guest(4)
+        new.add_guest("Walk-in")
+        new.update_table(self.t1.id, capacity=12)
+        new.update_table(self.t2.id, name="Garden")
+        new.move_table(self.t2.id, 300, 40)
+        new.add_table("T3", 6)
+        new.remove_table(self.t2.id)
+        new.insert_table(Table(id=self.t2.id, name="Garden", capacity=8, x=300, y=40))
+
+        diff = diff_plans(self.old, new)
+        self.assertEqual(diff.counts(), {
+            "table_added": 1, "table_renamed": 1, "table_resized": 1, "table_moved": 1,
+            "guest_added": 1, "guest_removed": 1, "guest_renamed": 1, "guest_moved": 1, "guest_updated": 1})
+        moved = diff.by_kind("guest_moved")[0]
+        self.assertEqual((moved.record_id, moved.old, moved.new), (3, self.t2.id, self.t1.id))
+        self.assertEqual(diff.describe(moved), (f"T2 (#{self.t2.id})", f"שולחן 1 (#{self.t1.id})"))
+        updated = diff.by_kind("guest_updated")[0]
+        self.assertEqual((updated.old, updated.new), ({"category": "Family", "size": 2}, {"category": "Friends", "size": 4}))
+        self.assertEqual(diff.by_kind("table_moved")[0].new, (300, 40))
+        self.assertEqual([c.kind for c in diff.changes][:2], ["table_added", "table_renamed"])
+
+        back = diff_plans(new, self.old)
+        self.assertEqual(back.counts()["guest_removed"], 1)
+        self.assertEqual(back.by_kind("guest_moved")[0].new, self.t2.id)
+
+    def test_files_in_different_formats(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        json_file, xlsx_file = os.path.join(tmp, "a.json"), os.path.join(tmp, "b.xlsx")
+        self.old.save_to_file(json_file)
+        new = self.copy()
+        new.unseat_guest(1)
+        ExcelIO.save_to_xlsx(new, xlsx_file)
+
+        diff = diff_files(json_file, xlsx_file)
+        self.assertEqual(diff.counts(), {"guest_moved": 1})
+        self.assertTrue(diff_files(json_file, json_file).identical)
+
+    def test_large_plans(self):
+        def build():
+            plan = SeatingPlan()
+            with plan.batch(validate=False):
+                for t_id in range(1, 501):
+                    plan.insert_table(Table(id=t_id, name=f"T{t_id}", capacity=200))
+                for g_id in range(1, 50001):
+                    plan.insert_guest(Guest(id=g_id, name=f"G{g_id}", table_id=g_id % 500 + 1 if g_id % 3 else None))
+            return plan
+        old, new = build(), build()
+        with new.batch(validate=False):
+            for g_id in range(1, 50001, 100):
+                new.update_guest(g_id, name="Renamed")
+            new.remove_guest(7)
+        start = time.perf_counter()
+        diff = diff_plans(old, new)
+        elapsed = time.perf_counter() - start
+        self.assertEqual(diff.counts(), {"guest_removed": 1, "guest_renamed": 500})
+        self.assertLess(elapsed, 2)
+
+if __name__ == '__main__':
+    unittest.main()
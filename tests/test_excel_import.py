@@ -1,5 +1,6 @@
 import unittest
 import os
+import openpyxl
 from openpyxl import Workbook
 from wedding_planner.models import SeatingPlan
 from wedding_planner.excel_io import ExcelIO
@@ -83,5 +84,165 @@ class TestExcelImport(unittest.TestCase):
         self.assertEqual(len(levy), 1)
         self.assertEqual(levy[0].size, 1)
 
+    def test_import_groups_single_notification(self):
+        events = []
+        self.seating_plan.subscribe(events.append)
+        ExcelIO.import_groups_to_plan(self.filename, "Group Name", "Count", self.seating_plan)
+
+        self.assertEqual(len(events), 1)
+        self.assertEqual(len(events[0].guest_ids), 3)
+        self.assertEqual(self.seating_plan.total_head_count, 6)
+
+    def test_xlsx_round_trip_keeps_seats_and_fingerprint(self):
+        plan = SeatingPlan()
+        head = plan.add_table("Head", 10, x=50, y=60)
+        family = plan.add_table("משפחה", 8, x=300, y=60)
+        for name, category, size, table in [("דוד כהן", "Family", 2, family), ("Bob", "Friends", 1, head),
+                                            ("Carol", "Work", 3, None)]:
+            guest = plan.add_guest(name, category, size)
+            if table is not None:
+                plan.assign_guest_to_table(guest.id, table.id)
+
+        filename = os.path.join(self.data_dir, "test_round_trip.xlsx")
+        try:
+            ExcelIO.save_to_xlsx(plan, filename)
+            loaded = SeatingPlan()
+            ExcelIO.load_from_xlsx(filename, loaded)
+        finally:
+            os.remove(filename)
+
+        self.assertEqual(loaded.get_occupancy(family.id), 2)
+        self.assertEqual(loaded.get_occupancy(head.id), 1)
+        self.assertEqual(loaded.fingerprint(), plan.fingerprint())
+        self.assertEqual(loaded.table_fingerprints(), plan.table_fingerprints())
+
+    def test_load_hand_edited_and_legacy_workbooks(self):
+        filename = os.path.join(self.data_dir, "test_hand_edited.xlsx")
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Guests"
+        ws.append(["ID", "Name", "Category", "Capacity", "Table ID"])
+        ws.append([1.0, "Float id", "A", 2.0, "=Tables!A3"])   # second table row
+        ws.append(["2", "Text numbers", "A", "3", "7"])
+        ws.append([3, "Unseated", "A", None, ""])
+        ws.append(["x", "Bad id", "A", 1, None])
+        ws.append([None, "No id", "A", 1, None])
+        ws.append([5, "Short row"])
+        tables = wb.create_sheet("Tables")
+        tables.append(["ID", "Name", "Capacity", "X", "Y"])
+        tables.append([3, "T3", "10", 1.5, "20"])
+        tables.append([7.0, "T7", 10, 0, 0])
+        tables.append(["bad", "Skipped", 10, 0, 0])
+        meta = wb.create_sheet("Metadata")
+        meta.append(["Next Guest ID", "Next Table ID"])
+        meta.append(["6", 8.0])
+        wb.save(filename)
+
+        legacy_file = os.path.join(self.data_dir, "test_legacy.xlsx")
+        wb = Workbook()
+        wb.active.title = "Guests"
+        wb.active.append(["ID", "Name", "Category", "Table ID"])
+        wb.active.append([1, "Old", "A", 3])
+        tables = wb.create_sheet("Tables")
+        tables.append(["ID", "Name", "Capacity", "X", "Y"])
+        tables.append([3, "T3", 10, 0, 0])
+        wb.save(legacy_file)
+        try:
+            plan = SeatingPlan()
+            report = ExcelIO.load_from_xlsx(filename, plan, repair=False)
+            legacy = SeatingPlan()
+            ExcelIO.load_from_xlsx(legacy_file, legacy)
+        finally:
+            os.remove(filename)
+            os.remove(legacy_file)
+
+        self.assertTrue(report.ok, report.summary())
+        self.assertEqual({g.id: (g.name, g.size, g.table_id) for g in plan.guests.values()},
+                         {1: ("Float id", 2, 7), 2: ("Text numbers", 3, 7), 3: ("Unseated", 1, None), 5: ("Short row", 1, None)})
+        self.assertEqual([(t.id, t.capacity, t.x, t.y) for t in plan.tables.values()], [(3, 10, 1, 20), (7, 10, 0, 0)])
+        self.assertEqual((plan.next_guest_id, plan.next_table_id), (6, 8))
+        self.assertEqual(legacy.guests[1].table_id, 3)
+        self.assertEqual(legacy.guests[1].size, 1)
+
+    def test_computed_cells_use_the_values_excel_cached(self):
+        filename = os.path.join(self.data_dir, "test_formulas.xlsx")
+        plan = SeatingPlan()
+        t = plan.add_table("T1", 10)
+        plan.assign_guest_to_table(plan.add_guest("Cohen", size=2).id, t.id)
+        ExcelIO.save_to_xlsx(plan, filename)
+        wb = openpyxl.load_workbook(filename)
+        wb["Tables"]["C2"] = "=5+5"
+        wb["Guests"]["D2"] = "=1+2"
+        wb.save(filename)
+        # Excel stores each formula's last result next to it; openpyxl writes none
+        import zipfile
+        with zipfile.ZipFile(filename) as zf:
+            parts = {name: zf.read(name) for name in zf.namelist()}
+        for name, part in parts.items():
+            parts[name] = part.replace(b"<f>5+5</f><v />", b"<f>5+5</f><v>10</v>").replace(
+                b"<f>1+2</f><v />", b"<f>1+2</f><v>3</v>")
+        with zipfile.ZipFile(filename, "w") as zf:
+            for name, part in parts.items():
+                zf.writestr(name, part)
+
+        try:
+            loaded = SeatingPlan()
+            report = ExcelIO.load_from_xlsx(filename, loaded, repair=False)
+        finally:
+            os.remove(filename)
+        self.assertTrue(report.ok, report.summary())
+        self.assertEqual(loaded.tables[t.id].capacity, 10)
+        self.assertEqual((loaded.guests[1].size, loaded.guests[1].table_id), (3, t.id))
+        self.assertEqual(loaded.get_occupancy(t.id), 3)
+
+    def test_write_only_save_matches_the_in_memory_workbook(self):
+        def in_memory_save(plan, filename):
+            # save_to_xlsx as it was before the write-only workbook
+            wb = Workbook()
+            ws_guests = wb.active
+            ws_guests.title = "Guests"
+            ws_guests.append(["ID", "Name", "Category", "Capacity", "Table ID"])
+            ws_tables = wb.create_sheet("Tables")
+            ws_tables.append(["ID", "Name", "Capacity", "X", "Y"])
+            rows = {}
+            for idx, table in enumerate(plan.tables.values(), start=2):
+                ws_tables.append([table.id, table.name, table.capacity, table.x, table.y])
+                rows[table.id] = idx
+            for guest in plan.guests.values():
+                seat = f"=Tables!A{rows[guest.table_id]}" if guest.table_id in rows else guest.table_id or ""
+                ws_guests.append([guest.id, guest.name, guest.category, guest.size, seat])
+            ws_meta = wb.create_sheet("Metadata")
+            ws_meta.append(["Next Guest ID", "Next Table ID"])
+            ws_meta.append([plan.next_guest_id, plan.next_table_id])
+            wb.save(filename)
+
+        def cells(filename):
+            wb = openpyxl.load_workbook(filename)
+            return wb.sheetnames, wb.active.title, {ws.title: [list(row) for row in ws.iter_rows(values_only=True)]
+                                                    for ws in wb.worksheets}
+
+        plan = SeatingPlan()
+        for t in range(1, 30):
+            plan.add_table(f"שולחן {t}", 10, x=t * 10, y=t * 7)
+        plan.remove_table(5)
+        for g in range(1, 200):
+            guest = plan.add_guest(f"Guest {g} כהן", f"Group {g % 4}", size=g % 3 + 1)
+            if g % 4:
+                plan.assign_guest_to_table(guest.id, g % 28 + 1 if g % 28 + 1 != 5 else 6)
+
+        old_file = os.path.join(self.data_dir, "test_in_memory.xlsx")
+        new_file = os.path.join(self.data_dir, "test_write_only.xlsx")
+        try:
+            in_memory_save(plan, old_file)
+            ExcelIO.save_to_xlsx(plan, new_file)
+            self.assertEqual(cells(new_file), cells(old_file))
+            loaded = SeatingPlan()
+            ExcelIO.load_from_xlsx(new_file, loaded)
+            self.assertEqual(loaded.fingerprint(), plan.fingerprint())
+            self.assertEqual((loaded.next_guest_id, loaded.next_table_id), (plan.next_guest_id, plan.next_table_id))
+        finally:
+            os.remove(old_file)
+            os.remove(new_file)
+
 if __name__ == '__main__':
     unittest.main()
@@ -104,5 +104,59 @@ class TestGUIIntegration(unittest.TestCase):
         success = self.plan.assign_guest_to_table(g2.id, t1.id)
         self.assertTrue(success, "Logic prevented valid assignment.")
 
+    def test_seat_change_redraws_only_affected_tables(self):
+        t1 = self.plan.add_table("T1", 4)
+        t2 = self.plan.add_table("T2", 4)
+        g1 = self.plan.add_guest("Alice", "Friends", 1)
+        self.assertEqual(self.app.guest_tree.get_children(), (str(g1.id),))
+
+        untouched = self.app.canvas.find_withtag(f"group_{t2.id}")
+        self.assertTrue(untouched)
+
+        self.plan.assign_guest_to_table(g1.id, t1.id)
+
+        # T2 items were not recreated, the guest left the waiting list
+        self.assertEqual(self.app.canvas.find_withtag(f"group_{t2.id}"), untouched)
+        self.assertTrue(self.app.canvas.find_withtag(f"guest_{g1.id}"))
+        self.assertEqual(self.app.guest_tree.get_children(), ())
+
+        self.plan.remove_table(t1.id)
+        self.assertEqual(self.app.canvas.find_withtag(f"group_{t1.id}"), ())
+        self.assertEqual(self.app.guest_tree.get_children(), (str(g1.id),))
+
+    def test_restored_session_is_interactive_before_the_floor_plan_is_drawn(self):
+        import shutil
+        import tempfile
+        import time
+        from wedding_planner.journal import PlanJournal
+        from wedding_planner.models import Table
+
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        autosave = os.path.join(tmp, "autosave.seatplan")
+        plan = SeatingPlan()
+        journal = PlanJournal(plan, autosave)
+        with plan.batch(validate=False):
+            for t_id in range(1, 1001):
+                plan.insert_table(Table(id=t_id, name=f"T{t_id}", capacity=10,
+                                        x=100 + (t_id - 1) % 40 * 220, y=100 + (t_id - 1) // 40 * 220))
+        journal.close()
+
+        root = tk.Tk()
+        root.withdraw()
+        self.addCleanup(root.destroy)
+        start = time.perf_counter()
+        app = WeddingPlannerGUI(root, autosave_path=autosave, session_path=os.path.join(tmp, "session.json"))
+        root.update_idletasks()  # laid out and ready for input; later slices wait on timers
+        interactive = time.perf_counter() - start
+        self.addCleanup(app.journal.close)
+
+        self.assertEqual(len(app.seating_plan.tables), 1000)
+        self.assertTrue(app.renderer.busy)
+        self.assertLess(interactive, 0.5, f"time to interactive {interactive * 1000:.0f} ms")
+        while app.renderer.busy:
+            root.update()
+        self.assertTrue(app.canvas.find_withtag("group_1000"))
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,186 @@
+import unittest
+from unittest import mock
+from wedding_planner.models import SeatingPlan
+from wedding_planner.history import PlanHistory
+
+class TestPlanHistory(unittest.TestCase):
+    def setUp(self):
+        self.plan = SeatingPlan()
+        self.history = PlanHistory(self.plan)
+
+    def snapshot(self):
+        return ([g.to_dict() for g in self.plan.guests.values()],
+                [t.to_dict() for t in self.plan.tables.values()],
+                self.plan.seated_head_count, self.plan.total_capacity)
+
+    def test_undo_redo_round_trip(self):
+        states = [self.snapshot()]
+        table = self.plan.add_table("T1", 4)
+        states.append(self.snapshot())
+        alice = self.plan.add_guest("Alice", size=2)
+        states.append(self.snapshot())
+        self.plan.assign_guest_to_table(alice.id, table.id)
+        states.append(self.snapshot())
+        self.plan.update_guest(alice.id, name="Alicia", size=3)
+        states.append(self.snapshot())
+        self.plan.update_table(table.id, capacity=6)
+        states.append(self.snapshot())
+        self.plan.change_table_id(table.id, 10)
+        states.append(self.snapshot())
+        self.plan.remove_table(10)
+        states.append(self.snapshot())
+
+        for expected in reversed(states[:-1]):
+            self.assertTrue(self.history.undo())
+            self.assertEqual(self.snapshot(), expected)
+        self.assertFalse(self.history.can_undo)
+
+        for expected in states[1:]:
+            self.assertTrue(self.history.redo())
+            self.assertEqual(self.snapshot(), expected)
+        self.assertFalse(self.history.can_redo)
+
+    def test_remove_guest_restores_seat(self):
+        table = self.plan.add_table("T1", 4)
+        guest = self.plan.add_guest("Bob", size=2)
+        self.plan.assign_guest_to_table(guest.id, table.id)
+        self.plan.remove_guest(guest.id)
+
+        self.history.undo()  # removal and the unseat it implied are one step
+        self.assertEqual(self.plan.guests[guest.id].table_id, table.id)
+        self.assertEqual(self.plan.get_occupancy(table.id), 2)
+
+    def test_undo_restores_seat_order(self):
+        table = self.plan.add_table("T1", 4)
+        other = self.plan.add_table("T2", 4)
+        for name in "ABCD":
+            self.plan.assign_guest_to_table(self.plan.add_guest(name).id, table.id)
+        seats = list(table.guest_ids)
+
+        self.plan.remove_table(table.id)
+        self.history.undo()
+        self.assertEqual(list(self.plan.tables[table.id].guest_ids), seats)
+
+        for change in (lambda: self.plan.remove_guest(seats[1]),
+                       lambda: self.plan.unseat_guest(seats[1]),
+                       lambda: self.plan.assign_guest_to_table(seats[1], other.id)):
+            change()
+            self.history.undo()
+            self.assertEqual(list(self.plan.tables[table.id].guest_ids), seats)
+        self.history.redo()
+        self.assertEqual(list(self.plan.tables[table.id].guest_ids), [seats[0]] + seats[2:])
+        self.assertEqual(list(self.plan.tables[other.id].guest_ids), [seats[1]])
+
+    def test_batch_is_one_entry(self):
+        table = self.plan.add_table("T1", 10)
+        with self.plan.batch():
+            for i in range(5):
+                g = self.plan.add_guest(f"G{i}")
+                self.plan.assign_guest_to_table(g.id, table.id)
+
+        self.history.undo()
+        self.assertEqual(len(self.plan.guests), 0)
+        self.assertEqual(self.plan.get_occupancy(table.id), 0)
+        self.history.redo()
+        self.assertEqual(self.plan.get_occupancy(table.id), 5)
+
+    def test_drag_moves_coalesce_until_sealed(self):
+        table = self.plan.add_table("T1", 4, x=0, y=0)
+        for step in range(1, 20):
+            self.plan.move_table(table.id, step, step)
+        self.history.seal()
+        self.plan.move_table(table.id, 50, 50)
+
+        self.history.undo()
+        self.assertEqual((table.x, table.y), (19, 19))
+        self.history.undo()
+        self.assertEqual((table.x, table.y), (0, 0))
+
+    def test_coalesced_drag_event_lists_only_the_table(self):
+        table = self.plan.add_table("T1", 4, x=0, y=0)
+        self.plan.move_table(table.id, 1, 1)
+        self.plan.move_table(table.id, 2, 2)
+        merged = self.history._undo[-1][0]
+        self.assertEqual((merged.guest_ids, merged.table_ids), (set(), {table.id}))
+        self.assertEqual((merged.old, merged.new), ({"x": 0, "y": 0}, {"x": 2, "y": 2}))
+
+    def test_undo_does_not_rebuild_indexes(self):
+        tables = [self.plan.add_table(f"T{i}", 1) for i in range(2)]
+        with self.plan.batch():
+            for i in range(2000):
+                self.plan.add_guest(f"G{i}", f"C{i % 7}")
+        self.plan.search_guests("G1")  # build the name index
+        a, b = self.plan.guests[1], self.plan.guests[2]
+        self.plan.assign_guest_to_table(a.id, tables[0].id)
+        self.plan.assign_guest_to_table(b.id, tables[1].id)
+        # A swap between full tables: undoing it passes through an overfull table
+        with self.plan.batch():
+            self.plan.unseat_guest(a.id)
+            self.plan.assign_guest_to_table(b.id, tables[0].id)
+            self.plan.assign_guest_to_table(a.id, tables[1].id)
+        self.plan.update_guest(a.id, name="Zed", category="New", size=1)
+
+        events = []
+        self.plan.subscribe(events.append)
+        with mock.patch.object(SeatingPlan, "rebuild_indexes") as rebuild:
+            self.history.undo()
+            self.history.undo()
+            self.history.redo()
+            rebuild.assert_not_called()
+        self.assertEqual(len(events), 3)
+        self.assertEqual((a.table_id, b.table_id), (tables[1].id, tables[0].id))
+        indexes = (dict(self.plan._occupancy), self.plan.seated_head_count, set(self.plan.unseated_ids),
+                   self.plan.search_guests("Zed"), self.plan.search_guests("G1", "Name"), self.plan.categories)
+        self.plan.rebuild_indexes()
+        self.assertEqual(indexes, (dict(self.plan._occupancy), self.plan.seated_head_count, set(self.plan.unseated_ids),
+                                   self.plan.search_guests("Zed"), self.plan.search_guests("G1", "Name"),
+                                   self.plan.categories))
+
+    def test_new_change_clears_redo(self):
+        self.plan.add_guest("A")
+        self.history.undo()
+        self.assertTrue(self.history.can_redo)
+        self.plan.add_guest("B")
+        self.assertFalse(self.history.can_redo)
+
+    def test_history_is_bounded(self):
+        history = PlanHistory(self.plan, max_entries=3)
+        for i in range(10):
+            self.plan.add_guest(f"G{i}")
+        undone = 0
+        while history.undo():
+            undone += 1
+        self.assertEqual(undone, 3)
+        self.assertEqual(len(self.plan.guests), 7)
+
+    def test_clear_resets_history(self):
+        self.plan.add_guest("A")
+        self.plan.clear()
+        self.assertFalse(self.history.can_undo)
+
+    def test_load_resets_history(self):
+        import os, tempfile
+        self.plan.add_guest("A")
+        fd, filename = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        try:
+            self.plan.save_to_file(filename)
+            self.plan.load_from_file(filename)
+        finally:
+            os.remove(filename)
+        self.assertFalse(self.history.can_undo)
+
+    def test_compact_store(self):
+        plan = SeatingPlan(compact=True)
+        history = PlanHistory(plan)
+        table = plan.add_table("T1", 4)
+        guest = plan.add_guest("Carol", "Family", size=2)
+        plan.assign_guest_to_table(guest.id, table.id)
+        plan.remove_guest(guest.id)
+
+        history.undo()
+        self.assertEqual(plan.guests[guest.id].to_dict(),
+                         {"id": guest.id, "name": "Carol", "category": "Family", "table_id": table.id, "size": 2})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,210 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from wedding_planner.models import SeatingPlan, Guest, Table
+from wedding_planner.excel_io import ExcelIO
+from wedding_planner.jobs import JobRunner, JobCancelled, save_atomically
+
+class FakeRoot:
+    """Stands in for Tk: after() callbacks run when the test pumps the loop."""
+    def __init__(self):
+        self.calls = []
+        self.thread = threading.current_thread()
+
+    def after(self, ms, callback):
+        self.calls.append((time.perf_counter() + ms / 1000, callback))
+
+    def pump(self, timeout=30):
+        deadline = time.perf_counter() + timeout
+        while self.calls:
+            self.assert_on_main_thread()
+            if time.perf_counter() > deadline:
+                raise AssertionError("jobs did not finish")
+            due, callback = self.calls.pop(0)
+            time.sleep(max(0, due - time.perf_counter()))
+            callback()
+
+    def assert_on_main_thread(self):
+        assert threading.current_thread() is self.thread
+
+class TestJobs(unittest.TestCase):
+    def setUp(self):
+        self.root = FakeRoot()
+        self.runner = JobRunner(self.root, poll_ms=5)
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.results = []
+
+    def submit(self, work, **kwargs):
+        callbacks = dict(on_done=lambda r: self.results.append(("done", r)),
+                         on_error=lambda e: self.results.append(("error", e)),
+                         on_cancel=lambda: self.results.append(("cancelled", None)))
+        callbacks.update(kwargs)
+        return self.runner.submit("test", work, **callbacks)
+
+    def test_result_and_progress_arrive_on_the_tk_thread(self):
+        progress = []
+
+        def work(job):
+            for i in range(1, 4):
+                job.progress(i, 3)
+                time.sleep(0.02)
+            return threading.current_thread()
+
+        def on_progress(job, done, total, message):
+            self.root.assert_on_main_thread()
+            progress.append((done, total))
+
+        self.submit(work, on_progress=on_progress)
+        self.assertTrue(self.runner.busy)
+        self.root.pump()
+        kind, worker = self.results[0]
+        self.assertEqual(kind, "done")
+        self.assertIsNot(worker, threading.current_thread())
+        self.assertTrue(progress)
+        self.assertTrue(all(total == 3 for _, total in progress))
+        self.assertFalse(self.runner.busy)
+
+    def test_errors_are_reported(self):
+        def work(job):
+            raise ValueError("bad file")
+        self.submit(work)
+        self.root.pump()
+        self.assertEqual(self.results[0][0], "error")
+        self.assertEqual(str(self.results[0][1]), "bad file")
+
+    def test_cancelled_load_leaves_plan_untouched(self):
+        filename = os.path.join(self.dir, "big.json")
+        source = SeatingPlan()
+        with source.batch(validate=False):
+            for i in range(5000):
+                source.add_guest(f"G{i}")
+        source.save_to_file(filename)
+
+        plan = SeatingPlan()
+        plan.add_guest("Kept")
+        started = threading.Event()
+
+        def progress(done, total):
+            started.set()
+            time.sleep(0.01)
+            job.progress(done, total)
+
+        def work(job):
+            loaded = SeatingPlan()
+            loaded.load_from_file(filename, progress=progress)
+            return loaded
+
+        job = self.submit(work, on_done=plan.replace_with)
+        started.wait(5)
+        job.cancel()
+        self.root.pump()
+        self.assertEqual(self.results, [("cancelled", None)])
+        self.assertEqual([g.name for g in plan.guests.values()], ["Kept"])
+
+    def test_result_is_applied_in_one_step(self):
+        filename = os.path.join(self.dir, "plan.json")
+        source = SeatingPlan()
+        t = source.add_table("T", 4)
+        g = source.add_guest("A", size=2)
+        source.assign_guest_to_table(g.id, t.id)
+        source.save_to_file(filename)
+
+        plan = SeatingPlan()
+        events = []
+        plan.subscribe(events.append)
+
+        def work(job):
+            loaded = SeatingPlan()
+            loaded.load_from_file(filename, progress=job.progress)
+            return loaded
+
+        self.submit(work, on_done=plan.replace_with)
+        self.root.pump()
+        self.assertEqual(len(events), 1)
+        self.assertEqual(plan.fingerprint(), source.fingerprint())
+        self.assertEqual(plan.seated_head_count, 2)
+
+    def test_cancelled_save_leaves_no_file(self):
+        filename = os.path.join(self.dir, "plan.json")
+        with self.assertRaises(JobCancelled):
+            def save(path):
+                with open(path, "w") as f:
+                    f.write("partial")
+                raise JobCancelled("save")
+            save_atomically(save, filename)
+        self.assertEqual(os.listdir(self.dir), [])
+
+        plan = SeatingPlan()
+        plan.add_guest("A")
+        snapshot = plan.snapshot()
+        save_atomically(snapshot.save_to_file, filename)
+        self.assertEqual(os.listdir(self.dir), ["plan.json"])
+
+    def test_ui_stays_responsive_during_workbook_load(self):
+        filename = os.path.join(self.dir, "big.xlsx")
+        source = SeatingPlan()
+        with source.batch(validate=False):
+            for t_id in range(1, 101):
+                source.insert_table(Table(id=t_id, name=f"T{t_id}", capacity=200))
+            for g_id in range(1, 20001):
+                source.insert_guest(Guest(id=g_id, name=f"Guest {g_id}", table_id=g_id % 100 + 1 if g_id % 2 else None))
+        ExcelIO.save_to_xlsx(source, filename)
+
+        plan = SeatingPlan()
+        progress = []
+
+        def work(job):
+            loaded = SeatingPlan()
+            ExcelIO.load_from_xlsx(filename, loaded, progress=job.progress)
+            return loaded
+
+        self.submit(work, on_done=plan.replace_with, on_progress=lambda job, done, total, msg: progress.append(done))
+        # The Tk loop keeps turning while the workbook is parsed
+        gaps = []
+        last = time.perf_counter()
+        while self.root.calls:
+            due, callback = self.root.calls.pop(0)
+            time.sleep(max(0, due - time.perf_counter()))
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+            callback()
+        self.assertEqual(self.results, [])  # no error
+        self.assertEqual(plan.fingerprint(), source.fingerprint())
+        self.assertTrue(progress)
+        self.assertLess(max(gaps), 0.5)
+
+class TestMergeFrom(unittest.TestCase):
+    def test_clashing_ids_are_renumbered(self):
+        plan = SeatingPlan()
+        plan.add_table("Existing", 10)
+        plan.add_guest("Existing")
+
+        other = SeatingPlan()
+        t = other.add_table("New", 10)
+        a = other.add_guest("A")
+        b = other.add_guest("B")
+        other.assign_guest_to_table(b.id, t.id)
+        other.assign_guest_to_table(a.id, t.id)
+
+        mapping = plan.merge_from(other)
+        self.assertEqual(mapping, {2: 2, 1: 3})
+        self.assertEqual(list(plan.tables[2].guest_ids), [2, 3])
+        self.assertEqual(plan.guests[3].table_id, 2)
+        self.assertTrue(plan.validate().ok)
+
+    def test_renumber(self):
+        plan = SeatingPlan()
+        for name in ("A", "B", "C"):
+            plan.add_guest(name)
+        plan.remove_guest(2)
+        other = SeatingPlan()
+        other.add_guest("New")
+        self.assertEqual(plan.merge_from(other, renumber=True), {1: 4})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from wedding_planner.models import SeatingPlan, PlanEvent
+from wedding_planner.journal import PlanJournal
+
+class TestPlanJournal(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.path = os.path.join(self.dir, "autosave.seatplan")
+
+    def open(self, **kwargs):
+        plan = SeatingPlan()
+        journal = PlanJournal(plan, self.path, **kwargs)
+        self.addCleanup(journal.close)
+        return plan, journal
+
+    def edit(self, plan):
+        t = plan.add_table("שולחן", 10)
+        a = plan.add_guest("דוד", "Family", size=2)
+        b = plan.add_guest("Émile")
+        plan.assign_guest_to_table(a.id, t.id)
+        with plan.batch():
+            plan.update_guest(b.id, name="Emile")
+            plan.assign_guest_to_table(b.id, t.id)
+        plan.move_table(t.id, 50, 60)
+        plan.remove_guest(a.id)
+
+    def test_recovers_edits_after_crash(self):
+        plan, journal = self.open()
+        self.edit(plan)
+        # No close(): the process "dies" here
+        recovered, journal2 = self.open()
+        self.assertEqual(journal2.recovered, 7)
+        self.assertEqual(recovered.fingerprint(), plan.fingerprint())
+        self.assertEqual(recovered.tables[1].x, 50)
+
+        recovered.add_guest("After")
+        plan.add_guest("After")
+        again, _ = self.open()
+        self.assertEqual(again.fingerprint(), plan.fingerprint())
+
+    def test_compaction_folds_journal_into_snapshot(self):
+        plan, journal = self.open(compact_after=3)
+        self.edit(plan)
+        journal.wait()
+        self.assertIsNone(journal.error)
+        self.assertFalse(os.path.exists(journal.pending_path))
+        with open(journal.journal_path, encoding="utf-8") as f:
+            self.assertLess(len(f.readlines()), 1 + 7)
+
+        recovered, journal2 = self.open()
+        self.assertLess(journal2.recovered, 7)
+        self.assertEqual(recovered.fingerprint(), plan.fingerprint())
+
+    def test_crash_during_compaction(self):
+        plan, journal = self.open()
+        self.edit(plan)
+        journal._write_snapshot = lambda snapshot: None  # snapshot never lands
+        journal.compact(wait=True)
+        plan.add_guest("Late")
+        self.assertTrue(os.path.exists(journal.pending_path))
+
+        recovered, _ = self.open()
+        self.assertEqual(recovered.fingerprint(), plan.fingerprint())
+        self.assertIn("Late", [g.name for g in recovered.guests.values()])
+
+    def test_torn_last_line_is_ignored(self):
+        plan, journal = self.open()
+        self.edit(plan)
+        expected = plan.fingerprint()
+        with open(journal.journal_path, "a", encoding="utf-8") as f:
+            f.write('{"kind":"guest_added","guest_ids":[9')
+
+        recovered, journal2 = self.open()
+        self.assertEqual(recovered.fingerprint(), expected)
+        recovered.add_guest("Next")
+        plan.add_guest("Next")
+        again, _ = self.open()
+        self.assertEqual(again.fingerprint(), plan.fingerprint())
+
+    def test_large_batches_compact_immediately(self):
+        plan, journal = self.open()
+        other = SeatingPlan()
+        with other.batch(validate=False):
+            for i in range(10001):
+                other.add_guest(f"G{i}")
+        filename = os.path.join(self.dir, "big.json")
+        other.save_to_file(filename)
+        plan.load_from_file(filename)
+        self.assertEqual(os.path.getsize(journal.journal_path), len('{"base":%d}\n' % plan.fingerprint()))
+        journal.wait()  # the snapshot is written in the background
+
+        recovered, _ = self.open()
+        self.assertEqual(len(recovered.guests), 10001)
+
+    def test_large_batches_do_not_wait_for_a_compaction(self):
+        plan, journal = self.open()
+        self.edit(plan)
+        release = threading.Event()
+        self.addCleanup(release.set)
+        write = journal._write_snapshot
+        journal._write_snapshot = lambda snapshot: (release.wait(), write(snapshot))
+        journal.compact()
+        before = plan.fingerprint()
+
+        other = SeatingPlan()
+        with other.batch(validate=False):
+            for i in range(10001):
+                other.add_guest(f"G{i}")
+        filename = os.path.join(self.dir, "big.json")
+        other.save_to_file(filename)
+        plan.load_from_file(filename)  # does not block on the compaction in flight
+        plan.add_guest("After")
+        self.assertTrue(journal.compacting)
+        # Crash now: the journal gives the plan as it was before the load, never a mix
+        recovered, _ = self.open(recover=True)
+        self.assertEqual(recovered.fingerprint(), before)
+
+        release.set()
+        journal.wait()
+        recovered, _ = self.open()
+        self.assertEqual(recovered.fingerprint(), plan.fingerprint())
+
+    def test_appends_do_not_grow_with_plan(self):
+        plan, journal = self.open(compact_after=10**9)
+        with plan.batch(validate=False):
+            for i in range(5000):
+                plan.add_guest(f"G{i}")
+        size = os.path.getsize(journal.journal_path)
+        plan.update_guest(1, category="VIP")
+        self.assertLess(os.path.getsize(journal.journal_path) - size, 200)
+
+    def test_event_round_trip(self):
+        plan = SeatingPlan()
+        events = []
+        plan.subscribe(events.append)
+        self.edit(plan)
+        replayed = SeatingPlan()
+        for event in events:
+            replayed.apply_event(PlanEvent.from_dict(event.to_dict()))
+        self.assertEqual(replayed.fingerprint(), plan.fingerprint())
+
+if __name__ == '__main__':
+    unittest.main()
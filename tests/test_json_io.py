@@ -0,0 +1,101 @@
+import gzip
+import io
+import json
+import os
+import tempfile
+import unittest
+from wedding_planner.models import SeatingPlan
+from wedding_planner import json_io
+
+class TestJsonIO(unittest.TestCase):
+    def setUp(self):
+        self.plan = SeatingPlan()
+        t1 = self.plan.add_table("שולחן 1", 10, x=120, y=80)
+        self.plan.add_table('Quote "T2"', 8)
+        for i, name in enumerate(["דוד כהן", "Émile", "Back\\slash", "Plain"]):
+            g = self.plan.add_guest(name, "Family" if i % 2 else "חברים", size=i + 1)
+            if i < 2:
+                self.plan.assign_guest_to_table(g.id, t1.id)
+
+    def temp_file(self, suffix):
+        fd, filename = tempfile.mkstemp(suffix=suffix)
+        os.close(fd)
+        self.addCleanup(os.remove, filename)
+        return filename
+
+    def assert_same_plan(self, loaded):
+        self.assertEqual(loaded.fingerprint(), self.plan.fingerprint())
+        self.assertEqual([list(t.guest_ids) for t in loaded.tables.values()],
+                         [list(t.guest_ids) for t in self.plan.tables.values()])
+        self.assertEqual((loaded.next_guest_id, loaded.next_table_id),
+                         (self.plan.next_guest_id, self.plan.next_table_id))
+
+    def test_compact_round_trip(self):
+        filename = self.temp_file(".json")
+        self.plan.save_to_file(filename)
+        with open(filename, encoding="utf-8") as f:
+            text = f.read()
+        self.assertNotIn("\n", text)
+        self.assertEqual(len(json.loads(text)["guests"]), 4)
+
+        loaded = SeatingPlan()
+        loaded.load_from_file(filename)
+        self.assert_same_plan(loaded)
+
+    def test_gzip_round_trip(self):
+        filename = self.temp_file(".json.gz")
+        self.plan.save_to_file(filename)
+        with gzip.open(filename, "rt", encoding="utf-8") as f:
+            json.load(f)
+
+        loaded = SeatingPlan()
+        loaded.load_from_file(filename)
+        self.assert_same_plan(loaded)
+
+    def test_reads_legacy_indented_files(self):
+        filename = self.temp_file(".json")
+        data = {
+            "guests": [g.to_dict() for g in self.plan.guests.values()],
+            "tables": [t.to_dict() for t in self.plan.tables.values()],
+            "next_guest_id": self.plan.next_guest_id,
+            "next_table_id": self.plan.next_table_id
+        }
+        with open(filename, "w") as f:
+            json.dump(data, f, indent=4)
+
+        loaded = SeatingPlan()
+        loaded.load_from_file(filename)
+        self.assert_same_plan(loaded)
+
+    def test_parser_handles_chunk_boundaries(self):
+        out = io.StringIO()
+        json_io.write_plan(self.plan, out)
+        text = out.getvalue()
+
+        original = json_io._CHUNK
+        try:
+            for chunk in (1, 3, 7):
+                json_io._CHUNK = chunk
+                records = list(json_io.read_plan(io.StringIO(text)))
+                self.assertEqual([kind for kind, _ in records],
+                                 ["guest"] * 4 + ["table"] * 2 + ["next_guest_id", "next_table_id"])
+                self.assertEqual(records[-2][1], self.plan.next_guest_id)
+        finally:
+            json_io._CHUNK = original
+
+    def test_record_delimiters_inside_strings(self):
+        self.plan.add_guest('odd},{"id":99}] name', 'x},')
+        out = io.StringIO()
+        json_io.write_plan(self.plan, out)
+        names = [data["name"] for kind, data in json_io.read_plan(io.StringIO(out.getvalue())) if kind == "guest"]
+        self.assertEqual(names, [g.name for g in self.plan.guests.values()])
+
+    def test_empty_plan(self):
+        filename = self.temp_file(".json")
+        SeatingPlan().save_to_file(filename)
+        loaded = SeatingPlan()
+        self.assertTrue(loaded.load_from_file(filename).ok)
+        self.assertEqual(len(loaded.guests), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,5 @@
 import unittest
-from wedding_planner.models import SeatingPlan
+from wedding_planner.models import SeatingPlan, Guest, Table, CapacityError
 
 class TestSeatingPlan(unittest.TestCase):
     def setUp(self):
@@ -62,5 +62,286 @@ class TestSeatingPlan(unittest.TestCase):
         self.assertIsNone(g1.table_id)
         self.assertNotIn(g1.id, t1.guest_ids)
 
+    def test_occupancy_index(self):
+        g1 = self.plan.add_guest("G1", size=3)
+        g2 = self.plan.add_guest("G2", size=2)
+        t1 = self.plan.add_table("T1", 5)
+        t2 = self.plan.add_table("T2", 5)
+
+        self.assertEqual(self.plan.total_head_count, 5)
+        self.assertEqual(self.plan.total_capacity, 10)
+
+        self.plan.assign_guest_to_table(g1.id, t1.id)
+        self.plan.assign_guest_to_table(g2.id, t1.id)
+        self.assertEqual(self.plan.get_occupancy(t1.id), 5)
+        self.assertEqual(self.plan.seated_head_count, 5)
+
+        self.plan.assign_guest_to_table(g2.id, t2.id)
+        self.assertEqual(self.plan.get_occupancy(t1.id), 3)
+        self.assertEqual(self.plan.get_occupancy(t2.id), 2)
+
+        self.plan.update_guest(g1.id, size=4)
+        self.assertEqual(self.plan.get_occupancy(t1.id), 4)
+        self.assertEqual(self.plan.total_head_count, 6)
+
+        self.plan.remove_table(t1.id)
+        self.assertEqual(self.plan.seated_head_count, 2)
+        self.assertEqual(self.plan.unseated_head_count, 4)
+
+        self.plan.remove_guest(g2.id)
+        self.assertEqual(self.plan.get_occupancy(t2.id), 0)
+        self.assertEqual(self.plan.total_head_count, 4)
+
+    def test_change_table_id(self):
+        g1 = self.plan.add_guest("G1", size=2)
+        t1 = self.plan.add_table("T1", 5)
+        self.plan.add_table("T2", 5)
+        self.plan.assign_guest_to_table(g1.id, t1.id)
+
+        self.assertFalse(self.plan.change_table_id(t1.id, 2))
+        self.assertTrue(self.plan.change_table_id(t1.id, 10))
+        self.assertEqual(g1.table_id, 10)
+        self.assertEqual(self.plan.get_occupancy(10), 2)
+        self.assertEqual(self.plan.next_table_id, 11)
+
+    def test_load_rebuilds_indexes(self):
+        import os, tempfile
+        g1 = self.plan.add_guest("G1", size=2)
+        t1 = self.plan.add_table("T1", 5)
+        self.plan.assign_guest_to_table(g1.id, t1.id)
+
+        fd, filename = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        try:
+            self.plan.save_to_file(filename)
+            loaded = SeatingPlan()
+            loaded.load_from_file(filename)
+        finally:
+            os.remove(filename)
+
+        self.assertEqual(loaded.get_occupancy(t1.id), 2)
+        self.assertEqual(loaded.seated_head_count, 2)
+        self.assertEqual(loaded.total_capacity, 5)
+
+    def test_batch_defers_validation_and_notifies_once(self):
+        events = []
+        self.plan.subscribe(events.append)
+        table = self.plan.add_table("T1", 3)
+        guests = [self.plan.add_guest(f"G{i}") for i in range(3)]
+        events.clear()
+
+        with self.plan.batch():
+            for g in guests:
+                self.plan.assign_guest_to_table(g.id, table.id)
+            self.assertEqual(events, [])
+
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].kind, "committed")
+        self.assertEqual(events[0].guest_ids, {g.id for g in guests})
+        self.assertIn(table.id, events[0].table_ids)
+        self.assertEqual(self.plan.get_occupancy(table.id), 3)
+        self.assertEqual(self.plan.seated_head_count, 3)
+
+    def test_batch_rolls_back_on_capacity_error(self):
+        table = self.plan.add_table("T1", 2)
+        g1 = self.plan.add_guest("G1")
+        g2 = self.plan.add_guest("G2", size=2)
+        self.plan.assign_guest_to_table(g1.id, table.id)
+
+        with self.assertRaises(CapacityError):
+            with self.plan.batch():
+                self.plan.add_guest("New")
+                self.plan.assign_guest_to_table(g2.id, table.id)
+
+        self.assertEqual(list(table.guest_ids), [g1.id])
+        self.assertIsNone(g2.table_id)
+        self.assertEqual(len(self.plan.guests), 2)
+        self.assertEqual(self.plan.next_guest_id, 3)
+        self.assertEqual(self.plan.get_occupancy(table.id), 1)
+
+    def test_batch_rolls_back_on_exception(self):
+        table = self.plan.add_table("T1", 5)
+        g1 = self.plan.add_guest("G1")
+
+        with self.assertRaises(RuntimeError):
+            with self.plan.batch():
+                self.plan.assign_guest_to_table(g1.id, table.id)
+                self.plan.update_table(table.id, name="Renamed")
+                self.plan.remove_table(table.id)
+                raise RuntimeError("boom")
+
+        self.assertIs(self.plan.tables[table.id], table)
+        self.assertEqual(table.name, "T1")
+        self.assertIsNone(g1.table_id)
+        self.assertEqual(self.plan.total_capacity, 5)
+
+    def test_typed_events(self):
+        events = []
+        t1 = self.plan.add_table("T1", 5)
+        t2 = self.plan.add_table("T2", 5)
+        g1 = self.plan.add_guest("G1")
+        self.plan.subscribe(events.append)
+
+        self.plan.assign_guest_to_table(g1.id, t1.id)
+        self.plan.assign_guest_to_table(g1.id, t2.id)
+        self.plan.move_table(t1.id, 250, 300)
+        self.plan.update_table(t2.id, capacity=8)
+        self.plan.update_guest(g1.id, name="Renamed")
+
+        self.assertEqual([e.kind for e in events],
+                         ["guest_seated", "guest_seated", "table_moved", "table_resized", "guest_updated"])
+        moved = events[1]
+        self.assertEqual((moved.old_table_id, moved.new_table_id), (t1.id, t2.id))
+        self.assertEqual(moved.table_ids, {t1.id, t2.id})
+        self.assertEqual(events[2].old, {"x": 100, "y": 100})
+        self.assertEqual(events[3].old, {"capacity": 5})
+        self.assertEqual(events[4].old, {"name": "G1"})
+        self.assertEqual(events[4].table_ids, {t2.id})
+
+    def test_batch_event_carries_deltas(self):
+        events = []
+        table = self.plan.add_table("T1", 5)
+        self.plan.subscribe(events.append)
+
+        with self.plan.batch():
+            guest = self.plan.add_guest("G1")
+            self.plan.assign_guest_to_table(guest.id, table.id)
+
+        self.assertEqual(len(events), 1)
+        self.assertEqual([e.kind for e in events[0].events], ["guest_added", "guest_seated"])
+
+    def test_guest_id_list_keeps_order(self):
+        table = self.plan.add_table("Banquet", 100)
+        guests = [self.plan.add_guest(f"G{i}") for i in range(60)]
+        for g in guests:
+            self.plan.assign_guest_to_table(g.id, table.id)
+
+        self.plan.unseat_guest(guests[10].id)
+        expected = [g.id for g in guests if g is not guests[10]]
+        self.assertEqual(list(table.guest_ids), expected)
+        self.assertEqual(table.guest_ids[10], guests[11].id)
+        self.assertEqual(table.to_dict()["guest_ids"], expected)
+        self.assertIsInstance(table.to_dict()["guest_ids"], list)
+
+        with self.assertRaises(ValueError):
+            table.guest_ids.remove(guests[10].id)
+
+    def test_unseat_table(self):
+        table = self.plan.add_table("T1", 10)
+        guests = [self.plan.add_guest(f"G{i}", size=2) for i in range(4)]
+        for g in guests:
+            self.plan.assign_guest_to_table(g.id, table.id)
+
+        self.plan.unseat_table(table.id)
+        self.assertEqual(len(table.guest_ids), 0)
+        self.assertTrue(all(g.table_id is None for g in guests))
+        self.assertEqual(self.plan.get_occupancy(table.id), 0)
+        self.assertEqual(self.plan.seated_head_count, 0)
+
+    def test_secondary_indexes(self):
+        table = self.plan.add_table("T1", 10)
+        david = self.plan.add_guest("David Cohen", "Family")
+        dana = self.plan.add_guest("dana levi", "Friends")
+        moshe = self.plan.add_guest("Moshe Cohen", "Family")
+
+        self.assertEqual(self.plan.search_guests("co"), {david.id, moshe.id})
+        self.assertEqual(self.plan.search_guests("DA"), {david.id, dana.id})
+        self.assertEqual(self.plan.search_guests("david co"), {david.id})
+        self.assertEqual(self.plan.search_guests("ami", column="Category"), {david.id, moshe.id})
+        self.assertEqual(self.plan.guests_in_category("Family"), {david.id, moshe.id})
+
+        self.plan.assign_guest_to_table(david.id, table.id)
+        self.assertEqual(self.plan.unseated_ids, {dana.id, moshe.id})
+        self.assertEqual(self.plan.search_guests("co", unseated_only=True), {moshe.id})
+
+        self.plan.update_guest(moshe.id, name="Moshe Levi", category="Friends")
+        self.assertEqual(self.plan.search_guests("levi"), {dana.id, moshe.id})
+        self.assertEqual(self.plan.search_guests("cohen"), {david.id})
+        self.assertEqual(self.plan.categories, ["Family", "Friends"])
+
+        self.plan.remove_guest(david.id)
+        self.assertEqual(self.plan.categories, ["Friends"])
+        self.assertEqual(self.plan.search_guests("cohen"), set())
+
+        # Batches rebuild the indexes on commit
+        with self.plan.batch():
+            extra = self.plan.add_guest("Cohen Extra", "Family")
+        self.assertEqual(self.plan.search_guests("cohen"), {extra.id})
+        self.assertIn(extra.id, self.plan.unseated_ids)
+
+    def build_sample(self, plan, reverse=False):
+        tables = [("Head", 10, 50, 60), ("Family", 8, 300, 60)]
+        guests = [("דוד כהן", "Family", 2, 0), ("Bob", "Friends", 1, 1), ("Carol", "Work", 3, None)]
+        for t_id, (name, cap, x, y) in sorted(enumerate(tables, start=1), reverse=reverse):
+            plan.insert_table(Table(id=t_id, name=name, capacity=cap, x=x, y=y))
+        for g_id, (name, cat, size, seat) in sorted(enumerate(guests, start=1), reverse=reverse):
+            plan.insert_guest(Guest(id=g_id, name=name, category=cat, size=size,
+                                    table_id=None if seat is None else seat + 1))
+        return plan
+
+    def test_fingerprint_is_order_independent_and_incremental(self):
+        a = self.build_sample(SeatingPlan())
+        b = self.build_sample(SeatingPlan(), reverse=True)
+        self.assertEqual(a.fingerprint(), b.fingerprint())
+        self.assertEqual(a.table_fingerprints(), b.table_fingerprints())
+
+        before = a.table_fingerprints()
+        a.move_table(1, 70, 80)
+        a.assign_guest_to_table(3, 2)
+        a.update_guest(2, name="Robert")
+        self.assertNotEqual(a.fingerprint(), b.fingerprint())
+        self.assertNotEqual(a.table_fingerprint(1), before[1])
+
+        # The incrementally maintained hash matches one computed from scratch
+        incremental = (a.fingerprint(), a.table_fingerprints())
+        a.rebuild_indexes()
+        self.assertEqual((a.fingerprint(), a.table_fingerprints()), incremental)
+
+        # Undoing the edits restores the original hash
+        a.update_guest(2, name="Bob")
+        a.unseat_guest(3)
+        a.move_table(1, 50, 60)
+        self.assertEqual(a.fingerprint(), b.fingerprint())
+        self.assertEqual(a.table_fingerprints(), before)
+
+    def test_fingerprint_survives_json_round_trip(self):
+        import os, tempfile
+        plan = self.build_sample(SeatingPlan())
+        fd, filename = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        try:
+            plan.save_to_file(filename)
+            loaded = SeatingPlan()
+            loaded.load_from_file(filename)
+        finally:
+            os.remove(filename)
+        self.assertEqual(loaded.fingerprint(), plan.fingerprint())
+        self.assertEqual(loaded.table_fingerprints(), plan.table_fingerprints())
+
+    def test_revision_counts_committed_changes(self):
+        t1 = self.plan.add_table("T1", 2)
+        t2 = self.plan.add_table("T2", 2)
+        g = self.plan.add_guest("G", size=2)
+        start = self.plan.revision
+
+        self.plan.assign_guest_to_table(g.id, t1.id)
+        self.assertEqual(self.plan.revision, start + 1)
+        self.assertEqual(self.plan.table_revision(t1.id), self.plan.revision)
+        self.assertLess(self.plan.table_revision(t2.id), self.plan.revision)
+
+        with self.plan.batch():
+            self.plan.add_guest("H")
+            self.plan.update_table(t2.id, name="Two")
+        self.assertEqual(self.plan.revision, start + 2)
+        self.assertEqual(self.plan.table_revision(t2.id), self.plan.revision)
+
+        fingerprint = self.plan.fingerprint()
+        with self.assertRaises(CapacityError):
+            with self.plan.batch():
+                self.plan.add_guest("Too many", size=1)
+                self.plan.assign_guest_to_table(self.plan.next_guest_id - 1, t1.id)
+        self.assertEqual(self.plan.revision, start + 2)
+        self.assertEqual(self.plan.fingerprint(), fingerprint)
+
 if __name__ == '__main__':
     unittest.main()
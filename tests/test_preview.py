@@ -0,0 +1,131 @@
+import csv
+import os
+import re
+import shutil
+import tempfile
+import time
+import unittest
+import zipfile
+from unittest import mock
+import openpyxl
+from openpyxl import Workbook
+from openpyxl.cell.rich_text import CellRichText, TextBlock
+from openpyxl.cell.text import InlineFont
+from wedding_planner.excel_io import ExcelIO
+from wedding_planner.models import SeatingPlan
+from wedding_planner.preview import read_sample
+from wedding_planner.workbook_cache import WorkbookCache
+
+ROWS = [["Group", "Count", "Side"], ["משפחת כהן", 4, "כלה"], ["عائلة حداد", "x", None], ["Levi", 0, "Groom"],
+        [None, 3, "Groom"], ["Short", 2.0, None]]
+
+class TestImportPreview(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.addCleanup(setattr, ExcelIO, "cache", ExcelIO.cache)
+        ExcelIO.cache = WorkbookCache()
+
+    def workbook(self, name, rows, write_only=False):
+        filename = os.path.join(self.dir, name)
+        wb = Workbook(write_only=write_only)
+        ws = wb.create_sheet() if write_only else wb.active
+        for row in rows:
+            ws.append(row)
+        wb.save(filename)
+        return filename
+
+    def test_flags_what_the_import_would_guess(self):
+        filename = self.workbook("groups.xlsx", ROWS)
+        sample = read_sample(filename)
+        self.assertEqual(sample.headers, ["Group", "Count", "Side"])
+        # Same values as openpyxl reads
+        ws = openpyxl.load_workbook(filename, read_only=True, data_only=True).active
+        self.assertEqual(sample.rows, list(ws.iter_rows(values_only=True)))
+
+        preview = sample.preview("Group", "Count", "Side")
+        self.assertTrue(preview.exact)
+        self.assertEqual([(r.line, r.name, r.count, r.category) for r in preview.rows],
+                         [(2, "משפחת כהן", 4, "כלה"), (3, "عائلة حداد", 1, "عائلة حداد"), (4, "Levi", 0, "Groom"),
+                          (5, "", 0, ""), (6, "Short", 2, "Short")])
+        self.assertEqual([r.line for r in preview.bad_counts], [3])
+        self.assertEqual([r.line for r in preview.rows if r.skipped], [4, 5])
+
+        # The head count is what the import really adds
+        plan = SeatingPlan()
+        ExcelIO.import_groups_to_plan(filename, "Group", "Count", plan, "Side")
+        self.assertEqual(preview.estimated_head_count, plan.total_head_count)
+        self.assertIn("1 of the rows shown", preview.summary())
+
+    def test_large_files_are_sampled(self):
+        rows = [["Group", "Count"]] + [[f"Family {i}", i % 4 + 1] for i in range(20_000)]
+        heads = sum(row[1] for row in rows[1:])
+        sized = self.workbook("sized.xlsx", rows)
+        # Write-only saves have no <dimension>; the rows are counted instead
+        unsized = self.workbook("unsized.xlsx", rows, write_only=True)
+        with open(os.path.join(self.dir, "groups.tsv"), "w", newline="", encoding="utf-16") as f:
+            csv.writer(f, delimiter="\t").writerows(rows)
+
+        for filename in (sized, unsized, os.path.join(self.dir, "groups.tsv")):
+            with self.subTest(os.path.basename(filename)):
+                with mock.patch("openpyxl.load_workbook") as load:
+                    start = time.perf_counter()
+                    preview = read_sample(filename, sample_rows=40).preview("Group", "Count")
+                    elapsed = time.perf_counter() - start
+                    load.assert_not_called()
+                self.assertLess(elapsed, 0.5)
+                self.assertFalse(preview.exact)
+                self.assertEqual((len(preview.rows), preview.sampled_rows, preview.estimated_rows), (40, 40, 20_000))
+                self.assertAlmostEqual(preview.estimated_head_count / heads, 1, delta=0.05)
+                self.assertIn("about 20,000 rows", preview.summary())
+
+        # Once imported, the cached rows give exact figures
+        ExcelIO.read_groups(sized, "Group", "Count")
+        preview = read_sample(sized).preview("Group", "Count")
+        self.assertTrue(preview.exact)
+        self.assertEqual(preview.estimated_head_count, sum(row[1] for row in rows[1:51]))
+
+    def test_blank_rows(self):
+        wb = Workbook()
+        ws = wb.active
+        ws.append(["Group", "Count"])
+        for line in range(3, 3000, 3):  # two blank rows before each group
+            ws.cell(line, 1, f"Family {line}")
+            ws.cell(line, 2, 2)
+        sized = os.path.join(self.dir, "gaps.xlsx")
+        wb.save(sized)
+        # The same sheet without <dimension>
+        unsized = os.path.join(self.dir, "gaps-unsized.xlsx")
+        with zipfile.ZipFile(sized) as src, zipfile.ZipFile(unsized, "w") as dst:
+            for item in src.infolist():
+                data = src.read(item)
+                if item.filename == "xl/worksheets/sheet1.xml":
+                    data = re.sub(rb"<dimension [^>]*/>", b"", data)
+                dst.writestr(item, data)
+        ws = openpyxl.load_workbook(sized, read_only=True, data_only=True).active
+
+        small = read_sample(sized)
+        self.assertEqual(small.rows, list(ws.iter_rows(values_only=True, max_row=51)))
+        self.assertEqual([r.line for r in small.preview("Group", "Count").rows[:3]], [3, 6, 9])
+        for filename in (sized, unsized):
+            with self.subTest(os.path.basename(filename)):
+                preview = read_sample(filename, sample_rows=40).preview("Group", "Count")
+                self.assertFalse(preview.exact)
+                self.assertEqual((preview.sampled_rows, preview.estimated_rows), (40, 2996))
+                self.assertEqual([r.line for r in preview.rows], list(range(3, 42, 3)))
+                self.assertAlmostEqual(preview.estimated_head_count / (2 * 999), 1, delta=0.05)
+
+    def test_shared_and_rich_text(self):
+        wb = Workbook()
+        wb.active.append(["Name", "Count"])
+        wb.active.append([CellRichText(TextBlock(InlineFont(b=True), "משפחת "), "לוי"), 3])
+        wb.active.append(["=CONCAT(A2)", True])
+        filename = os.path.join(self.dir, "rich.xlsx")
+        wb.save(filename)
+        sample = read_sample(filename)
+        self.assertEqual(sample.rows[1], ("משפחת לוי", 3))
+        # No cached formula results in an openpyxl save: the cell reads as empty, like data_only does
+        self.assertEqual(sample.rows[2], (None, True))
+
+if __name__ == '__main__':
+    unittest.main()
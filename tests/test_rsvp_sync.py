@@ -0,0 +1,176 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from openpyxl import Workbook
+from wedding_planner.models import SeatingPlan
+from wedding_planner.excel_io import ExcelIO
+from wedding_planner.jobs import JobRunner
+from wedding_planner.rsvp_sync import RsvpSync, RsvpWatcher
+
+class TestRsvpSync(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.filename = os.path.join(self.dir, "rsvp.xlsx")
+        self.plan = SeatingPlan()
+        self.table = self.plan.add_table("T1", 8)
+
+    def write(self, rows, headers=("Group", "Count", "Side")):
+        wb = Workbook()
+        ws = wb.active
+        ws.append(list(headers))
+        for row in rows:
+            ws.append(list(row))
+        wb.save(self.filename)
+
+    def names(self):
+        return {g.name: (g.size, g.category, g.table_id) for g in self.plan.guests.values()}
+
+    def test_first_sync_adds_groups_and_links_existing_guests(self):
+        kept = self.plan.add_guest("Cohen", "Bride", size=3)
+        self.plan.assign_guest_to_table(kept.id, self.table.id)
+        self.plan.add_guest("Walk-in", "Friends")
+        self.write([("COHEN", 3, "Bride"), ("Levi", 2, "Groom")])
+
+        sync = RsvpSync(self.plan, self.filename, "Group", "Count", "Side")
+        result = sync.sync()
+        self.assertEqual(len(result.added), 1)
+        self.assertEqual(self.names(), {"Cohen": (3, "Bride", self.table.id), "Walk-in": (1, "Friends", None),
+                                        "Levi": (2, "Groom", None)})
+        self.assertFalse(sync.sync().changed)
+
+    def test_deltas_keep_seats(self):
+        self.write([("Cohen", 3, "Bride"), ("Levi", 2, "Groom"), ("Mizrahi", 2, "Groom")])
+        sync = RsvpSync(self.plan, self.filename, "Group", "Count", "Side")
+        sync.sync()
+        ids = {g.name: g.id for g in self.plan.guests.values()}
+        for name in ("Cohen", "Levi"):
+            self.plan.assign_guest_to_table(ids[name], self.table.id)
+        manual = self.plan.add_guest("Rabbi", "Family")
+
+        # Levi grows past the table, Cohen grows within it, Mizrahi declines, Peretz is new
+        self.write([("Cohen", 4, "Family"), ("Levi", 5, "Groom"), ("Peretz", 1, "Bride")])
+        events = []
+        self.plan.subscribe(events.append)
+        result = sync.sync()
+        self.assertEqual(len(events), 1)  # one undo step
+        self.assertEqual(result.resized, [ids["Cohen"], ids["Levi"]])
+        self.assertEqual(result.unseated, [ids["Levi"]])
+        self.assertEqual(result.removed, [ids["Mizrahi"]])
+        self.assertEqual(result.recategorized, [ids["Cohen"]])
+        self.assertEqual(self.names(), {"Cohen": (4, "Family", self.table.id), "Levi": (5, "Groom", None),
+                                        "Peretz": (1, "Bride", None), "Rabbi": (1, "Family", None)})
+        self.assertIn(manual.id, self.plan.guests)
+        self.assertTrue(self.plan.validate().ok)
+
+    def test_plan_edits_survive_unchanged_rows(self):
+        self.write([("Cohen", 3, "Bride"), ("Levi", 2, "Groom")])
+        sync = RsvpSync(self.plan, self.filename, "Group", "Count", "Side")
+        sync.sync()
+        cohen, levi = list(self.plan.guests)
+        self.plan.update_guest(cohen, category="VIP")
+        self.plan.remove_guest(levi)
+        self.write([("Cohen", 3, "Bride"), ("Levi", 2, "Groom"), ("Dahan", 2, "Groom")])
+        result = sync.sync()
+        self.assertEqual(len(result.added), 1)
+        self.assertEqual(self.names(), {"Cohen": (3, "VIP", None), "Dahan": (2, "Groom", None)})
+
+    def test_key_column_tracks_renames(self):
+        headers = ("ID", "Group", "Count")
+        self.write([(1, "Cohen", 3), (2, "Levi", 2)], headers)
+        sync = RsvpSync(self.plan, self.filename, "Group", "Count", key_col="ID")
+        sync.sync()
+        first = next(iter(self.plan.guests))
+        self.plan.assign_guest_to_table(first, self.table.id)
+        self.write([(1, "Cohen-Levy", 3), (2, "Levi", 2)], headers)
+        result = sync.sync()
+        self.assertEqual(result.renamed, [first])
+        self.assertEqual(self.plan.guests[first].name, "Cohen-Levy")
+        self.assertEqual(self.plan.guests[first].table_id, self.table.id)
+
+    def test_cost_follows_changes(self):
+        rows = [(f"Group {i}", 2, "Side") for i in range(20000)]
+        self.write(rows)
+        sync = RsvpSync(self.plan, self.filename, "Group", "Count", "Side")
+        sync.sync()
+        rows[5] = ("Group 5", 3, "Side")
+        self.write(rows)
+        sheet = sync.read()
+        touched = []
+        self.plan.subscribe(lambda event: touched.append(event.guest_ids))
+        with mock.patch.object(SeatingPlan, "rebuild_indexes") as rebuild:
+            result = sync.apply(sheet)
+            rebuild.assert_not_called()
+        self.assertEqual(len(result.resized), 1)
+        self.assertEqual(touched, [{result.resized[0]}])
+        self.assertEqual(self.plan.total_head_count, 40001)
+
+    def test_replaced_plan_is_left_alone(self):
+        self.write([("Cohen", 3, "Bride"), ("Levi", 2, "Groom")])
+        sync = RsvpSync(self.plan, self.filename, "Group", "Count", "Side")
+        sync.sync()
+        other = SeatingPlan()
+        other.add_guest("Jones", "Friends", size=2)
+        other.add_guest("Smith", "Friends")
+        self.plan.replace_with(other)
+        self.write([("Levi", 2, "Groom")])
+        self.assertTrue(sync.detached)
+        with self.assertRaises(RuntimeError):
+            sync.sync()
+        self.assertEqual(self.names(), {"Jones": (2, "Friends", None), "Smith": (1, "Friends", None)})
+
+class FakeRoot:
+    def __init__(self):
+        self.calls = []
+
+    def after(self, ms, callback):
+        self.calls.append(callback)
+
+    def run(self, steps):
+        for _ in range(steps):
+            self.calls.pop(0)()
+            time.sleep(0.01)
+
+class TestRsvpWatcher(unittest.TestCase):
+    def test_resyncs_when_the_file_changes(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        filename = os.path.join(tmp, "rsvp.xlsx")
+        wb = Workbook()
+        wb.active.append(["Group", "Count"])
+        wb.active.append(["Cohen", 2])
+        wb.save(filename)
+
+        plan = SeatingPlan()
+        root = FakeRoot()
+        results = []
+        watcher = RsvpWatcher(root, RsvpSync(plan, filename, "Group", "Count"), JobRunner(root, poll_ms=1),
+                              interval_ms=1, on_sync=results.append)
+        watcher.start()
+        root.run(20)
+        self.assertEqual([g.name for g in plan.guests.values()], ["Cohen"])
+
+        wb.active.append(["Levi", 3])
+        wb.save(filename)
+        os.utime(filename, ns=(time.time_ns(), time.time_ns() + 10**9))
+        root.run(20)
+        self.assertEqual([g.name for g in plan.guests.values()], ["Cohen", "Levi"])
+        self.assertEqual([len(r.added) for r in results], [1, 1])
+
+        # Another plan opened: the watcher stops instead of applying stale links
+        plan.clear()
+        plan.add_guest("Jones")
+        wb.active.append(["Dahan", 1])
+        wb.save(filename)
+        os.utime(filename, ns=(time.time_ns(), time.time_ns() + 2 * 10**9))
+        root.run(len(root.calls))
+        self.assertFalse(watcher.running)
+        self.assertEqual(root.calls, [])
+        self.assertEqual([g.name for g in plan.guests.values()], ["Jones"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import tempfile
+import threading
+import unittest
+from wedding_planner.models import SeatingPlan
+from wedding_planner.excel_io import ExcelIO
+
+class TestPlanSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.plan = SeatingPlan()
+        self.t1 = self.plan.add_table("T1", 10, x=10, y=20)
+        self.t2 = self.plan.add_table("T2", 10)
+        self.alice = self.plan.add_guest("Alice", "Family", 2)
+        self.bob = self.plan.add_guest("Bob", "Friends")
+        self.plan.assign_guest_to_table(self.alice.id, self.t1.id)
+
+    def state(self, source):
+        guests = sorted(str(source.guests[g_id].to_dict()) for g_id in source.guests)
+        tables = sorted(str(source.tables[t_id].to_dict()) for t_id in source.tables)
+        return guests, tables
+
+    def test_snapshot_is_isolated_from_later_changes(self):
+        before = self.state(self.plan)
+        fingerprint = self.plan.fingerprint()
+        snapshot = self.plan.snapshot()
+
+        self.plan.move_table(self.t1.id, 500, 500)
+        self.plan.update_guest(self.alice.id, name="Alicia")
+        self.plan.assign_guest_to_table(self.alice.id, self.t2.id)
+        self.plan.assign_guest_to_table(self.bob.id, self.t1.id)
+        self.plan.add_guest("Carol")
+        self.plan.remove_table(self.t2.id)
+        self.plan.change_table_id(self.t1.id, 7)
+
+        self.assertEqual(self.state(snapshot), before)
+        self.assertEqual(snapshot.fingerprint(), fingerprint)
+        self.assertEqual(snapshot.get_occupancy(1), 2)
+        self.assertEqual(list(snapshot.tables[1].guest_ids), [self.alice.id])
+        # The live objects kept their identity and got the changes
+        self.assertEqual((self.t1.x, self.t1.id), (500, 7))
+
+    def test_snapshot_records_are_copies(self):
+        snapshot = self.plan.snapshot()
+        snapshot.guests[self.bob.id].name = "Changed"
+        self.assertEqual(self.plan.guests[self.bob.id].name, "Bob")
+        self.assertEqual(snapshot.guests[self.bob.id].name, "Bob")
+
+    def test_writers_accept_snapshots(self):
+        snapshot = self.plan.snapshot()
+        fingerprint = snapshot.fingerprint()
+        self.plan.clear()
+
+        fd, filename = tempfile.mkstemp(suffix=".xlsx")
+        os.close(fd)
+        try:
+            ExcelIO.save_to_xlsx(snapshot, filename)
+            loaded = SeatingPlan()
+            ExcelIO.load_from_xlsx(filename, loaded)
+        finally:
+            os.remove(filename)
+        self.assertEqual(loaded.fingerprint(), fingerprint)
+
+    def test_compact_store_snapshot(self):
+        plan = SeatingPlan(compact=True)
+        table = plan.add_table("T", 4)
+        guest = plan.add_guest("G", size=2)
+        snapshot = plan.snapshot()
+        plan.assign_guest_to_table(guest.id, table.id)
+        plan.remove_guest(guest.id)
+        self.assertIsNone(snapshot.guests[guest.id].table_id)
+        self.assertEqual(snapshot.guests[guest.id].size, 2)
+
+    def test_release_stops_tracking(self):
+        snapshot = self.plan.snapshot()
+        snapshot.release()
+        self.plan.move_table(self.t1.id, 1, 1)
+        self.assertEqual(self.plan._snapshots, [])
+
+    def test_background_reader_sees_consistent_state(self):
+        for i in range(200):
+            g = self.plan.add_guest(f"G{i}")
+            if i < 16:
+                self.plan.assign_guest_to_table(g.id, self.t2.id if i % 2 else self.t1.id)
+        expected = self.state(self.plan)
+        snapshot = self.plan.snapshot()
+        results = []
+
+        def reader():
+            for _ in range(20):
+                results.append(self.state(snapshot) == expected)
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+        for i, g_id in enumerate(list(self.plan.guests)):
+            self.plan.update_guest(g_id, name=f"Renamed {i}")
+            if i % 3 == 0:
+                self.plan.unseat_guest(g_id)
+            self.plan.move_table(self.t1.id, i, i)
+        thread.join()
+        self.assertTrue(results and all(results))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from wedding_planner.models import Guest, SeatingPlan, Table
+from wedding_planner.sqlite_store import SqlitePlanStore
+
+class TestSqliteStore(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.path = os.path.join(self.dir, "plan.sqlite")
+
+        self.plan = SeatingPlan()
+        self.t1 = self.plan.add_table("שולחן 1", 10, x=120, y=80)
+        self.t2 = self.plan.add_table("T2", 4)
+        for i, name in enumerate(["דוד כהן", "Émile Zola", "Dana", "Plain", "Zoë"]):
+            g = self.plan.add_guest(name, "Family" if i % 2 else "חברים", size=i % 3 + 1)
+            if i < 3:
+                self.plan.assign_guest_to_table(g.id, self.t1.id if i else self.t2.id)
+        self.plan.assign_guest_to_table(1, self.t1.id)  # seat order differs from id order
+
+    def store(self, **kwargs):
+        store = SqlitePlanStore(self.path, **kwargs)
+        self.addCleanup(store.close)
+        return store
+
+    def reopen(self, **kwargs):
+        store = self.store()
+        return store.open_plan(**kwargs)
+
+    def test_file_round_trip(self):
+        self.plan.save_to_file(self.path)
+        loaded = SeatingPlan()
+        self.assertTrue(loaded.load_from_file(self.path).ok)
+        self.assertEqual(loaded.fingerprint(), self.plan.fingerprint())
+        self.assertEqual(list(loaded.tables[self.t1.id].guest_ids), list(self.t1.guest_ids))
+        self.assertEqual((loaded.next_guest_id, loaded.next_table_id),
+                         (self.plan.next_guest_id, self.plan.next_table_id))
+        with self.store() as store:
+            mode, = store._conn.execute("PRAGMA journal_mode").fetchone()
+        self.assertEqual(mode, "wal")
+
+    def test_edits_are_written_back(self):
+        self.store().save(self.plan)
+        store = self.store()
+        plan = store.open_plan()
+        for p in (plan, self.plan):
+            p.update_guest(2, name="Emile", category="Work")
+            p.remove_guest(3)
+            p.assign_guest_to_table(4, self.t1.id)
+            p.remove_table(self.t2.id)
+            p.add_guest("New")
+            p.move_table(self.t1.id, 5, 6)
+        store.close()
+
+        reloaded = self.reopen()
+        self.assertEqual(reloaded.fingerprint(), self.plan.fingerprint())
+        self.assertEqual(list(reloaded.tables[self.t1.id].guest_ids), list(self.t1.guest_ids))
+
+    def test_partial_loads(self):
+        self.store().save(self.plan)
+        unseated = self.reopen(table_ids=(), unseated=True)
+        self.assertEqual(set(unseated.guests), {4, 5})
+        self.assertEqual(len(unseated.tables), 0)
+
+        room = self.reopen(table_ids=[self.t1.id], unseated=False)
+        self.assertEqual(set(room.guests), {1, 2, 3})
+        self.assertEqual(list(room.tables), [self.t1.id])
+        self.assertEqual(room.get_occupancy(self.t1.id), self.plan.get_occupancy(self.t1.id))
+        self.assertTrue(room.validate().ok)
+
+    def test_partial_edits_leave_the_rest_alone(self):
+        self.store().save(self.plan)
+        store = self.store()
+        room = store.open_plan(table_ids=[self.t1.id], unseated=False)
+        added = room.add_guest("Walk-in")
+        self.assertEqual(added.id, self.plan.next_guest_id)  # no clash with unloaded guests
+        room.assign_guest_to_table(added.id, self.t1.id)
+        room.clear()
+        store.close()
+
+        self.plan.remove_table(self.t1.id)
+        for g_id in (1, 2, 3):
+            self.plan.remove_guest(g_id)
+        full = self.reopen()
+        self.assertEqual(full.fingerprint(), self.plan.fingerprint())
+        self.assertEqual(set(full.guests), {4, 5})
+        self.assertEqual(full.next_guest_id, 7)
+
+    def test_partial_plans_keep_off_unloaded_table_ids(self):
+        self.store().save(self.plan)
+        store = self.store()
+        room = store.open_plan(table_ids=[self.t1.id], unseated=False)
+        self.assertFalse(room.change_table_id(self.t1.id, self.t2.id))
+        other = SeatingPlan()
+        other.insert_table(Table(id=self.t2.id, name="Imported", capacity=2))
+        room.merge_from(other)
+        imported = max(room.tables)
+        self.assertEqual(room.tables[imported].name, "Imported")
+        self.assertNotEqual(imported, self.t2.id)
+        self.assertTrue(room.change_table_id(self.t1.id, 20))
+        # A row the plan did not load is never replaced, even if the plan asks to
+        room.insert_table(Table(id=self.t2.id, name="Clash", capacity=2))
+        with self.assertRaises(sqlite3.IntegrityError):
+            store.flush()
+        self.assertIn(self.t2.id, store._pending_tables)  # still pending, nothing lost
+        room.remove_table(self.t2.id)
+        store.close()
+
+        full = self.reopen()
+        self.assertEqual(set(full.tables), {self.t2.id, 20, imported})
+        self.assertEqual(full.tables[self.t2.id].name, "T2")
+        self.assertEqual(list(full.tables[20].guest_ids), list(self.t1.guest_ids))
+
+    def test_partial_plans_keep_off_unloaded_guest_ids(self):
+        plan = SeatingPlan()
+        t1, t2 = plan.add_table("T1", 4), plan.add_table("T2", 4)
+        plan.assign_guest_to_table(plan.add_guest("A").id, t1.id)
+        plan.assign_guest_to_table(plan.add_guest("B").id, t2.id)
+        self.store().save(plan)
+        store = self.store()
+        room = store.open_plan(table_ids=[t1.id], unseated=False)
+        other = SeatingPlan()
+        other.add_guest("X")
+        other.add_guest("Y")
+        room.merge_from(other)
+        store.flush()
+        rows = store._conn.execute("SELECT id, name, table_id FROM guests ORDER BY id").fetchall()
+        self.assertEqual(rows, [(1, "A", t1.id), (2, "B", t2.id), (3, "X", None), (4, "Y", None)])
+
+        # A row the plan did not load is never replaced, even if the plan asks to
+        room.insert_guest(Guest(id=2, name="Clash"))
+        with self.assertRaises(sqlite3.IntegrityError):
+            store.flush()
+        room.remove_guest(2)
+        store.close()
+        self.assertEqual(self.reopen().guests[2].name, "B")
+
+    def test_writes_are_batched(self):
+        self.store().save(self.plan)
+        store = self.store(batch_size=100)
+        plan = store.open_plan()
+        for i in range(20):
+            plan.update_guest(4, name=f"Name {i}")
+        self.assertEqual(store.pending, 1)
+        self.assertEqual(store.find_guests(name_prefix="name 19")[0].id, 4)  # queries flush first
+        self.assertEqual(store.pending, 0)
+
+    def test_indexed_queries(self):
+        self.store().save(self.plan)
+        store = self.store()
+        self.assertEqual([g.id for g in store.find_guests(category="Family")], [2, 4])
+        self.assertEqual([g.id for g in store.find_guests(unseated=True)], [4, 5])
+        self.assertEqual([g.name for g in store.find_guests(name_prefix="ÉMILE")], ["Émile Zola"])
+        self.assertEqual([g.id for g in store.find_guests(table_id=self.t1.id)], [1, 2, 3])
+        self.assertEqual(store.head_counts(), (self.plan.total_head_count, self.plan.seated_head_count))
+        self.assertEqual(set(store.categories()), set(self.plan.categories))
+
+        for where in ("table_id IS NULL", "category = 'Family'", "name_key >= 'a' AND name_key < 'b'"):
+            plan = " ".join(row[-1] for row in store._conn.execute(
+                f"EXPLAIN QUERY PLAN SELECT id FROM guests WHERE {where}"))
+            self.assertIn("USING", plan)
+            self.assertIn("INDEX", plan)
+
+    def test_not_a_database(self):
+        with open(self.path, "wb") as f:
+            f.write(b"SQLite format 3\0" + b"\xff" * 200)
+        loaded = SeatingPlan()
+        with self.assertRaises(ValueError):
+            loaded.load_from_file(self.path)
+
+if __name__ == '__main__':
+    unittest.main()
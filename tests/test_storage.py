@@ -0,0 +1,89 @@
+import unittest
+from wedding_planner.models import SeatingPlan, Guest, CapacityError
+from wedding_planner.storage import ColumnarGuestStore, GuestView
+
+class TestColumnarGuestStore(unittest.TestCase):
+    def setUp(self):
+        self.store = ColumnarGuestStore()
+
+    def test_mapping_behaviour(self):
+        self.store[1] = Guest(id=1, name="Alice", category="Friends", size=2)
+        self.store[2] = Guest(id=2, name="Bob", category="Friends", table_id=5)
+
+        self.assertEqual(len(self.store), 2)
+        self.assertIn(1, self.store)
+        self.assertEqual(list(self.store), [1, 2])
+
+        alice = self.store[1]
+        self.assertIsInstance(alice, GuestView)
+        self.assertEqual(alice, Guest(id=1, name="Alice", category="Friends", size=2))
+        self.assertIsNone(alice.table_id)
+        self.assertEqual(self.store[2].table_id, 5)
+
+        # Categories are interned once
+        self.assertEqual(self.store._categories, ["Friends"])
+
+        alice.size = 4
+        alice.category = "Family"
+        self.assertEqual(self.store[1].size, 4)
+        self.assertEqual(self.store[1].category, "Family")
+
+        del self.store[1]
+        self.assertNotIn(1, self.store)
+        self.assertEqual(list(self.store), [2])
+        with self.assertRaises(KeyError):
+            self.store[1]
+
+    def test_sparse_ids_and_compaction(self):
+        self.store[10 ** 9] = Guest(id=10 ** 9, name="Far")
+        for i in range(1, 3001):
+            self.store[i] = Guest(id=i, name=f"G{i}")
+        for i in range(1, 2501):
+            del self.store[i]
+
+        self.assertEqual(len(self.store), 501)
+        self.assertEqual(self.store[10 ** 9].name, "Far")
+        self.assertEqual(self.store[2600].name, "G2600")
+        self.assertEqual(list(self.store)[:2], [10 ** 9, 2501])
+
+    def test_iter_records(self):
+        self.store[1] = Guest(id=1, name="A", category="X", table_id=3, size=2)
+        self.store[2] = Guest(id=2, name="B", category="Y")
+        self.assertEqual(list(self.store.iter_records()), [(1, "A", "X", 3, 2), (2, "B", "Y", None, 1)])
+
+class TestCompactSeatingPlan(unittest.TestCase):
+    def setUp(self):
+        self.plan = SeatingPlan(compact=True)
+
+    def test_seating(self):
+        g1 = self.plan.add_guest("G1", size=2)
+        table = self.plan.add_table("T1", 3)
+
+        self.assertTrue(self.plan.assign_guest_to_table(g1.id, table.id))
+        self.assertEqual(self.plan.guests[g1.id].table_id, table.id)
+        self.assertEqual(self.plan.get_occupancy(table.id), 2)
+
+        g2 = self.plan.add_guest("G2", size=2)
+        self.assertFalse(self.plan.assign_guest_to_table(g2.id, table.id))
+
+        self.plan.remove_guest(g1.id)
+        self.assertEqual(self.plan.get_occupancy(table.id), 0)
+        self.assertEqual(self.plan.total_head_count, 2)
+
+    def test_batch_rollback(self):
+        g1 = self.plan.add_guest("G1", size=2)
+        table = self.plan.add_table("T1", 1)
+
+        with self.assertRaises(CapacityError):
+            with self.plan.batch():
+                self.plan.assign_guest_to_table(g1.id, table.id)
+                self.plan.remove_guest(g1.id)
+                self.plan.add_guest("G2", size=5)
+                self.plan.assign_guest_to_table(2, table.id)
+
+        self.assertEqual(list(self.plan.guests), [g1.id])
+        self.assertEqual(self.plan.guests[g1.id], Guest(id=1, name="G1", size=2))
+        self.assertEqual(list(table.guest_ids), [])
+
+if __name__ == '__main__':
+    unittest.main()
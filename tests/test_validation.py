@@ -0,0 +1,103 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from wedding_planner.models import SeatingPlan, Guest, Table
+
+class TestValidation(unittest.TestCase):
+    def write_plan(self, data):
+        fd, filename = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        self.addCleanup(os.remove, filename)
+        return filename
+
+    def corrupt_data(self):
+        return {
+            "guests": [
+                {"id": 1, "name": "A", "category": "F", "table_id": 1, "size": 3},
+                {"id": 2, "name": "B", "category": "F", "table_id": 1, "size": 2},
+                {"id": 3, "name": "C", "category": "F", "table_id": 9, "size": 1},   # missing table
+                {"id": 4, "name": "D", "category": "F", "table_id": 2, "size": 1},   # not listed at table 2
+                {"id": 5, "name": "E", "category": "F", "table_id": None, "size": 1},
+            ],
+            "tables": [
+                # capacity 4 for 5 seated; lists a missing guest and a guest seated elsewhere
+                {"id": 1, "name": "T1", "capacity": 4, "guest_ids": [1, 2, 42, 5], "x": 10.6, "y": 20.2},
+                {"id": 2, "name": "T2", "capacity": 4, "guest_ids": [], "x": 300, "y": 100},
+            ],
+            "next_guest_id": 3,
+            "next_table_id": 1,
+        }
+
+    def test_report_without_repair(self):
+        plan = SeatingPlan()
+        report = plan.load_from_file(self.write_plan(self.corrupt_data()), repair=False)
+
+        self.assertFalse(report.ok)
+        self.assertFalse(report.repaired)
+        self.assertEqual(report.counts(), {
+            "missing_table": 1, "unlisted_seat": 1, "bad_position": 1, "missing_guest": 1,
+            "stale_seat": 1, "over_capacity": 1, "id_counter": 2,
+        })
+        missing = [i for i in report.issues if i.code == "missing_table"][0]
+        self.assertEqual((missing.guest_id, missing.table_id), (3, 9))
+
+    def test_load_repairs_plan(self):
+        plan = SeatingPlan()
+        report = plan.load_from_file(self.write_plan(self.corrupt_data()))
+        self.assertTrue(report.repaired)
+
+        t1, t2 = plan.tables[1], plan.tables[2]
+        self.assertEqual((t1.x, t1.y), (11, 20))
+        self.assertIsNone(plan.guests[3].table_id)
+        self.assertIn(4, t2.guest_ids)
+        self.assertNotIn(42, t1.guest_ids)
+        self.assertNotIn(5, t1.guest_ids)
+        # Over capacity: the last-seated group (B, size 2) goes back to the waiting list
+        self.assertEqual(list(t1.guest_ids), [1])
+        self.assertIsNone(plan.guests[2].table_id)
+        self.assertEqual(plan.get_occupancy(1), 3)
+        self.assertGreater(plan.next_guest_id, 5)
+        self.assertGreater(plan.next_table_id, 2)
+
+        self.assertTrue(plan.validate().ok)
+
+    def test_clean_plan_is_ok(self):
+        plan = SeatingPlan()
+        table = plan.add_table("T1", 4)
+        guest = plan.add_guest("G", size=2)
+        plan.assign_guest_to_table(guest.id, table.id)
+        report = plan.validate(repair=True)
+        self.assertTrue(report.ok)
+        self.assertFalse(report.repaired)
+
+    def test_bad_numbers(self):
+        plan = SeatingPlan()
+        # As a loader would: raw values go in, the repair runs before the batch commits
+        with plan.batch(validate=False):
+            plan.insert_table(Table(id=1, name="T", capacity="8", x=0, y=0))
+            plan.insert_guest(Guest(id=1, name="G", size="2"))
+            plan.insert_guest(Guest(id=2, name="H", size=0))
+            report = plan.validate(repair=True)
+        self.assertEqual(report.counts(), {"bad_size": 2, "bad_capacity": 1})
+        self.assertEqual((plan.guests[1].size, plan.guests[2].size, plan.tables[1].capacity), (2, 1, 8))
+        self.assertEqual(plan.total_head_count, 3)
+
+    def test_large_plan_is_fast(self):
+        plan = SeatingPlan()
+        with plan.batch(validate=False):
+            for t_id in range(1, 1001):
+                plan.insert_table(Table(id=t_id, name=f"T{t_id}", capacity=100))
+            for g_id in range(1, 100001):
+                plan.insert_guest(Guest(id=g_id, name=f"G{g_id}", table_id=g_id % 1000 + 1))
+
+        start = time.perf_counter()
+        report = plan.validate()
+        elapsed = time.perf_counter() - start
+        self.assertTrue(report.ok)
+        self.assertLess(elapsed, 1.0)
+
+if __name__ == '__main__':
+    unittest.main()
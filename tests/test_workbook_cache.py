@@ -0,0 +1,109 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import openpyxl
+from openpyxl import Workbook
+from wedding_planner.models import SeatingPlan
+from wedding_planner.excel_io import ExcelIO, StreamedSheet
+from wedding_planner.workbook_cache import WorkbookCache
+
+class TestWorkbookCache(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.cache_dir = os.path.join(self.dir, "cache")
+        self.addCleanup(setattr, ExcelIO, "cache", ExcelIO.cache)
+        ExcelIO.cache = WorkbookCache(directory=self.cache_dir)
+        self.filename = self.write("groups.xlsx", [["Group", "Count", "Side"], ["משפחת כהן", 4, "כלה"], ["Levi", 2, None]])
+
+    def write(self, name, rows):
+        filename = os.path.join(self.dir, name)
+        wb = Workbook()
+        for row in rows:
+            wb.active.append(row)
+        wb.save(filename)
+        return filename
+
+    def opened(self):
+        return mock.patch("openpyxl.load_workbook", wraps=openpyxl.load_workbook)
+
+    def groups(self, filename):
+        plan = SeatingPlan()
+        ExcelIO.import_groups_to_plan(filename, "Group", "Count", plan, "Side")
+        return [(g.name, g.size, g.category) for g in plan.guests.values()]
+
+    def test_repeated_imports_skip_openpyxl(self):
+        expected = [("משפחת כהן", 4, "כלה"), ("Levi", 2, "Levi")]
+        with self.opened() as load:
+            self.assertEqual(self.groups(self.filename), expected)
+            self.assertEqual(load.call_count, 1)
+            self.assertEqual(ExcelIO.get_headers(self.filename), ["Group", "Count", "Side"])
+            self.assertEqual(self.groups(self.filename), expected)
+            self.assertEqual(ExcelIO.read_groups(self.filename, "Group", "Count", "Side"),
+                             [(None, "משפחת כהן", "כלה", 4), (None, "Levi", "Levi", 2)])
+            self.assertEqual(load.call_count, 1)
+
+            # A new cache (e.g. after a restart) finds the rows on disk
+            ExcelIO.cache = WorkbookCache(directory=self.cache_dir)
+            self.assertEqual(self.groups(self.filename), expected)
+            self.assertEqual(load.call_count, 1)
+
+    def test_changed_and_resaved_files(self):
+        self.groups(self.filename)
+        # New content under the same name: read again
+        self.write("groups.xlsx", [["Group", "Count", "Side"], ["משפחת כהן", 5, "כלה"], ["Levi", 2, None]])
+        self.assertEqual(self.groups(self.filename)[0], ("משפחת כהן", 5, "כלה"))
+        # Copied elsewhere, or saved again unchanged: same content, same entry
+        copy = os.path.join(self.dir, "copy.xlsx")
+        shutil.copyfile(self.filename, copy)
+        with self.opened() as load:
+            self.groups(copy)
+            self.assertEqual(load.call_count, 0)
+
+    def test_bounded_memory_and_damaged_files(self):
+        cache = WorkbookCache(max_cells=10)
+        read = mock.Mock(side_effect=lambda filename, progress: [("a", "b")] * 3)
+        first = self.write("a.xlsx", [["a"]])
+        second = self.write("b.xlsx", [["b"]])
+        cache.load(first, read)
+        cache.load(second, read)
+        # 12 cells do not fit in 10: the least recently used one went
+        self.assertIsNone(cache.rows(first))
+        self.assertIsNotNone(cache.rows(second))
+        cache.load(first, read)
+        self.assertEqual(read.call_count, 3)
+
+        self.groups(self.filename)
+        for name in os.listdir(self.cache_dir):
+            with open(os.path.join(self.cache_dir, name), "wb") as f:
+                f.write(b"not a pickle")
+        ExcelIO.cache = WorkbookCache(directory=self.cache_dir)
+        with self.opened() as load:
+            self.assertEqual(len(self.groups(self.filename)), 2)
+            self.assertEqual(load.call_count, 1)
+
+    def test_sheets_too_big_to_keep_are_streamed(self):
+        rows = [["Group", "Count", "Side"]] + [[f"Family {i}", i % 4 + 1, "כלה"] for i in range(300)]
+        sized = self.write("sized.xlsx", rows)
+        # Write-only saves have no <dimension>: the size is found while reading
+        unsized = os.path.join(self.dir, "unsized.xlsx")
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet()
+        for row in rows:
+            ws.append(row)
+        wb.save(unsized)
+
+        expected = [(None, name, side, count) for name, count, side in rows[1:]]
+        for filename in (sized, unsized):
+            with self.subTest(os.path.basename(filename)):
+                ExcelIO.cache = WorkbookCache(max_cells=100, directory=self.cache_dir)
+                self.assertIsInstance(ExcelIO.sheet_rows(filename), StreamedSheet)
+                self.assertEqual(ExcelIO.read_groups(filename, "Group", "Count", "Side"), expected)
+                self.assertEqual(len(self.groups(filename)), 300)
+                self.assertIsNone(ExcelIO.cache.rows(filename))
+                self.assertFalse(os.path.exists(self.cache_dir) and os.listdir(self.cache_dir))
+
+if __name__ == '__main__':
+    unittest.main()
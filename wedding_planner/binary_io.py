@@ -0,0 +1,223 @@
+"""
+Packed binary plan format (.seatplan).
+
+Layout (little-endian), every section 8-byte aligned:
+
+    header     _HEADER: magic, version, flags, record counts, CRC-32 of everything
+               after the header, the id counters and the offset of each section
+    strings    (count + 1) uint32 byte offsets, then the UTF-8 text of every distinct
+               name/category/table name, each followed by a NUL
+    guests     one _GUEST record per guest: id, table_id, size, name ref, category ref
+    tables     one _TABLE record per table: id, name ref, capacity, x, y, first seat, seat count
+    seats      int64 guest ids, every table's seat list back to back
+
+Opening maps the file and copies each record field out as one array, so no
+per-guest objects are built until a guest is looked up (see PackedGuestStore)
+and names are not even decoded until something reads them.
+"""
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+from itertools import repeat
+from operator import eq
+from typing import Dict, Tuple
+
+from .models import GuestIdList, Table
+from .storage import _NO_TABLE, PackedGuestStore, PackedStrings, StringColumn, is_ascending, iter_guest_records
+from .validation import ValidationReport
+
+MAGIC = b"SEATPLAN"
+VERSION = 1
+_HEADER = struct.Struct("<8sHHIIIIIqq6Q")
+_GUEST = struct.Struct("<5q")
+_TABLE = struct.Struct("<7q")
+# Set when no string contains a NUL, so the string section decodes with one split()
+_NUL_FREE = 1
+# Set when guest ids are strictly increasing, so rows can be found by bisection
+_ASCENDING_IDS = 2
+_BIG_ENDIAN = sys.byteorder == "big"
+# _UNSEATED.get(t, t) maps the stored sentinel back to None and leaves table ids alone
+_UNSEATED = {_NO_TABLE: None}
+
+
+def is_packed_file(filename: str) -> bool:
+    with open(filename, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def _pad(length: int) -> bytes:
+    return b"\0" * (-length % 8)
+
+
+def _little_endian(values: array) -> memoryview:
+    if _BIG_ENDIAN:
+        values = values[:]
+        values.byteswap()
+    return memoryview(values).cast("B")
+
+
+def write_packed(plan, f):
+    """Writes a plan (or PlanSnapshot) to a binary file object in the .seatplan layout."""
+    strings: Dict[str, int] = {}
+    guests = array("q")
+    tables = array("q")
+    seats = array("q")
+
+    def ref(text) -> int:
+        index = strings.get(text)
+        if index is None:
+            index = strings[text] = len(strings)
+        return index
+
+    try:
+        for g_id, name, category, table_id, size in iter_guest_records(plan.guests):
+            guests.extend((g_id, _NO_TABLE if table_id is None else table_id, size, ref(str(name)), ref(str(category))))
+        for t_id in list(plan.tables):
+            table = plan.tables[t_id]
+            tables.extend((table.id, ref(str(table.name)), table.capacity, table.x, table.y, len(seats), len(table.guest_ids)))
+            seats.extend(table.guest_ids)
+    except (TypeError, OverflowError) as e:
+        raise ValueError(f"Only whole-number ids, sizes, capacities and positions can be packed ({e}); "
+                         "run validate(repair=True) first") from None
+
+    encoded = [text.encode("utf-8") for text in strings]
+    text = b"\0".join(encoded) + b"\0" if encoded else b""
+    offsets = array("I", [0])
+    position = 0
+    for data in encoded:
+        position += len(data) + 1
+        offsets.append(position)
+    flags = _NUL_FREE if text.count(b"\0") == len(encoded) else 0
+    if is_ascending(guests[0::5]):
+        flags |= _ASCENDING_IDS
+
+    sections = [_little_endian(offsets), text, _little_endian(guests), _little_endian(tables), _little_endian(seats)]
+    section_offsets = []
+    crc = 0
+    position = _HEADER.size
+    for index, data in enumerate(sections):
+        section_offsets.append(position)
+        padding = _pad(len(data))
+        crc = zlib.crc32(padding, zlib.crc32(data, crc))
+        position += len(data) + len(padding)
+        sections[index] = (data, padding)
+
+    f.write(_HEADER.pack(MAGIC, VERSION, flags, len(guests) // 5, len(tables) // 7, len(seats), len(strings), crc,
+                         plan.next_guest_id, plan.next_table_id, *section_offsets, position))
+    for data, padding in sections:
+        f.write(data)
+        f.write(padding)
+
+
+def _column(records: memoryview, field: int, width: int) -> array:
+    column = array("q")
+    column.frombytes(records[field::width].tobytes())
+    if _BIG_ENDIAN:
+        column.byteswap()
+    return column
+
+
+def _read_strings(view: memoryview, index_offset: int, text_offset: int, count: int, flags: int) -> PackedStrings:
+    offsets = array("I")
+    offsets.frombytes(view[index_offset:index_offset + 4 * (count + 1)])
+    if _BIG_ENDIAN:
+        offsets.byteswap()
+    if offsets[0] != 0:
+        raise ValueError("Corrupt .seatplan string table")
+    # Copied out of the mapping, which is closed once the file is read
+    return PackedStrings(bytes(view[text_offset:text_offset + offsets[-1]]), offsets, bool(flags & _NUL_FREE))
+
+
+def read_packed(filename: str) -> Tuple[PackedGuestStore, Dict[int, Table], int, int]:
+    """Parses a .seatplan file into (guest store, tables by id, next_guest_id, next_table_id)."""
+    with open(filename, "rb") as f:
+        header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size or not header.startswith(MAGIC):
+            raise ValueError(f"{filename} is not a .seatplan file")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                return _parse(view, header)
+            finally:
+                view.release()
+
+
+def _parse(view: memoryview, header: bytes):
+    (_, version, flags, guest_count, table_count, seat_count, string_count, crc, next_guest_id, next_table_id,
+     index_offset, text_offset, guests_offset, tables_offset, seats_offset, end) = _HEADER.unpack(header)
+    if version != VERSION:
+        raise ValueError(f"Unsupported .seatplan version {version}")
+    if not (index_offset + 4 * (string_count + 1) <= text_offset
+            and guests_offset + _GUEST.size * guest_count <= tables_offset
+            and tables_offset + _TABLE.size * table_count <= seats_offset
+            and seats_offset + 8 * seat_count <= end <= len(view)
+            and _HEADER.size <= index_offset and text_offset <= guests_offset):
+        raise ValueError("Truncated or corrupt .seatplan file")
+    if zlib.crc32(view[_HEADER.size:end]) != crc:
+        raise ValueError("Corrupt .seatplan file (checksum mismatch)")
+
+    strings = _read_strings(view, index_offset, text_offset, string_count, flags)
+    width = _GUEST.size // 8
+    with view[guests_offset:guests_offset + _GUEST.size * guest_count].cast("q") as records:
+        ids, table_ids, sizes, name_refs, category_refs = (_column(records, i, width) for i in range(width))
+    seats = array("q")
+    seats.frombytes(view[seats_offset:seats_offset + 8 * seat_count])
+    if _BIG_ENDIAN:
+        seats.byteswap()
+    seats = seats.tolist()  # list slices are cheaper to turn into seat lists
+
+    try:
+        # Names stay encoded until needed; the few distinct categories are decoded
+        # once and shared by every row
+        category_names = {ref: strings[ref] for ref in set(category_refs)}
+        store = PackedGuestStore(ids, StringColumn(name_refs, strings),
+                                 list(map(category_names.__getitem__, category_refs)),
+                                 list(map(_UNSEATED.get, table_ids, table_ids)), sizes,
+                                 ascending=bool(flags & _ASCENDING_IDS))
+        tables: Dict[int, Table] = {}
+        for t_id, name_ref, capacity, x, y, first_seat, count in _TABLE.iter_unpack(
+                view[tables_offset:tables_offset + _TABLE.size * table_count]):
+            if first_seat < 0 or count < 0 or first_seat + count > seat_count:
+                raise IndexError(t_id)
+            tables[t_id] = Table(id=t_id, name=strings[name_ref], capacity=capacity,
+                                 guest_ids=GuestIdList(seats[first_seat:first_seat + count]), x=x, y=y)
+    except IndexError:
+        raise ValueError("Corrupt .seatplan file (reference out of range)") from None
+    if len(tables) != table_count:
+        raise ValueError("Duplicate table ids in .seatplan file")
+    return store, tables, next_guest_id, next_table_id
+
+
+def _is_consistent(plan, store: PackedGuestStore) -> bool:
+    # The checks validate_plan makes, in bulk over the freshly read columns: every
+    # seat list entry is a guest whose table_id is that table, no other guest has
+    # a table, and the numbers are in range
+    ids, _, _, table_ids, sizes = store.columns()
+    table_of = dict(zip(ids, table_ids)).get
+    seat_count = 0
+    for t_id, table in plan.tables.items():
+        if not all(map(eq, map(table_of, table.guest_ids), repeat(t_id))):
+            return False
+        seat_count += len(table.guest_ids)
+        if table.capacity < 0 or plan.get_occupancy(t_id) > table.capacity:
+            return False
+    if seat_count != len(table_ids) - table_ids.count(None):
+        return False
+    if sizes and min(sizes) < 1:
+        return False
+    return (plan.next_guest_id > max(ids, default=0)
+            and plan.next_table_id > max(plan.tables, default=0))
+
+
+def load_packed(plan, filename: str, repair: bool = True) -> ValidationReport:
+    """
+    Replaces the plan's contents with a .seatplan file. A file that passes the
+    bulk consistency check skips the full validate_plan pass.
+    """
+    store, tables, next_guest_id, next_table_id = read_packed(filename)
+    plan._replace_contents(store, tables, next_guest_id, next_table_id)
+    if _is_consistent(plan, store):
+        return ValidationReport()
+    return plan.validate(repair=repair)
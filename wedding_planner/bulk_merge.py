@@ -0,0 +1,102 @@
+"""
+Merging many workbooks at once. Each file is parsed by ExcelIO.load_from_xlsx in
+a worker process and sent back as plain tuples (WorkbookRecords); the main
+process then merges them into the plan in the order given, in one batch. The
+result is the same plan as merging the files one after another.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Callable, Dict, List, Optional, Sequence
+
+from .excel_io import ExcelIO
+from .models import SeatingPlan, Guest, Table
+from .storage import iter_guest_records
+from .validation import ValidationReport
+
+
+@dataclass
+class WorkbookRecords:
+    """
+    One loaded workbook as tuples, cheap to pickle. Reads like a plan where
+    merge_from needs one (tables, guests, next ids).
+    """
+    filename: str
+    table_rows: list  # (id, name, capacity, x, y, seated guest ids)
+    guest_rows: list  # (id, name, category, table_id, size)
+    next_guest_id: int
+    next_table_id: int
+
+    @cached_property
+    def tables(self) -> Dict[int, Table]:
+        return {t_id: Table(id=t_id, name=name, capacity=capacity, guest_ids=guest_ids, x=x, y=y)
+                for t_id, name, capacity, x, y, guest_ids in self.table_rows}
+
+    @cached_property
+    def guests(self) -> Dict[int, Guest]:
+        return {g_id: Guest(id=g_id, name=name, category=category, table_id=table_id, size=size)
+                for g_id, name, category, table_id, size in self.guest_rows}
+
+
+def read_workbook(filename: str) -> WorkbookRecords:
+    """Loads (and repairs) one workbook on its own. Runs in the worker processes."""
+    plan = SeatingPlan()
+    ExcelIO.load_from_xlsx(filename, plan)
+    return WorkbookRecords(filename,
+                           [(t.id, t.name, t.capacity, t.x, t.y, tuple(t.guest_ids)) for t in plan.tables.values()],
+                           list(iter_guest_records(plan.guests)), plan.next_guest_id, plan.next_table_id)
+
+
+def read_workbooks(filenames: Sequence[str], workers: Optional[int] = None,
+                   progress: Optional[Callable[[int, Optional[int]], None]] = None) -> List[WorkbookRecords]:
+    """
+    Parses the files in up to `workers` processes (default: one per CPU) and returns
+    their records in the order of `filenames`. progress(files read, total) is called
+    as each one finishes; an exception it raises cancels the files not started yet.
+    """
+    filenames = list(filenames)
+    workers = min(workers or os.cpu_count() or 1, len(filenames))
+    if workers <= 1:
+        records = []
+        for done, filename in enumerate(filenames, 1):
+            records.append(read_workbook(filename))
+            if progress is not None:
+                progress(done, len(filenames))
+        return records
+
+    # Spawned, not forked: the GUI calls this from a worker thread next to Tk
+    pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        futures = {pool.submit(read_workbook, filename): index for index, filename in enumerate(filenames)}
+        records: List[Optional[WorkbookRecords]] = [None] * len(filenames)
+        for done, future in enumerate(as_completed(futures), 1):
+            records[futures[future]] = future.result()
+            if progress is not None:
+                progress(done, len(filenames))
+    except BaseException:
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    pool.shutdown()
+    return records
+
+
+def merge_records(seating_plan: SeatingPlan, records: Sequence[WorkbookRecords], dedup=None) -> ValidationReport:
+    """
+    Merges parsed workbooks into the plan, in order, as one batch: colliding ids are
+    remapped, as merge_from does file by file. Each file was already repaired on
+    its own, and merged files never share a table, so the plan is validated (and
+    repaired) once at the end; the result is the same as validating after each file.
+    dedup: Optional dedup.GuestDeduplicator for the plan, shared by all the files
+    """
+    with seating_plan.batch(validate=False):
+        for workbook in records:
+            seating_plan.merge_from(workbook, dedup=dedup)
+        return seating_plan.validate(repair=True)
+
+
+def merge_workbooks(filenames: Sequence[str], seating_plan: SeatingPlan, workers: Optional[int] = None,
+                    dedup=None, progress=None) -> ValidationReport:
+    """read_workbooks then merge_records."""
+    return merge_records(seating_plan, read_workbooks(filenames, workers, progress), dedup)
@@ -0,0 +1,158 @@
+"""
+CSV/TSV counterpart of ExcelIO for group imports and plan exports.
+
+Files are streamed through the csv module a row at a time, with the same
+column mapping as the Excel import. The encoding is sniffed from the first
+bytes (BOM, UTF-16 without BOM, UTF-8, else Windows Hebrew/Arabic code pages)
+and the delimiter from the extension or the header line.
+"""
+import codecs
+import csv
+import os
+from itertools import chain, repeat
+from typing import List, Optional
+
+from .excel_io import ExcelIO
+from .storage import iter_guest_records
+
+CSV_EXTENSIONS = (".csv", ".tsv", ".tab", ".txt")
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"), (codecs.BOM_UTF32_BE, "utf-32"),  # before UTF-16: same first bytes
+    (codecs.BOM_UTF16_LE, "utf-16"), (codecs.BOM_UTF16_BE, "utf-16"),
+)
+_SAMPLE_SIZE = 64 * 1024
+
+
+def is_csv_file(filename: str) -> bool:
+    return filename.lower().endswith(CSV_EXTENSIONS)
+
+
+def group_reader(filename: str):
+    """CsvIO or ExcelIO, whichever reads this file; both have get_headers, import_groups_to_plan and read_groups."""
+    return CsvIO if is_csv_file(filename) else ExcelIO
+
+
+def sniff_encoding(filename: str) -> str:
+    with open(filename, "rb") as f:
+        sample = f.read(_SAMPLE_SIZE)
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+    # UTF-16 without a BOM: the ASCII delimiters, digits and newlines leave a NUL
+    # in every other byte
+    even, odd = sample[0::2].count(0), sample[1::2].count(0)
+    if max(even, odd) > len(sample) // 10 and max(even, odd) > 4 * min(even, odd):
+        return "utf-16-le" if odd > even else "utf-16-be"
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    # Legacy exports: Hebrew letters sit at 0xE0-0xFA in cp1255, Arabic ones mostly below
+    high = [b for b in sample if b >= 0xC0]
+    hebrew = sum(1 for b in high if 0xE0 <= b <= 0xFA)
+    return "cp1255" if hebrew * 2 > len(high) else "cp1256"
+
+
+def sniff_delimiter(filename: str, header_line: str) -> str:
+    if filename.lower().endswith((".tsv", ".tab")):
+        return "\t"
+    counts = {d: header_line.count(d) for d in (",", "\t", ";")}
+    delimiter = max(counts, key=counts.get)
+    return delimiter if counts[delimiter] else ","
+
+
+class CsvIO:
+    @staticmethod
+    def _open(filename: str):
+        """The open text file and a csv.reader over it, positioned at the header row."""
+        encoding = sniff_encoding(filename)
+        f = open(filename, newline="", encoding=encoding)
+        try:
+            header_line = f.readline()
+            f.seek(0)
+            return f, csv.reader(f, delimiter=sniff_delimiter(filename, header_line))
+        except BaseException:
+            f.close()
+            raise
+
+    @staticmethod
+    def _rows(reader, width: int):
+        # Short rows are padded so a missing trailing cell reads as empty, as in a sheet
+        for row in reader:
+            if len(row) < width:
+                row = list(chain(row, repeat("", width - len(row))))
+            yield row
+
+    @staticmethod
+    def get_headers(filename: str) -> List[str]:
+        """Returns the headers (first row), like ExcelIO.get_headers."""
+        f, reader = CsvIO._open(filename)
+        with f:
+            return [cell for cell in next(reader, []) if cell != ""]
+
+    @staticmethod
+    def import_groups_to_plan(filename: str, group_col: str, count_col: str, seating_plan, category_col: str = None,
+                              progress=None, dedup=None):
+        """Same as ExcelIO.import_groups_to_plan, for a CSV or TSV file (progress total is None)."""
+        f, reader = CsvIO._open(filename)
+        with f:
+            headers = next(reader, [])
+            group_idx, count_idx, category_idx = ExcelIO._find_columns(headers, group_col, count_col, category_col)
+            with seating_plan.batch(validate=False):
+                ExcelIO._add_group_rows(CsvIO._rows(reader, len(headers)), group_idx, count_idx, category_idx,
+                                        seating_plan, progress, None, dedup)
+
+    @staticmethod
+    def read_groups(filename: str, group_col: str, count_col: str, category_col: str = None, key_col: str = None,
+                    progress=None) -> list:
+        """Same as ExcelIO.read_groups, for a CSV or TSV file."""
+        f, reader = CsvIO._open(filename)
+        with f:
+            headers = next(reader, [])
+            indices = ExcelIO._find_columns(headers, group_col, count_col, category_col, key_col)
+            return list(ExcelIO._iter_groups(CsvIO._rows(reader, len(headers)), *indices, progress=progress))
+
+    @staticmethod
+    def save_to_csv(seating_plan, filename: str, tables_filename: Optional[str] = None, progress=None):
+        """
+        Writes the guests to filename and the tables to tables_filename (default
+        "<name>.tables.csv" next to it), with the columns of the Excel sheets.
+        """
+        CsvIO.save_guests(seating_plan, filename, progress)
+        CsvIO.save_tables(seating_plan, tables_filename or CsvIO.tables_path(filename))
+
+    @staticmethod
+    def tables_path(filename: str) -> str:
+        stem, extension = os.path.splitext(filename)
+        return f"{stem}.tables{extension}"
+
+    @staticmethod
+    def _writer(f, filename: str):
+        return csv.writer(f, delimiter="\t" if filename.lower().endswith((".tsv", ".tab")) else ",")
+
+    @staticmethod
+    def save_guests(seating_plan, filename: str, progress=None):
+        """progress(guests written, total guests) is called every 1000 guests."""
+        total = len(seating_plan.guests)
+
+        def rows():
+            for count, (g_id, name, category, table_id, size) in enumerate(iter_guest_records(seating_plan.guests), 1):
+                if progress is not None and count % 1000 == 0:
+                    progress(count, total)
+                yield g_id, name, category, size, "" if table_id is None else table_id
+
+        # BOM so Excel opens Hebrew and Arabic text as UTF-8
+        with open(filename, "w", newline="", encoding="utf-8-sig") as f:
+            writer = CsvIO._writer(f, filename)
+            writer.writerow(["ID", "Name", "Category", "Capacity", "Table ID"])
+            writer.writerows(rows())
+
+    @staticmethod
+    def save_tables(seating_plan, filename: str):
+        with open(filename, "w", newline="", encoding="utf-8-sig") as f:
+            writer = CsvIO._writer(f, filename)
+            writer.writerow(["ID", "Name", "Capacity", "X", "Y"])
+            writer.writerows((t.id, t.name, t.capacity, t.x, t.y) for t in seating_plan.tables.values())
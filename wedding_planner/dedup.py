@@ -0,0 +1,118 @@
+"""
+Duplicate guest detection for merges and imports.
+
+Guests are keyed by a name signature (case-folded, whitespace collapsed, Hebrew
+niqqud / cantillation and Arabic harakat removed), optionally together with the
+category, and looked up in a dict: one pass over each plan instead of comparing
+every pair of guests.
+"""
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .indexes import fold
+from .storage import iter_guest_records
+
+# Not combining marks, but only stretch Arabic script
+_DROP = {0x0640: None}  # tatweel
+
+
+def name_signature(name) -> str:
+    """'  דָּוִד  Cohen' and 'דוד cohen' both give 'דוד cohen'."""
+    text = "" if name is None else str(name)
+    if not text.isascii():
+        # NFKD splits pointed letters (and presentation forms like U+FB35) into base + marks
+        text = unicodedata.normalize("NFKD", text).translate(_DROP)
+        text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(fold(text).split())
+
+
+@dataclass
+class Duplicate:
+    """An incoming guest record that matched the guest kept_id."""
+    kept_id: int
+    name: str
+    category: str
+    size: int
+    table_id: Optional[int] = None
+
+
+@dataclass
+class GuestDeduplicator:
+    """
+    Decides, record by record, whether an incoming guest is already in `plan`.
+    Pass one as `dedup` to SeatingPlan.merge_from, ExcelIO.load_from_xlsx or
+    ExcelIO.import_groups_to_plan, then read `duplicates`.
+
+    With collapse set a duplicate is dropped and the kept guest stays where it is;
+    if the kept guest has no seat it takes the duplicate's. Without it every record
+    is added and the matches are only reported.
+
+    Records are matched against the plan and earlier sources only, never against
+    rows of their own file: two "Cohen" rows in one list are two families. Loaders
+    call next_source() before each incoming file or plan.
+    """
+    plan: object
+    by_category: bool = False
+    collapse: bool = True
+    duplicates: List[Duplicate] = field(default_factory=list)
+    _index: Optional[Dict] = field(default=None, repr=False)  # key -> (guest id, source that added it)
+    _source: int = field(default=0, repr=False)
+
+    def key(self, name, category):
+        if self.by_category:
+            return name_signature(name), name_signature(category)
+        return name_signature(name)
+
+    def _keys(self) -> Dict:
+        # Built on first use, so loaders that clear the plan first index what is left
+        if self._index is None:
+            self._index = {}
+            for g_id, name, category, _, _ in iter_guest_records(self.plan.guests):
+                self._index.setdefault(self.key(name, category), (g_id, -1))
+        return self._index
+
+    def next_source(self):
+        """Starts a new incoming file or plan; what the previous one added can now be matched."""
+        self._source += 1
+
+    def absorb(self, name, category, size=1, table_id=None) -> Optional[int]:
+        """
+        Checks an incoming record. Returns the id of the guest it was collapsed into
+        (the caller then skips it), or None if the caller should add it and call add().
+        """
+        kept_id, source = self._keys().get(self.key(name, category), (None, None))
+        if kept_id is None or source == self._source or kept_id not in self.plan.guests:
+            return None
+        self.duplicates.append(Duplicate(kept_id, name, category, size, table_id))
+        if not self.collapse:
+            return None
+        if table_id is not None and self.plan.guests[kept_id].table_id is None:
+            self.plan.assign_guest_to_table(kept_id, table_id)
+        return kept_id
+
+    def add(self, guest_id: int, name, category):
+        self._keys().setdefault(self.key(name, category), (guest_id, self._source))
+
+    def rollback(self, mark: int):
+        """
+        Forgets a load the plan rolled back: duplicates after the first `mark` are
+        dropped and the plan is indexed again on next use.
+        """
+        del self.duplicates[mark:]
+        self._index = None
+
+    def summary(self) -> str:
+        if not self.duplicates:
+            return "No duplicate guests found."
+        verb = "merged into existing guests" if self.collapse else "found"
+        return f"{len(self.duplicates)} duplicate guest(s) {verb}."
+
+
+def find_duplicates(plan, by_category: bool = False) -> List[List[int]]:
+    """Groups of guest ids in one plan that share a signature, each in plan order."""
+    groups: Dict = {}
+    dedup = GuestDeduplicator(plan, by_category=by_category)
+    for g_id, name, category, _, _ in iter_guest_records(plan.guests):
+        groups.setdefault(dedup.key(name, category), []).append(g_id)
+    return [ids for ids in groups.values() if len(ids) > 1]
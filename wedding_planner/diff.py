@@ -0,0 +1,172 @@
+"""
+Differences between two seating plans (e.g. two people's copies of one plan).
+
+Records are matched by id through hash maps and compared as field tuples, so a
+diff is one pass over each plan: O(guests + tables). Values that only differ in
+spelling (2 vs "2", as XLSX round trips produce) count as equal, judged by the
+same record digests as SeatingPlan.fingerprint().
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .fingerprint import guest_digest, table_digest
+from .models import SeatingPlan
+from .storage import iter_guest_records
+
+# Report order
+KINDS = (
+    "table_added", "table_removed", "table_renamed", "table_resized", "table_moved",
+    "guest_added", "guest_removed", "guest_renamed", "guest_moved", "guest_updated",
+)
+_TITLES = {
+    "table_added": "Tables added", "table_removed": "Tables removed", "table_renamed": "Tables renamed",
+    "table_resized": "Capacity changed", "table_moved": "Tables moved",
+    "guest_added": "Guests added", "guest_removed": "Guests removed", "guest_renamed": "Guests renamed",
+    "guest_moved": "Guests moved to another table", "guest_updated": "Category or size changed",
+}
+
+
+@dataclass
+class Change:
+    """
+    One difference. record_id is the guest or table id; old/new are the values
+    on each side: the record's fields as a dict for added/removed, the table id
+    (None = unseated) for guest_moved, an (x, y) pair for table_moved, a dict of
+    the changed fields for guest_updated, and the plain value otherwise.
+    """
+    kind: str
+    record_id: int
+    name: str
+    old: object = None
+    new: object = None
+
+
+@dataclass
+class PlanDiff:
+    changes: List[Change] = field(default_factory=list)
+    # Table names on each side, for describing seat moves
+    old_tables: Dict[int, str] = field(default_factory=dict)
+    new_tables: Dict[int, str] = field(default_factory=dict)
+
+    @property
+    def identical(self) -> bool:
+        return not self.changes
+
+    def by_kind(self, kind: str) -> List[Change]:
+        return [c for c in self.changes if c.kind == kind]
+
+    def counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for change in self.changes:
+            counts[change.kind] = counts.get(change.kind, 0) + 1
+        return counts
+
+    def summary(self) -> str:
+        if self.identical:
+            return "The plans are identical."
+        return ", ".join(f"{count} {_TITLES[kind].lower()}" for kind, count in self.counts().items())
+
+    @staticmethod
+    def title(kind: str) -> str:
+        return _TITLES[kind]
+
+    def describe(self, change: Change) -> Tuple[str, str]:
+        """(before, after) as display text."""
+        kind = change.kind
+        if kind == "guest_moved":
+            return self._table_label(change.old, self.old_tables), self._table_label(change.new, self.new_tables)
+        if kind in ("guest_added", "table_added"):
+            return "", _fields_text(change.new)
+        if kind in ("guest_removed", "table_removed"):
+            return _fields_text(change.old), ""
+        if kind == "table_moved":
+            return "({}, {})".format(*change.old), "({}, {})".format(*change.new)
+        if kind == "guest_updated":
+            return _fields_text(change.old), _fields_text(change.new)
+        return str(change.old), str(change.new)
+
+    @staticmethod
+    def _table_label(table_id: Optional[int], names: Dict[int, str]) -> str:
+        if table_id is None:
+            return "Unseated"
+        return f"{names.get(table_id, '?')} (#{table_id})"
+
+
+def _fields_text(values: dict) -> str:
+    return ", ".join(f"{key}: {value}" for key, value in values.items() if key != "id")
+
+
+def _same(a, b) -> bool:
+    return a == b or ("" if a is None else str(a)) == ("" if b is None else str(b))
+
+
+def diff_plans(old, new) -> PlanDiff:
+    """Compares two plans (or snapshots); changes are reported from `old` to `new`."""
+    diff = PlanDiff(old_tables={t_id: str(old.tables[t_id].name) for t_id in old.tables},
+                    new_tables={t_id: str(new.tables[t_id].name) for t_id in new.tables})
+    changes = diff.changes
+
+    old_tables = {t.id: (t.name, t.capacity, t.x, t.y) for t in map(old.tables.__getitem__, old.tables)}
+    new_tables = {t.id: (t.name, t.capacity, t.x, t.y) for t in map(new.tables.__getitem__, new.tables)}
+    for t_id, before in old_tables.items():
+        after = new_tables.get(t_id)
+        if after is None:
+            changes.append(Change("table_removed", t_id, str(before[0]), old=_table_fields(t_id, before)))
+        elif before != after and table_digest(t_id, *before) != table_digest(t_id, *after):
+            name = str(after[0])
+            if not _same(before[0], after[0]):
+                changes.append(Change("table_renamed", t_id, name, before[0], after[0]))
+            if not _same(before[1], after[1]):
+                changes.append(Change("table_resized", t_id, name, before[1], after[1]))
+            if not (_same(before[2], after[2]) and _same(before[3], after[3])):
+                changes.append(Change("table_moved", t_id, name, before[2:], after[2:]))
+    for t_id, after in new_tables.items():
+        if t_id not in old_tables:
+            changes.append(Change("table_added", t_id, str(after[0]), new=_table_fields(t_id, after)))
+
+    old_guests = {record[0]: record[1:] for record in iter_guest_records(old.guests)}
+    new_guests = {record[0]: record[1:] for record in iter_guest_records(new.guests)}
+    for g_id, before in old_guests.items():
+        after = new_guests.get(g_id)
+        if after is None:
+            changes.append(Change("guest_removed", g_id, str(before[0]), old=_guest_fields(g_id, before)))
+        elif before != after and guest_digest(g_id, *before) != guest_digest(g_id, *after):
+            name = str(after[0])
+            if not _same(before[0], after[0]):
+                changes.append(Change("guest_renamed", g_id, name, before[0], after[0]))
+            if not _same(before[2], after[2]):
+                changes.append(Change("guest_moved", g_id, name, before[2], after[2]))
+            updated = [(key, i) for key, i in (("category", 1), ("size", 3)) if not _same(before[i], after[i])]
+            if updated:
+                changes.append(Change("guest_updated", g_id, name, {key: before[i] for key, i in updated},
+                                      {key: after[i] for key, i in updated}))
+    for g_id, after in new_guests.items():
+        if g_id not in old_guests:
+            changes.append(Change("guest_added", g_id, str(after[0]), new=_guest_fields(g_id, after)))
+
+    order = {kind: i for i, kind in enumerate(KINDS)}
+    changes.sort(key=lambda c: order[c.kind])  # stable: ids stay in plan order within a kind
+    return diff
+
+
+def _guest_fields(guest_id, record) -> dict:
+    return dict(zip(("id", "name", "category", "table_id", "size"), (guest_id, *record)))
+
+
+def _table_fields(table_id, record) -> dict:
+    return dict(zip(("id", "name", "capacity", "x", "y"), (table_id, *record)))
+
+
+def load_plan_file(filename: str) -> SeatingPlan:
+    """Reads any saved plan (JSON, .seatplan, SQLite or XLSX) into a new SeatingPlan, with the usual loaders."""
+    plan = SeatingPlan()
+    if filename.lower().endswith((".xlsx", ".xlsm")):
+        from .excel_io import ExcelIO
+        ExcelIO.load_from_xlsx(filename, plan)
+    else:
+        plan.load_from_file(filename)
+    return plan
+
+
+def diff_files(old_filename: str, new_filename: str) -> PlanDiff:
+    return diff_plans(load_plan_file(old_filename), load_plan_file(new_filename))
@@ -1,15 +1,70 @@
+import re
+from itertools import islice
 import openpyxl
 from openpyxl import Workbook
 from .models import SeatingPlan, Guest, Table
+from .storage import iter_guest_records
+from .workbook_cache import WorkbookCache
+
+# Seat references written by save_to_xlsx, e.g. "=Tables!A7"
+_TABLE_REF = re.compile(r"^=\s*'?Tables'?!\$?A\$?(\d+)\s*$", re.IGNORECASE)
+
+
+class _CachedValuesNeeded(Exception):
+    """A workbook has formulas other than seat references; it is read again with Excel's cached results."""
+
+
+def _cell_int(value):
+    """A whole number from a cell value (int, float or numeric text), or None."""
+    if type(value) is int:
+        return value
+    try:
+        return int(float(value))
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def _int_or_raw(value):
+    if type(value) is int:
+        return value
+    number = _cell_int(value)
+    return value if number is None else number
+
+
+class StreamedSheet:
+    """
+    The rows of a sheet too big to keep in ExcelIO.cache, for one pass: those read
+    before that was known, then the rest straight from the workbook, which is
+    closed once they run out.
+    """
+
+    def __init__(self, wb, head: list, rest, total=None):
+        self._wb = wb
+        self._head = head
+        self._rest = rest
+        self.total = total  # rows in the sheet, None if it does not say
+
+    def __iter__(self):
+        try:
+            yield from self._head
+            yield from self._rest
+        finally:
+            self._wb.close()
+
 
 class ExcelIO:
+    # Parsed group sheets, shared by header detection, previews and imports
+    cache = WorkbookCache()
+
     @staticmethod
-    def save_to_xlsx(seating_plan: SeatingPlan, filename: str):
-        wb = Workbook()
+    def save_to_xlsx(seating_plan: SeatingPlan, filename: str, progress=None):
+        """progress(guests written, total guests) is called every 1000 guests."""
+        # Write-only: each sheet streams its rows to a temporary file as they are
+        # appended, so memory stays flat however large the plan is
+        wb = Workbook(write_only=True)
         
-        # Sheet 1: Guests (Headers first, we will populate guests later)
-        ws_guests = wb.active
-        ws_guests.title = "Guests"
+        # Sheet 1: Guests (created first so it stays the active sheet; rows are written after the tables)
+        ws_guests = wb.create_sheet("Guests")
         ws_guests.append(["ID", "Name", "Category", "Capacity", "Table ID"])
         
         # Sheet 2: Tables
@@ -21,14 +76,17 @@ class ExcelIO:
             ws_tables.append([table.id, table.name, table.capacity, table.x, table.y])
             table_row_map[table.id] = idx
             
-        # Write Guests
-        for guest in seating_plan.guests.values():
-            if guest.table_id and guest.table_id in table_row_map:
-                row_idx = table_row_map[guest.table_id]
+        # Write Guests (plain tuples; avoids building view objects for compact stores)
+        total = len(seating_plan.guests)
+        for count, (g_id, name, category, table_id, size) in enumerate(iter_guest_records(seating_plan.guests), 1):
+            if progress is not None and count % 1000 == 0:
+                progress(count, total)
+            if table_id and table_id in table_row_map:
+                row_idx = table_row_map[table_id]
                 table_val = f"=Tables!A{row_idx}"
             else:
-                table_val = guest.table_id if guest.table_id else ""
-            ws_guests.append([guest.id, guest.name, guest.category, guest.size, table_val])
+                table_val = table_id if table_id else ""
+            ws_guests.append([g_id, name, category, size, table_val])
 
         # Sheet 3: Metadata (IDs)
         ws_meta = wb.create_sheet("Metadata")
@@ -38,105 +96,169 @@ class ExcelIO:
         wb.save(filename)
 
     @staticmethod
-    def load_from_xlsx(filename: str, seating_plan: SeatingPlan, clear: bool = True):
-        wb = openpyxl.load_workbook(filename, data_only=True)
-        
+    def load_from_xlsx(filename: str, seating_plan: SeatingPlan, clear: bool = True, repair: bool = True,
+                       progress=None, dedup=None):
+        """
+        Loads (or merges) a workbook written by save_to_xlsx. Returns the plan's ValidationReport.
+        progress(guest rows read, total rows or None) is called every 1000 rows; an exception it
+        raises aborts the load and leaves the plan as it was.
+        dedup: Optional dedup.GuestDeduplicator for the plan, to report or collapse duplicate guests
+        """
+        # Read-only mode streams rows straight from the sheet XML instead of building
+        # a cell object for every cell first. Formulas are read as written: openpyxl-saved
+        # files have no cached values, so data_only would turn every "=Tables!A<n>" seat
+        # reference into None
+        wb = openpyxl.load_workbook(filename, read_only=True, data_only=False)
+        try:
+            duplicates = len(dedup.duplicates) if dedup is not None else 0
+            try:
+                return ExcelIO._load_in_batch(wb, None, seating_plan, clear, repair, progress, dedup)
+            except _CachedValuesNeeded:
+                pass
+            # Edited in Excel: computed cells (e.g. a capacity of =5+5) are read from the
+            # results Excel cached, alongside the seat references
+            if dedup is not None:
+                dedup.rollback(duplicates)
+            values = openpyxl.load_workbook(filename, read_only=True, data_only=True)
+            try:
+                return ExcelIO._load_in_batch(wb, values, seating_plan, clear, repair, progress, dedup)
+            finally:
+                values.close()
+        finally:
+            wb.close()
+
+    @staticmethod
+    def _load_in_batch(wb, values, seating_plan: SeatingPlan, clear: bool, repair: bool, progress, dedup):
+        # One transaction: indexes are rebuilt once and a failed load leaves the plan untouched
+        with seating_plan.batch(validate=False):
+            ExcelIO._load_workbook(wb, seating_plan, clear, progress, dedup, values)
+            return seating_plan.validate(repair=repair)
+
+    @staticmethod
+    def _resolve_formulas(rows, cached_rows=None, seat_col=None):
+        """
+        Rows with each formula replaced by the value Excel cached for it (cached_rows:
+        the same rows from a data_only workbook), except seat references in seat_col.
+        Without cached_rows, a formula that needs its value raises _CachedValuesNeeded.
+        """
+        for row in rows:
+            cached = next(cached_rows) if cached_rows is not None else None
+            if not any(type(cell) is str and cell[:1] == "=" for cell in row):
+                yield row
+                continue
+            row = list(row)
+            for i, cell in enumerate(row):
+                if type(cell) is str and cell[:1] == "=" and not (i == seat_col and _TABLE_REF.match(cell)):
+                    if cached is None:
+                        raise _CachedValuesNeeded()
+                    row[i] = cached[i] if i < len(cached) else None
+            yield row
+
+    @staticmethod
+    def _load_workbook(wb, seating_plan: SeatingPlan, clear: bool, progress=None, dedup=None, values=None):
+        def rows(sheet, min_row, max_col, seat_col=None):
+            sheet_rows = wb[sheet].iter_rows(min_row=min_row, max_col=max_col, values_only=True)
+            cached_rows = values[sheet].iter_rows(min_row=min_row, max_col=max_col, values_only=True) if values else None
+            return ExcelIO._resolve_formulas(sheet_rows, cached_rows, seat_col)
+
         if clear:
             # Clear existing data
-            seating_plan.guests.clear()
-            seating_plan.tables.clear()
+            seating_plan.clear()
+        if dedup is not None:
+            dedup.next_source()
             
         table_mapping = {} # old_id -> new_id
         guest_mapping = {} # old_id -> new_id
+        table_rows = {} # Tables sheet row -> old_id, to resolve seat formulas
         
         # Load Tables
         if "Tables" in wb.sheetnames:
-            ws_tables = wb["Tables"]
-            for row in ws_tables.iter_rows(min_row=2, values_only=True):
-                if row[0] is not None:
-                    t_id_raw, name, capacity, x, y = row[:5]
-                    
-                    try:
-                        t_id = int(float(t_id_raw))
-                    except (ValueError, TypeError):
+            for row_idx, (t_id, name, capacity, x, y) in enumerate(rows("Tables", 2, 5), start=2):
+                if t_id is None:
+                    continue
+                if type(t_id) is not int:
+                    t_id = _cell_int(t_id)
+                    if t_id is None:
                         continue
-                    # Ensure numeric values are ints
-                    try:
-                        capacity = int(float(capacity))
-                        x = int(float(x))
-                        y = int(float(y))
-                    except (ValueError, TypeError):
-                        pass # Keep original or handle error? For now, let it fail or assume valid input if not caught here, but int() conversion is what we want.
-                    
-                    # Merge handling
-                    old_t_id = t_id
-                    if not clear and t_id in seating_plan.tables:
-                        t_id = seating_plan.next_table_id
-                        seating_plan.next_table_id += 1
-                        
-                    table_mapping[old_t_id] = t_id
-                    
-                    table = Table(id=t_id, name=name, capacity=capacity, x=x, y=y)
-                    seating_plan.tables[t_id] = table
+                # Numbers are kept as written if they do not parse; validation reports them
+                capacity, x, y = _int_or_raw(capacity), _int_or_raw(x), _int_or_raw(y)
+
+                # Merge handling
+                old_t_id = t_id
+                if not clear and (t_id in seating_plan.tables or t_id in seating_plan.reserved_table_ids):
+                    t_id = seating_plan.next_table_id
+                    seating_plan.next_table_id += 1
+
+                table_mapping[old_t_id] = t_id
+                table_rows[row_idx] = old_t_id
+
+                seating_plan.insert_table(Table(id=t_id, name=name, capacity=capacity, x=x, y=y))
 
         # Load Guests
         if "Guests" in wb.sheetnames:
             ws_guests = wb["Guests"]
-            for row in ws_guests.iter_rows(min_row=2, values_only=True):
-                if row[0] is not None:
-                    # Check row length to support backward compatibility (old files have 4 cols, new have 5)
-                    if len(row) >= 5:
-                        g_id, name, category, size, table_id = row[:5]
-                        if size is None: size = 1
-                    else:
-                        g_id, name, category, table_id = row[:4]
+            header = next(ws_guests.iter_rows(max_row=1, values_only=True), ())
+            # Old files have 4 columns (no group size): ID, Name, Category, Table ID
+            legacy = sum(cell is not None for cell in header) < 5
+            total = ws_guests.max_row - 1 if ws_guests.max_row else None
+            insert_guest = seating_plan.insert_guest
+            guest_rows = rows("Guests", 2, 4, 3) if legacy else rows("Guests", 2, 5, 4)
+            for rows_read, row in enumerate(guest_rows, 1):
+                if progress is not None and rows_read % 1000 == 0:
+                    progress(rows_read, total)
+                if legacy:
+                    g_id, name, category, table_id = row
+                    size = 1
+                else:
+                    g_id, name, category, size, table_id = row
+                if g_id is None:
+                    continue
+
+                if type(g_id) is not int:
+                    g_id = _cell_int(g_id)
+                    if g_id is None:
+                        continue
+                if type(size) is not int:
+                    size = _cell_int(size)
+                    if size is None:
                         size = 1
-                    
-                    try:
-                        g_id = int(float(g_id))
-                    except (ValueError, TypeError):
+
+                # Seat: a table row reference, a plain id, or empty
+                if table_id is not None and type(table_id) is not int:
+                    ref = _TABLE_REF.match(table_id) if isinstance(table_id, str) else None
+                    table_id = table_rows.get(int(ref.group(1))) if ref else _cell_int(table_id)
+                if table_id is not None and not clear:
+                    table_id = table_mapping.get(table_id, table_id)
+
+                old_g_id = g_id
+                if dedup is not None:
+                    kept_id = dedup.absorb(name, category, size, table_id)
+                    if kept_id is not None:
+                        guest_mapping[old_g_id] = kept_id
                         continue
-                    
-                    if table_id is not None and str(table_id).strip() != "":
-                         try:
-                              table_id = int(float(table_id))
-                              if not clear and table_id in table_mapping:
-                                  table_id = table_mapping[table_id]
-                         except (ValueError, TypeError):
-                              table_id = None
-                    else:
-                         table_id = None
-                    
-                    old_g_id = g_id
-                    if not clear and g_id in seating_plan.guests:
-                        g_id = seating_plan.next_guest_id
-                        seating_plan.next_guest_id += 1
-                        
-                    guest_mapping[old_g_id] = g_id
-                    
-                    guest = Guest(id=g_id, name=name, category=category, size=int(size), table_id=table_id)
-                    seating_plan.guests[g_id] = guest
-                    
-                    # Link to table
-                    if table_id is not None and table_id in seating_plan.tables:
-                        seating_plan.tables[table_id].guest_ids.append(g_id)
+                if not clear and (g_id in seating_plan.guests or g_id in seating_plan.reserved_guest_ids):
+                    g_id = seating_plan.next_guest_id
+                    seating_plan.next_guest_id += 1
+
+                guest_mapping[old_g_id] = g_id
+
+                # Stored and linked to its table (if present) in one step
+                insert_guest(Guest(id=g_id, name=name, category=category, size=size, table_id=table_id))
+                if dedup is not None:
+                    dedup.add(g_id, name, category)
 
         # Load Metadata
         if "Metadata" in wb.sheetnames:
-            ws_meta = wb["Metadata"]
-            row_meta = next(ws_meta.iter_rows(min_row=2, values_only=True), None)
+            row_meta = next(rows("Metadata", 2, 2), None)
             if row_meta:
-                loaded_next_guest_id = row_meta[0]
-                loaded_next_table_id = row_meta[1]
+                loaded_next_guest_id = _cell_int(row_meta[0])
+                loaded_next_table_id = _cell_int(row_meta[1])
                 if clear:
-                    seating_plan.next_guest_id = loaded_next_guest_id
-                    seating_plan.next_table_id = loaded_next_table_id
+                    seating_plan.next_guest_id = loaded_next_guest_id or 1
+                    seating_plan.next_table_id = loaded_next_table_id or 1
                 else:
-                    try:
-                        seating_plan.next_guest_id = max(seating_plan.next_guest_id, int(loaded_next_guest_id))
-                        seating_plan.next_table_id = max(seating_plan.next_table_id, int(loaded_next_table_id))
-                    except:
-                        pass
+                    seating_plan.next_guest_id = max(seating_plan.next_guest_id, loaded_next_guest_id or 1)
+                    seating_plan.next_table_id = max(seating_plan.next_table_id, loaded_next_table_id or 1)
         
         # Recalculate IDs regardless to be safe
         if seating_plan.guests:
@@ -147,6 +269,9 @@ class ExcelIO:
     @staticmethod
     def get_headers(filename: str) -> list[str]:
         """Returns the headers (first row) of the active sheet."""
+        rows = ExcelIO.cache.rows(filename)
+        if rows is not None:
+            return [str(cell) for cell in rows[0] if cell is not None] if rows else []
         wb = openpyxl.load_workbook(filename, read_only=True, data_only=True)
         ws = wb.active
         headers = []
@@ -157,30 +282,110 @@ class ExcelIO:
         return headers
 
     @staticmethod
-    def import_groups_to_plan(filename: str, group_col: str, count_col: str, seating_plan: SeatingPlan, category_col: str = None):
+    def import_groups_to_plan(filename: str, group_col: str, count_col: str, seating_plan: SeatingPlan, category_col: str = None,
+                              progress=None, dedup=None):
         """
         Imports groups from Excel.
         group_col: Header name for the group/guest name column
         count_col: Header name for the count column
         category_col: Optional header name for the category column
+        progress: Optional callback, progress(rows read, total rows or None), every 1000 rows
+        dedup: Optional dedup.GuestDeduplicator for the plan; duplicate groups are reported or skipped
+        """
+        header, rows, total = ExcelIO._split_sheet(ExcelIO.sheet_rows(filename, progress))
+        group_idx, count_idx, category_idx = ExcelIO._column_indices(header, group_col, count_col, category_col)
+        with seating_plan.batch(validate=False):
+            ExcelIO._add_group_rows(rows, group_idx, count_idx, category_idx, seating_plan, progress, total, dedup)
+
+    @staticmethod
+    def read_groups(filename: str, group_col: str, count_col: str, category_col: str = None, key_col: str = None,
+                    progress=None) -> list:
+        """
+        Reads the groups import_groups_to_plan would add, as (key, name, category, count)
+        tuples in sheet order. key is the key_col cell (None without key_col).
+        """
+        header, rows, total = ExcelIO._split_sheet(ExcelIO.sheet_rows(filename, progress))
+        indices = ExcelIO._column_indices(header, group_col, count_col, category_col, key_col)
+        return list(ExcelIO._iter_groups(rows, *indices, progress=progress, total=total))
+
+    @staticmethod
+    def sheet_rows(filename: str, progress=None):
+        """
+        All rows (header first) of the active sheet as value tuples, from ExcelIO.cache
+        when the file has been read before. progress(rows read, total rows or None)
+        is called every 1000 rows while the workbook is parsed.
+
+        A sheet too big for the cache is not built as a list: the result is then a
+        StreamedSheet, which reads the rows from the workbook as they are iterated.
         """
+        return ExcelIO.cache.load(filename, ExcelIO._read_sheet_rows, progress)
+
+    @staticmethod
+    def _read_sheet_rows(filename: str, progress=None):
         wb = openpyxl.load_workbook(filename, read_only=True, data_only=True)
-        ws = wb.active
-        
-        # Find column indices
-        headers = []
-        for row in ws.iter_rows(min_row=1, max_row=1, values_only=True):
-            headers = [str(cell) for cell in row]
-            break
-            
         try:
-            group_idx = headers.index(group_col)
-            count_idx = headers.index(count_col)
-            category_idx = headers.index(category_col) if category_col else None
+            ws = wb.active
+            total = ws.max_row or None
+            stream = ws.iter_rows(values_only=True)
+            rows = []
+            if total and ws.max_column and not ExcelIO.cache.fits(total * ws.max_column):
+                return StreamedSheet(wb, rows, stream, total)
+            cells = 0
+            for rows_read, row in enumerate(stream, 1):
+                if progress is not None and rows_read % 1000 == 0:
+                    progress(rows_read, total)
+                rows.append(row)
+                cells += len(row)
+                if not ExcelIO.cache.fits(cells):
+                    # Bigger than its <dimension> said, or it had none: the rest is streamed
+                    return StreamedSheet(wb, rows, stream, total)
+        except BaseException:
+            wb.close()
+            raise
+        wb.close()
+        return rows
+
+    @staticmethod
+    def _split_sheet(rows):
+        """([header row], iterator over the data rows, their number or None) of sheet_rows' result."""
+        if isinstance(rows, list):
+            return rows[:1], islice(rows, 1, None), len(rows) - 1
+        data = iter(rows)
+        return list(islice(data, 1)), data, rows.total - 1 if rows.total else None
+
+    @staticmethod
+    def _column_indices(rows: list, *columns) -> list:
+        """Header positions of the given columns (None stays None)."""
+        headers = [str(cell) for cell in rows[0]] if rows else []
+        return ExcelIO._find_columns(headers, *columns)
+
+    @staticmethod
+    def _find_columns(headers: list, *columns) -> list:
+        try:
+            return [headers.index(column) if column else None for column in columns]
         except ValueError as e:
              raise ValueError(f"Column not found in headers: {headers}. Error: {e}")
 
-        for row in ws.iter_rows(min_row=2, values_only=True):
+    @staticmethod
+    def _add_group_rows(rows, group_idx, count_idx, category_idx, seating_plan: SeatingPlan, progress=None, total=None,
+                        dedup=None):
+        if dedup is not None:
+            dedup.next_source()
+        for _, name, category, count in ExcelIO._iter_groups(rows, group_idx, count_idx, category_idx,
+                                                             progress=progress, total=total):
+            if dedup is not None and dedup.absorb(name, category, count) is not None:
+                continue
+
+            # Create guests
+            guest = seating_plan.add_guest(name=name, category=category, size=count)
+            if dedup is not None:
+                dedup.add(guest.id, guest.name, category)
+
+    @staticmethod
+    def _iter_groups(rows, group_idx, count_idx, category_idx, key_idx=None, progress=None, total=None):
+        for rows_read, row in enumerate(rows, 1):
+            if progress is not None and rows_read % 1000 == 0:
+                progress(rows_read, total)
             if not row: continue
             
             group_name = row[group_idx]
@@ -201,7 +406,4 @@ class ExcelIO:
                 if cat_val:
                     category = str(cat_val)
 
-            # Create guests
-            seating_plan.add_guest(name=str(group_name), category=category, size=count)
-        
-        wb.close()
+            yield (row[key_idx] if key_idx is not None else None), str(group_name), category, count
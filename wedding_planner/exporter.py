@@ -5,8 +5,16 @@ from .models import SeatingPlan
 class GoogleSheetsExporter:
     def __init__(self, credentials_file: str):
         self.gc = gspread.service_account(filename=credentials_file)
+        # sheet identifier -> (plan fingerprint, url) of the last successful export
+        self._exported = {}
+
+    def export(self, seating_plan: SeatingPlan, sheet_identifier: str, force: bool = False, progress=None):
+        """progress(step, 3) is called after opening the sheet and after the guests are uploaded."""
+        fingerprint = seating_plan.fingerprint()
+        last = self._exported.get(sheet_identifier)
+        if not force and last is not None and last[0] == fingerprint:
+            return last[1]  # nothing changed since the last export
 
-    def export(self, seating_plan: SeatingPlan, sheet_identifier: str):
         try:
             if "docs.google.com/spreadsheets" in sheet_identifier:
                 sh = self.gc.open_by_url(sheet_identifier)
@@ -18,6 +26,8 @@ class GoogleSheetsExporter:
             # Create if it doesn't exist (only by name)
             sh = self.gc.create(sheet_identifier)
             print(f"Created new sheet: {sh.url}")
+        if progress is not None:
+            progress(1, 3)
 
         # Export Guests
         try:
@@ -39,6 +49,8 @@ class GoogleSheetsExporter:
             guest_data.append([guest.name, guest.category, guest.size, table_name])
             
         guest_worksheet.update([guest_header] + guest_data)
+        if progress is not None:
+            progress(2, 3)
 
         # Export Tables
         try:
@@ -59,4 +71,5 @@ class GoogleSheetsExporter:
             
         table_worksheet.update([table_header] + table_data)
 
+        self._exported[sheet_identifier] = (fingerprint, sh.url)
         return sh.url
@@ -0,0 +1,51 @@
+from hashlib import blake2b
+from typing import Dict, Iterable, Optional, Tuple
+
+_MASK = (1 << 64) - 1
+
+
+def _digest(*values) -> int:
+    # Stable across processes and platforms (unlike hash()), and blind to the
+    # int/str/float spelling differences JSON and XLSX introduce for the same value
+    text = "\x1f".join("" if v is None else str(v) for v in values)
+    return int.from_bytes(blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def guest_digest(guest_id, name, category, table_id, size) -> int:
+    return _digest("guest", guest_id, name, category, table_id, size)
+
+
+def table_digest(table_id, name, capacity, x, y) -> int:
+    return _digest("table", table_id, name, capacity, x, y)
+
+
+class ContentHash:
+    """
+    Order-independent content hash of a plan: the sum (mod 2**64) of one digest per
+    guest and per table, so records can be added and removed in O(1) and the
+    result does not depend on insertion order. Per-table sums cover the table's
+    own fields plus every guest seated there.
+    """
+
+    def __init__(self, guests: Iterable[Tuple] = (), tables: Iterable[Tuple] = ()):
+        self.total = 0
+        self.tables: Dict[int, int] = {}
+        for record in guests:
+            self.add_guest(*record)
+        for record in tables:
+            self.add_table(*record)
+
+    def _add(self, table_id: Optional[int], digest: int):
+        self.total = (self.total + digest) & _MASK
+        if table_id is not None:
+            value = (self.tables.get(table_id, 0) + digest) & _MASK
+            if value:
+                self.tables[table_id] = value
+            else:
+                self.tables.pop(table_id, None)
+
+    def add_guest(self, guest_id, name, category, table_id, size, sign: int = 1):
+        self._add(table_id, sign * guest_digest(guest_id, name, category, table_id, size))
+
+    def add_table(self, table_id, name, capacity, x, y, sign: int = 1):
+        self._add(table_id, sign * table_digest(table_id, name, capacity, x, y))
@@ -1,11 +1,23 @@
 from .exporter import GoogleSheetsExporter
 from .excel_io import ExcelIO
+from .csv_io import CsvIO, group_reader, is_csv_file
 import arabic_reshaper
 from bidi.algorithm import get_display
 import os
 import tkinter as tk
 from tkinter import ttk, simpledialog, messagebox, filedialog
-from .models import SeatingPlan, Guest, Table
+from .models import SeatingPlan, Guest, Table, CapacityError
+from .history import PlanHistory
+from .jobs import JobRunner, save_atomically
+from .diff import KINDS, PlanDiff, diff_plans, load_plan_file
+from .dedup import GuestDeduplicator
+from .bulk_merge import merge_records, read_workbooks
+from .preview import read_sample
+from .rsvp_sync import RsvpSync, RsvpWatcher
+from .journal import PlanJournal
+from .rendering import ProgressiveRenderer, viewport_order
+from .session import Session
+from .indexes import fold, name_matches
 from .styles import Styles
 
 def fix_text(text):
@@ -13,6 +25,11 @@ def fix_text(text):
     reshaped_text = arabic_reshaper.reshape(str(text))
     return get_display(reshaped_text)
 
+def duplicate_finder(plan):
+    # Merges and imports only report likely duplicates, matched on name and
+    # category: the same name on another side is often another family
+    return GuestDeduplicator(plan, by_category=True, collapse=False)
+
 class RTLStringDialog(simpledialog.Dialog):
     def __init__(self, parent, title, prompt, initialvalue=None):
         self.prompt = prompt
@@ -60,7 +77,7 @@ class RTLStringDialog(simpledialog.Dialog):
         box.pack()
 
 class WeddingPlannerGUI:
-    def __init__(self, root):
+    def __init__(self, root, autosave_path=None, session_path=None):
         self.root = root
         self.root.title("Wedding Seating Planner")
         self.root.geometry("1000x800")
@@ -77,6 +94,52 @@ class WeddingPlannerGUI:
 
         self.setup_ui()
 
+        # Repaint only what each plan change touches
+        self.seating_plan.subscribe(self.on_plan_event)
+        self.history = PlanHistory(self.seating_plan)
+        # filename -> (plan fingerprint, file mtime) at the last save/load, to skip no-op saves
+        self.saved_state = {}
+        self.sheets_exporter = None
+        # Save/load/import/export run here, off the Tk thread (see run_job)
+        self.jobs = JobRunner(self.root)
+        self.rsvp_watcher = None
+        self.root.bind("<Control-z>", lambda e: self.undo())
+        self.root.bind("<Control-y>", lambda e: self.redo())
+
+        # Last file and zoom; set before the journal restores the plan so it is drawn once
+        self.session = Session(session_path) if session_path else None
+        if self.session is not None:
+            self.zoom_var.set(min(2.0, max(0.5, self.session.zoom)))
+
+        # Every edit is journaled next to the autosave; the last session comes back on start
+        self.journal = None
+        if autosave_path:
+            try:
+                self.journal = PlanJournal(self.seating_plan, autosave_path)
+            except (OSError, ValueError) as e:
+                messagebox.showwarning("Autosave", f"Autosave is off: {e}")
+            self.history.clear()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # Without an autosave to restore, reopen the last plan file in the background
+        if self.session is not None and not (self.seating_plan.guests or self.seating_plan.tables):
+            last_file = self.session.restorable_file()
+            if last_file:
+                self.open_plan(last_file)
+
+    def on_close(self):
+        self.stop_rsvp_sync()
+        self.jobs.cancel_all()
+        if self.journal is not None:
+            self.journal.close()
+        if self.session is not None:
+            self.session.zoom = self.zoom_var.get()
+            try:
+                self.session.save()
+            except OSError:
+                pass
+        self.root.destroy()
+
     def setup_ui(self):
         self.fix_text = fix_text
         
@@ -101,6 +164,8 @@ class WeddingPlannerGUI:
 
         create_btn(toolbar, "+ Guest", self.add_guest_dialog)
         create_btn(toolbar, "+ Table", self.add_table_dialog)
+        create_btn(toolbar, "Undo", self.undo, style="Secondary.TButton")
+        create_btn(toolbar, "Redo", self.redo, style="Secondary.TButton")
         
         # Spacer
         ttk.Frame(toolbar, style="White.TFrame").pack(side=tk.LEFT, expand=True, fill=tk.X)
@@ -114,6 +179,7 @@ class WeddingPlannerGUI:
         self.auto_use_default_capacity = True
 
         create_btn_right(toolbar, "Settings", self.settings_dialog)
+        create_btn_right(toolbar, "Compare", self.compare_dialog)
         create_btn_right(toolbar, "Import Groups", self.import_groups_dialog)
         create_btn_right(toolbar, "Load XLSX", self.load_excel)
         create_btn_right(toolbar, "Save XLSX", self.save_excel)
@@ -126,6 +192,14 @@ class WeddingPlannerGUI:
         self.stats_label = ttk.Label(self.stats_frame, text="Ready", font=Styles.normal_font, foreground=Styles.muted_text_color)
         self.stats_label.pack(side=tk.LEFT)
 
+        # Background task progress, shown while a job runs
+        self.job_frame = ttk.Frame(self.stats_frame, style="TFrame")
+        self.job_label = ttk.Label(self.job_frame, text="", font=Styles.normal_font, foreground=Styles.muted_text_color)
+        self.job_label.pack(side=tk.LEFT, padx=(0, 5))
+        self.job_progress = ttk.Progressbar(self.job_frame, length=160, mode="indeterminate")
+        self.job_progress.pack(side=tk.LEFT)
+        ttk.Button(self.job_frame, text="Cancel", command=self.cancel_jobs, style="Secondary.TButton", cursor="hand2").pack(side=tk.LEFT, padx=5)
+
         # --- Main Layout ---
         paned_window = ttk.PanedWindow(self.root, orient=tk.HORIZONTAL)
         paned_window.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 20))
@@ -214,25 +288,19 @@ class WeddingPlannerGUI:
         # Right Click for Context Menu (Linux/Windows use Button-3, macOS might need Button-2 but sticking to standard for now)
         self.canvas.bind("<Button-3>", self.on_canvas_right_click)
 
+        # Full redraws are spread over several Tk turns, visible tables first
+        self.renderer = ProgressiveRenderer(self.root, self._draw_table_id)
+
         self.update_stats()
 
 
 
     def treeview_sort_column(self, tv, col, reverse):
-        l = [(tv.set(k, col), k) for k in tv.get_children('')]
-        
-        # Save sort state
+        # Save sort state; the list is rebuilt in model order so incremental
+        # row inserts (see update_guest_row) land in the same order
         self.sort_col = col
         self.sort_reverse = reverse
-        
-        # Try to convert to int for size column or if data is numeric
-        try:
-            l.sort(key=lambda t: int(t[0]), reverse=reverse)
-        except ValueError:
-            l.sort(reverse=reverse)
-
-        for index, (val, k) in enumerate(l):
-            tv.move(k, '', index)
+        self.refresh_guest_list()
 
         # Reverse sort next time
         tv.heading(col, command=lambda: self.treeview_sort_column(tv, col, not reverse))
@@ -250,13 +318,14 @@ class WeddingPlannerGUI:
         # self.guest_tree.yview_scroll(int(-1*(event.delta/120)), "units")
 
     def update_stats(self):
-        total_guests = sum(g.size for g in self.seating_plan.guests.values())
-        seated_guests = sum(g.size for g in self.seating_plan.guests.values() if g.table_id is not None)
-        unseated = total_guests - seated_guests
+        plan = self.seating_plan
+        total_guests = plan.total_head_count
+        seated_guests = plan.seated_head_count
+        unseated = plan.unseated_head_count
         
-        total_tables = len(self.seating_plan.tables)
-        total_capacity = sum(t.capacity for t in self.seating_plan.tables.values())
-        total_occupancy = sum(sum(self.seating_plan.guests[g_id].size for g_id in t.guest_ids) for t in self.seating_plan.tables.values())
+        total_tables = len(plan.tables)
+        total_capacity = plan.total_capacity
+        total_occupancy = seated_guests
         
         text = (f"Guests: {seated_guests}/{total_guests} Seated  •  {unseated} Waiting  |  "
                 f"Tables: {total_tables} Active  •  {total_occupancy}/{total_capacity} Seats Used")
@@ -269,34 +338,10 @@ class WeddingPlannerGUI:
             
         self.current_list_guest_ids = []
         
-        self.current_list_guest_ids = []
-        
-        # Filter unseated guests
-        guests = [g for g in self.seating_plan.guests.values() if g.table_id is None]
-        
-        # Filter unseated guests
-        guests = [g for g in self.seating_plan.guests.values() if g.table_id is None]
-        
-        # Filter by Search
-        search_query = self.search_var.get().lower().strip() if hasattr(self, 'search_var') else ""
-        search_col = self.search_col_var.get() if hasattr(self, 'search_col_var') else "All"
-        
-        if search_query:
-            filtered = []
-            for g in guests:
-                match = False
-                if search_col == "All":
-                    # Check name and category
-                    if search_query in g.name.lower() or search_query in g.category.lower():
-                        match = True
-                elif search_col == "Name":
-                     if search_query in g.name.lower(): match = True
-                elif search_col == "Category":
-                     if search_query in g.category.lower(): match = True
-                
-                if match:
-                    filtered.append(g)
-            guests = filtered
+        # Unseated guests matching the search, straight from the plan's indexes
+        search_query, search_col = self._search_terms()
+        guest_ids = self.seating_plan.search_guests(search_query, search_col, unseated_only=True)
+        guests = [self.seating_plan.guests[g_id] for g_id in guest_ids]
         
         # Apply sort
         key_func = lambda g: getattr(g, self.sort_col)
@@ -317,15 +362,84 @@ class WeddingPlannerGUI:
         for guest in guests:
                 # Insert into Treeview
                 # Use guest ID as item ID (iid)
-                self.guest_tree.insert("", "end", iid=str(guest.id), values=(
-                    self.fix_text(guest.name),
-                    self.fix_text(guest.category),
-                    guest.size
-                ))
+                self.guest_tree.insert("", "end", iid=str(guest.id), values=self._guest_row_values(guest))
                 self.current_list_guest_ids.append(guest.id)
         
         self.update_stats()
 
+    def _guest_row_values(self, guest):
+        return (self.fix_text(guest.name), self.fix_text(guest.category), guest.size)
+
+    def _search_terms(self):
+        search_query = self.search_var.get().strip() if hasattr(self, 'search_var') else ""
+        search_col = self.search_col_var.get() if hasattr(self, 'search_col_var') else "All"
+        return search_query, search_col
+
+    def _matches_search(self, guest):
+        # Same rules as SeatingPlan.search_guests: word prefix on names, substring on categories
+        search_query, search_col = self._search_terms()
+        if not search_query:
+            return True
+
+        in_name = name_matches(guest.name, search_query)
+        in_category = fold(search_query) in fold(guest.category)
+        if search_col == "Name":
+            return in_name
+        if search_col == "Category":
+            return in_category
+        return in_name or in_category
+
+    def _sorted_index(self, guest):
+        # Position of guest in the current (sorted) list, matching refresh_guest_list
+        key = getattr(guest, self.sort_col)
+        try:
+            for index, other_id in enumerate(self.current_list_guest_ids):
+                other_key = getattr(self.seating_plan.guests[other_id], self.sort_col)
+                if (other_key < key) if self.sort_reverse else (other_key > key):
+                    return index
+        except (TypeError, KeyError):
+            pass
+        return len(self.current_list_guest_ids)
+
+    def update_guest_row(self, guest_id):
+        """Inserts, updates or removes a single guest row instead of rebuilding the list."""
+        iid = str(guest_id)
+        guest = self.seating_plan.guests.get(guest_id)
+        listed = guest is not None and guest.table_id is None and self._matches_search(guest)
+
+        if guest_id in self.current_list_guest_ids:
+            self.current_list_guest_ids.remove(guest_id)
+            self.guest_tree.delete(iid)
+        if listed:
+            index = self._sorted_index(guest)
+            self.guest_tree.insert("", index, iid=iid, values=self._guest_row_values(guest))
+            self.current_list_guest_ids.insert(index, guest_id)
+
+    def redraw_table(self, table_id):
+        """Redraws (or erases, if it no longer exists) a single table and its seats."""
+        self.renderer.discard(table_id)  # drawn here, not by a refresh still in progress
+        self.canvas.delete(f"group_{table_id}")
+        table = self.seating_plan.tables.get(table_id)
+        if table is not None:
+            self.draw_table(table)
+
+    def on_plan_event(self, event):
+        # Large batches (loads, imports) are cheaper to redraw wholesale
+        if event.kind == "plan_cleared" or len(event.guest_ids) + len(event.table_ids) > 200:
+            self.refresh_canvas()
+            self.refresh_guest_list()
+            return
+
+        for table_id in event.table_ids:
+            self.redraw_table(table_id)
+        for guest_id in event.guest_ids:
+            self.update_guest_row(guest_id)
+            # Seated guests being renamed/resized also change their table's drawing
+            guest = self.seating_plan.guests.get(guest_id)
+            if guest is not None and guest.table_id is not None and guest.table_id not in event.table_ids:
+                self.redraw_table(guest.table_id)
+        self.update_stats()
+
     # Need to update on_guest_press to work with treeview
     def on_guest_press(self, event):
         item = self.guest_tree.identify_row(event.y)
@@ -367,24 +481,36 @@ class WeddingPlannerGUI:
         # for i in range(0, 2000, 40):
         #     self.canvas.create_line(i, 0, i, 2000, fill="#e5e7eb", dash=(2, 4))
         #     self.canvas.create_line(0, i, 2000, i, fill="#e5e7eb", dash=(2, 4))
-            
-        for table in self.seating_plan.tables.values():
-            self.draw_table(table)
+        if w <= 1 or h <= 1:
+            w, h = 1000, 800  # not mapped yet (startup): assume the default window size
+
+        # The tables in view are drawn now, the rest in later slices (see ProgressiveRenderer)
+        left, top = self.canvas.canvasx(0), self.canvas.canvasy(0)
+        order = viewport_order(self.seating_plan.tables.values(), left, top, left + w, top + h, self.zoom_var.get())
+        self.renderer.start(order)
         self.update_stats()
 
+    def _draw_table_id(self, table_id):
+        table = self.seating_plan.tables.get(table_id)
+        if table is not None:
+            self.draw_table(table)
+
 
     def draw_table(self, table):
         z = getattr(self, "zoom_var", tk.DoubleVar(value=1.0)).get()
         x, y = table.x * z, table.y * z
         r = 70 * z
         
+        # Every item carries group_<id> so the table can be redrawn on its own
+        group = f"group_{table.id}"
+
         # Shadow connection
-        self.canvas.create_oval(x-r+4*z, y-r+4*z, x+r+4*z, y+r+4*z, fill="#bdc3c7", outline="", tags=("table", f"table_{table.id}"))
+        self.canvas.create_oval(x-r+4*z, y-r+4*z, x+r+4*z, y+r+4*z, fill="#bdc3c7", outline="", tags=("table", f"table_{table.id}", group))
         
         # Table Body
         
         # Color based on fullness
-        occupancy = sum(self.seating_plan.guests[g_id].size for g_id in table.guest_ids)
+        occupancy = self.seating_plan.get_occupancy(table.id)
         if occupancy >= table.capacity:
             fill = Styles.table_full_color
             border = Styles.error_color if occupancy > table.capacity else Styles.table_outline_color
@@ -399,7 +525,7 @@ class WeddingPlannerGUI:
                               fill=fill, 
                               outline=border, 
                               width=int(3*z) if occupancy > 0 else int(2*z), 
-                              tags=("table", f"table_{table.id}"))
+                              tags=("table", f"table_{table.id}", group))
         
         # Table Info
         info_text = f"{self.fix_text(table.name)}\n{occupancy}/{table.capacity}"
@@ -412,7 +538,7 @@ class WeddingPlannerGUI:
                               font=font_style, 
                               fill=text_color, 
                               justify=tk.CENTER,
-                              tags=("table", f"table_{table.id}"))
+                              tags=("table", f"table_{table.id}", group))
 
                 # Visual Chairs/Guests
         import math
@@ -438,7 +564,7 @@ class WeddingPlannerGUI:
                 
                 if is_occupied:
                     guest_id = seat_assignments[i]
-                    tags = ("seated_guest", f"guest_{guest_id}")
+                    tags = ("seated_guest", f"guest_{guest_id}", group)
                     
                     # Seat circle (Filled)
                     self.canvas.create_oval(sx-seat_r, sy-seat_r, sx+seat_r, sy+seat_r,
@@ -451,7 +577,7 @@ class WeddingPlannerGUI:
                     small_font_size = max(6, int(10 * z))
                     self.canvas.create_text(sx, sy, text=self.fix_text(initial), font=(Styles.font_family, small_font_size), fill="white", tags=tags)
                 else:
-                    tags = ("table", f"table_{table.id}")
+                    tags = ("table", f"table_{table.id}", group)
                     # Empty seat (Outline)
                     self.canvas.create_oval(sx-seat_r+2*z, sy-seat_r+2*z, sx+seat_r-2*z, sy+seat_r-2*z,
                                           fill=Styles.bg_color, outline=Styles.secondary_hover, width=max(1, int(2*z)),
@@ -506,20 +632,16 @@ class WeddingPlannerGUI:
                 self.drag_data["type"] = "table"
                 self.drag_data["x"] = event.x
                 self.drag_data["y"] = event.y
+                table = self.seating_plan.tables.get(self.drag_data["item"])
+                if table is not None:
+                    self.drag_data["origin"] = (table.x, table.y)
                 break
 
     def on_canvas_drag(self, event):
         z = getattr(self, "zoom_var", tk.DoubleVar(value=1.0)).get()
         if self.drag_data["item"] is not None:
             if self.drag_data["type"] == "table":
-                dx = (event.x - self.drag_data["x"]) / z
-                dy = (event.y - self.drag_data["y"]) / z
-                table = self.seating_plan.tables[self.drag_data["item"]]
-                table.x += dx
-                table.y += dy
-                self.drag_data["x"] = event.x
-                self.drag_data["y"] = event.y
-                self.refresh_canvas()
+                self._drag_table_to(event, z)
             elif self.drag_data["type"] == "seated_guest":
                 if hasattr(self, 'drag_window'):
                     self.drag_window.geometry(f"+{event.x_root}+{event.y_root}")
@@ -554,9 +676,6 @@ class WeddingPlannerGUI:
             else:
                 # Dropped in empty space -> Unseat
                 self.seating_plan.unseat_guest(guest_id)
-            
-            self.refresh_canvas()
-            self.refresh_guest_list()
 
         self.drag_data = {"item": None, "x": 0, "y": 0, "type": None}
 
@@ -568,7 +687,6 @@ class WeddingPlannerGUI:
             category = d_cat.result or "General"
             size = simpledialog.askinteger("Add Guest", "Group Size:", minvalue=1, initialvalue=1) or 1
             self.seating_plan.add_guest(name, category, size)
-            self.refresh_guest_list()
 
     def add_table_dialog(self):
         d = RTLStringDialog(self.root, "Add Table", "Table Name:")
@@ -576,12 +694,10 @@ class WeddingPlannerGUI:
         if name:
             if self.auto_use_default_capacity:
                 self.seating_plan.add_table(name, self.default_table_capacity)
-                self.refresh_canvas()
             else:
                 capacity = simpledialog.askinteger("Add Table", "Capacity:", minvalue=1, initialvalue=self.default_table_capacity)
                 if capacity:
                     self.seating_plan.add_table(name, capacity)
-                    self.refresh_canvas()
 
     def settings_dialog(self):
         dialog = tk.Toplevel(self.root)
@@ -619,58 +735,244 @@ class WeddingPlannerGUI:
             
         ttk.Button(dialog, text="Save", command=save, style="Primary.TButton").pack(pady=10)
 
+    def _file_state(self, filename):
+        mtime = os.path.getmtime(filename) if os.path.exists(filename) else None
+        return (self.seating_plan.fingerprint(), mtime)
+
+    def _is_saved(self, filename):
+        return os.path.exists(filename) and self.saved_state.get(filename) == self._file_state(filename)
+
+    def _mark_saved(self, filename, fingerprint=None):
+        # fingerprint: what a background save wrote, if the plan may have changed since
+        state = self._file_state(filename)
+        self.saved_state[filename] = state if fingerprint is None else (fingerprint, state[1])
+
+    # --- Background jobs ---
+
+    def run_job(self, title, work, on_done, failure="Error"):
+        """
+        Runs work(job) on a worker thread with a progress bar and Cancel button;
+        on_done(result) is called on the Tk thread. One job runs at a time.
+        """
+        def finish():
+            self.job_progress.stop()
+            self.job_frame.pack_forget()
+
+        def done(result):
+            finish()
+            on_done(result)
+
+        def failed(e):
+            finish()
+            messagebox.showerror("Error", f"{failure}: {e}")
+
+        def cancelled():
+            finish()
+            self.stats_label.config(text=f"{title} cancelled")
+
+        self.job_label.config(text=title)
+        self.job_progress.config(mode="indeterminate")
+        self.job_progress.start(20)
+        self.job_frame.pack(side=tk.RIGHT)
+        return self.jobs.submit(title, work, done, failed, self._on_job_progress, cancelled)
+
+    def _job_slot_free(self):
+        if self.jobs.busy:
+            messagebox.showinfo("Busy", "Another task is still running. Wait for it or cancel it first.")
+            return False
+        return True
+
+    def _on_job_progress(self, job, done, total, message):
+        if total:
+            if str(self.job_progress.cget("mode")) != "determinate":
+                self.job_progress.stop()
+                self.job_progress.config(mode="determinate")
+            self.job_progress.config(value=100 * done / total)
+        self.job_label.config(text=message or f"{job.title} ({done:,})")
+
+    def cancel_jobs(self):
+        self.jobs.cancel_all()
+
     def save_plan(self):
-        filename = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON Files", "*.json")])
+        filename = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON Files", "*.json"), ("Compressed JSON", "*.json.gz"), ("Packed Plan", "*.seatplan"), ("SQLite Database", "*.sqlite")])
         if filename:
-            self.seating_plan.save_to_file(filename)
-            messagebox.showinfo("Success", "Plan saved successfully!")
+            if self._is_saved(filename):
+                messagebox.showinfo("Success", "No changes since the last save.")
+                return
+            if not self._job_slot_free():
+                return
+            # Written from a snapshot, so editing can go on during the save
+            snapshot = self.seating_plan.snapshot()
+
+            def work(job):
+                with snapshot:
+                    save_atomically(lambda path: snapshot.save_to_file(path, progress=job.progress), filename)
+                    return snapshot.fingerprint()
+
+            def done(fingerprint):
+                self._mark_saved(filename, fingerprint)
+                self._remember_file(filename)
+                messagebox.showinfo("Success", "Plan saved successfully!")
+
+            self.run_job("Saving plan", work, done, "Failed to save")
 
     def load_plan(self):
-        filename = filedialog.askopenfilename(filetypes=[("JSON Files", "*.json")])
-        if filename:
-            self.seating_plan.load_from_file(filename)
-            self.refresh_guest_list()
-            self.refresh_canvas()
-    
-    def save_excel(self):
-        filename = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Excel Files", "*.xlsx")])
-        if filename:
+        filename = filedialog.askopenfilename(filetypes=[("Seating Plans", "*.json *.json.gz *.seatplan *.sqlite *.db")])
+        if filename and self._job_slot_free():
+            self.open_plan(filename)
+
+    def open_plan(self, filename):
+        def work(job):
+            # Read into a plan of its own; the current plan is replaced only once it is complete
+            loaded = SeatingPlan()
+            report = loaded.load_from_file(filename, progress=job.progress)
+            return loaded, report
+
+        def done(result):
+            loaded, report = result
+            self.stop_rsvp_sync()
+            self.seating_plan.replace_with(loaded)
+            self._after_load(filename, report)
+            self._remember_file(filename)
+
+        self.run_job("Loading plan", work, done, "Failed to load")
+
+    def _remember_file(self, filename):
+        if self.session is not None:
+            self.session.last_file = os.path.abspath(filename)
             try:
-                ExcelIO.save_to_xlsx(self.seating_plan, filename)
+                self.session.save()
+            except OSError:
+                pass
+
+    def _after_load(self, filename, report):
+        # A repaired plan no longer matches its file, so only a clean load counts as saved
+        if report.ok:
+            if filename:
+                self._mark_saved(filename)
+        else:
+            messagebox.showwarning("Plan Repaired", report.summary())
+
+    def save_excel(self):
+        filename = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Excel Files", "*.xlsx"), ("CSV Files", "*.csv"), ("TSV Files", "*.tsv")])
+        if filename and is_csv_file(filename):
+            self.export_csv(filename)
+        elif filename:
+            if self._is_saved(filename):
+                messagebox.showinfo("Success", "No changes since the last save.")
+                return
+            if not self._job_slot_free():
+                return
+            snapshot = self.seating_plan.snapshot()
+
+            def work(job):
+                with snapshot:
+                    save_atomically(lambda path: ExcelIO.save_to_xlsx(snapshot, path, progress=job.progress), filename)
+                    return snapshot.fingerprint()
+
+            def done(fingerprint):
+                self._mark_saved(filename, fingerprint)
                 messagebox.showinfo("Success", "Plan saved to Excel successfully!")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to save Excel: {e}")
+
+            self.run_job("Saving Excel", work, done, "Failed to save Excel")
+
+    def export_csv(self, filename):
+        # Guests go to filename, tables to a ".tables" file next to it
+        if not self._job_slot_free():
+            return
+        snapshot = self.seating_plan.snapshot()
+
+        def work(job):
+            with snapshot:
+                save_atomically(lambda path: CsvIO.save_guests(snapshot, path, progress=job.progress), filename)
+                save_atomically(lambda path: CsvIO.save_tables(snapshot, path), CsvIO.tables_path(filename))
+
+        def done(_):
+            messagebox.showinfo("Success", f"Plan exported to {os.path.basename(filename)} and {os.path.basename(CsvIO.tables_path(filename))}.")
+
+        self.run_job("Exporting CSV", work, done, "Failed to export CSV")
 
     def load_excel(self):
-        filename = filedialog.askopenfilename(filetypes=[("Excel Files", "*.xlsx")])
-        if filename:
-            try:
-                # Ask user if they want to replace or merge
-                if getattr(self, "seating_plan", None) and (self.seating_plan.guests or self.seating_plan.tables):
-                    answer = messagebox.askyesnocancel("Load Excel", "Do you want to clear the existing plan completely?\n\nYes: Clear and Replace\nNo: Merge into current plan\nCancel: Abort load")
-                    if answer is None:
-                        return # Cancelled
-                    clear_plan = answer
+        filenames = filedialog.askopenfilenames(filetypes=[("Excel Files", "*.xlsx")])
+        if len(filenames) > 1:
+            self.load_excel_files(filenames)
+            return
+        filename = filenames[0] if filenames else None
+        if filename and self._job_slot_free():
+            # Ask user if they want to replace or merge
+            if getattr(self, "seating_plan", None) and (self.seating_plan.guests or self.seating_plan.tables):
+                answer = messagebox.askyesnocancel("Load Excel", "Do you want to clear the existing plan completely?\n\nYes: Clear and Replace\nNo: Merge into current plan\nCancel: Abort load")
+                if answer is None:
+                    return # Cancelled
+                clear_plan = answer
+            else:
+                clear_plan = True
+
+            def work(job):
+                loaded = SeatingPlan()
+                report = ExcelIO.load_from_xlsx(filename, loaded, progress=job.progress)
+                return loaded, report
+
+            def done(result):
+                loaded, report = result
+                message = "Plan loaded from Excel successfully!"
+                if clear_plan:
+                    self.stop_rsvp_sync()
+                    self.seating_plan.replace_with(loaded)
                 else:
-                    clear_plan = True
-                    
-                ExcelIO.load_from_xlsx(filename, self.seating_plan, clear=clear_plan)
-                self.refresh_guest_list()
-                self.refresh_canvas()
-                messagebox.showinfo("Success", "Plan loaded from Excel successfully!")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to load Excel: {e}")
+                    # Merged on the Tk thread, against the plan as it is now
+                    dedup = duplicate_finder(self.seating_plan)
+                    self.seating_plan.merge_from(loaded, dedup=dedup)
+                    report = self.seating_plan.validate(repair=True)
+                    if dedup.duplicates:
+                        message += "\n\n" + dedup.summary()
+                self._after_load(filename if clear_plan else None, report)
+                messagebox.showinfo("Success", message)
+
+            self.run_job("Loading Excel", work, done, "Failed to load Excel")
+
+    def load_excel_files(self, filenames):
+        """Several workbooks at once: parsed in worker processes, then merged in the order picked."""
+        if not self._job_slot_free():
+            return
+        clear_plan = False
+        if self.seating_plan.guests or self.seating_plan.tables:
+            answer = messagebox.askyesnocancel("Load Excel", f"Merge {len(filenames)} files.\n\nDo you want to clear the existing plan first?\n\nYes: Clear and Replace\nNo: Merge into current plan\nCancel: Abort load")
+            if answer is None:
+                return
+            clear_plan = answer
+
+        def work(job):
+            return read_workbooks(filenames, progress=job.progress)
+
+        def done(records):
+            target = SeatingPlan() if clear_plan else self.seating_plan
+            dedup = duplicate_finder(target)
+            report = merge_records(target, records, dedup)
+            if clear_plan:
+                self.stop_rsvp_sync()
+                self.seating_plan.replace_with(target)
+            message = f"{len(records)} Excel files merged successfully!"
+            if dedup.duplicates:
+                message += "\n\n" + dedup.summary()
+            self._after_load(None, report)
+            messagebox.showinfo("Success", message)
+
+        self.run_job("Loading Excel", work, done, "Failed to load Excel")
 
     def import_groups_dialog(self):
-        filename = filedialog.askopenfilename(filetypes=[("Excel Files", "*.xlsx")])
+        filename = filedialog.askopenfilename(filetypes=[("Guest Lists", "*.xlsx *.csv *.tsv"), ("Excel Files", "*.xlsx"), ("CSV/TSV Files", "*.csv *.tsv")])
         if not filename:
             return
+        reader = group_reader(filename)
 
         try:
-            headers = ExcelIO.get_headers(filename)
+            # Only the first rows: the dialog opens quickly on large files
+            sample = read_sample(filename)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to read file: {e}")
             return
+        headers = sample.headers
 
         if not headers:
             messagebox.showerror("Error", "No headers found in the first row.")
@@ -679,7 +981,7 @@ class WeddingPlannerGUI:
         # Dialog for column mapping
         dialog = tk.Toplevel(self.root)
         dialog.title("Import Guest Groups")
-        dialog.geometry("400x500")
+        dialog.geometry("640x900")
         dialog.configure(bg=Styles.bg_color)
         dialog.transient(self.root)
         dialog.grab_set()
@@ -707,6 +1009,44 @@ class WeddingPlannerGUI:
         cat_combo.pack()
         cat_combo.current(0)
 
+        # Key (Optional): a column that identifies a row even if the name is edited
+        ttk.Label(dialog, text="Key Column (Optional):").pack(pady=5)
+        key_var = tk.StringVar(dialog)
+        key_combo = ttk.Combobox(dialog, textvariable=key_var, values=["(None)"] + [self.fix_text(h) for h in headers], state="readonly")
+        key_combo.pack()
+        key_combo.current(0)
+
+        sync_var = tk.BooleanVar(dialog, value=False)
+        ttk.Checkbutton(dialog, text="Keep in sync with this file", variable=sync_var).pack(pady=10)
+
+        # Preview of the first rows with the chosen columns
+        preview_label = ttk.Label(dialog, text="", font=Styles.normal_font, wraplength=600)
+        preview_label.pack(padx=15, pady=5, anchor="w")
+        preview_tree = ttk.Treeview(dialog, columns=("line", "name", "size", "category", "note"), show="headings", height=8)
+        for col, title, width in (("line", "Row", 50), ("name", "Name", 170), ("size", "Size", 50),
+                                  ("category", "Category", 130), ("note", "Note", 220)):
+            preview_tree.heading(col, text=title, anchor="w")
+            preview_tree.column(col, width=width)
+        preview_tree.pack(fill=tk.X, padx=15)
+
+        def show_preview(event=None):
+            header_map = {self.fix_text(h): h for h in headers}
+            group_col, count_col = header_map.get(group_var.get()), header_map.get(count_var.get())
+            category_col = header_map.get(cat_var.get()) if cat_var.get() != "(None)" else None
+            preview_tree.delete(*preview_tree.get_children())
+            if not group_col or not count_col:
+                preview_label.config(text="")
+                return
+            preview = sample.preview(group_col, count_col, category_col)
+            preview_label.config(text=preview.summary())
+            for row in preview.rows:
+                preview_tree.insert("", tk.END, values=(row.line, self.fix_text(row.name), row.count if not row.skipped else "",
+                                                        self.fix_text(row.category), row.problem or ""))
+
+        for combo in (group_combo, count_combo, cat_combo):
+            combo.bind("<<ComboboxSelected>>", show_preview)
+        show_preview()
+
         def do_import():
             # We need to map back the fixed text to the original header for internal logic if we were using it for lookups not by index?
             # Actually import_groups_to_plan uses the string value to find index.
@@ -732,17 +1072,61 @@ class WeddingPlannerGUI:
                 messagebox.showerror("Error", "Please select both columns.")
                 return
 
-            try:
-                ExcelIO.import_groups_to_plan(filename, group_col, count_col, self.seating_plan, category_col)
-                self.refresh_guest_list()
-                self.update_stats()
-                messagebox.showinfo("Success", "Groups imported successfully!")
-                dialog.destroy()
-            except Exception as e:
-                messagebox.showerror("Error", f"Import failed: {e}")
+            if not self._job_slot_free():
+                return
+            dialog.destroy()
+
+            if sync_var.get():
+                key_col = header_map.get(key_var.get()) if key_var.get() != "(None)" else None
+                self.start_rsvp_sync(RsvpSync(self.seating_plan, filename, group_col, count_col, category_col, key_col))
+                return
+
+            def work(job):
+                imported = SeatingPlan()
+                reader.import_groups_to_plan(filename, group_col, count_col, imported, category_col, progress=job.progress)
+                return imported
+
+            def done(imported):
+                # New guests get fresh ids after the plan's current ones. Groups already
+                # in the plan (e.g. from an earlier RSVP sheet) are added too, then reported
+                dedup = duplicate_finder(self.seating_plan)
+                self.seating_plan.merge_from(imported, renumber=True, dedup=dedup)
+                message = "Groups imported successfully!"
+                if dedup.duplicates:
+                    message += "\n\n" + dedup.summary()
+                messagebox.showinfo("Success", message)
+
+            self.run_job("Importing groups", work, done, "Import failed")
 
         ttk.Button(dialog, text="Import", command=do_import, style="Primary.TButton").pack(pady=20)
 
+    def start_rsvp_sync(self, sync):
+        """Syncs once now, then again whenever the file is saved (replacing any earlier sync)."""
+        self.stop_rsvp_sync()
+
+        def on_sync(result):
+            if result.changed:
+                self.stats_label.config(text=f"RSVP sync: {result.summary()}")
+
+        def on_error(e):
+            self.stats_label.config(text=f"RSVP sync failed: {e}")
+
+        def done(sheet):
+            if sync.detached:
+                return  # another plan was opened meanwhile
+            result = sync.apply(sheet)
+            messagebox.showinfo("Success", f"Groups synced with {os.path.basename(sync.filename)}.\n\n{result.summary()}")
+            self.rsvp_watcher = RsvpWatcher(self.root, sync, self.jobs, on_sync=on_sync, on_error=on_error)
+            self.rsvp_watcher.start()
+
+        self.run_job("Syncing RSVPs", lambda job: sync.read(job.progress), done, "Sync failed")
+
+    def stop_rsvp_sync(self):
+        """Drops the RSVP sync; its links belong to the plan as it is now, so any replace ends it."""
+        if self.rsvp_watcher is not None:
+            self.rsvp_watcher.stop()
+            self.rsvp_watcher = None
+
     def export_to_sheets(self):
         # check for credentials
         creds_file = "credentials.json"
@@ -751,13 +1135,69 @@ class WeddingPlannerGUI:
              return
 
         sheet_name = simpledialog.askstring("Export to Sheets", "Enter Google Sheet Name or URL:")
-        if sheet_name:
-            try:
-                exporter = GoogleSheetsExporter(creds_file)
-                url = exporter.export(self.seating_plan, sheet_name)
+        if sheet_name and self._job_slot_free():
+            snapshot = self.seating_plan.snapshot()
+            exporter = self.sheets_exporter
+
+            def work(job):
+                with snapshot:
+                    # Kept between exports so an unchanged plan is not uploaded again
+                    sheets = exporter or GoogleSheetsExporter(creds_file)
+                    return sheets, sheets.export(snapshot, sheet_name, progress=job.progress)
+
+            def done(result):
+                self.sheets_exporter, url = result
                 messagebox.showinfo("Success", f"Exported successfully!\nCheck your Google Drive or open:\n{url}")
-            except Exception as e:
-                messagebox.showerror("Export Failed", str(e))
+
+            self.run_job("Exporting to Google Sheets", work, done, "Export failed")
+
+    def compare_dialog(self):
+        filename = filedialog.askopenfilename(title="Compare with...", filetypes=[("Seating Plans", "*.json *.json.gz *.seatplan *.sqlite *.db *.xlsx")])
+        if not filename or not self._job_slot_free():
+            return
+        snapshot = self.seating_plan.snapshot()
+
+        def work(job):
+            with snapshot:
+                other = load_plan_file(filename)
+                job.check()
+                return diff_plans(snapshot, other)
+
+        self.run_job("Comparing plans", work, lambda diff: self.show_diff(diff, os.path.basename(filename)), "Compare failed")
+
+    def show_diff(self, diff: PlanDiff, other_name: str, max_rows: int = 2000):
+        """Side-by-side list of what differs between this plan and another one."""
+        dialog = tk.Toplevel(self.root)
+        dialog.title(f"Compare: this plan / {other_name}")
+        dialog.geometry("800x550")
+        dialog.configure(bg=Styles.bg_color)
+        dialog.transient(self.root)
+
+        ttk.Label(dialog, text=diff.summary(), font=Styles.normal_font, wraplength=760).pack(padx=15, pady=10, anchor="w")
+        frame = ttk.Frame(dialog)
+        frame.pack(fill=tk.BOTH, expand=True, padx=15, pady=(0, 15))
+        tree = ttk.Treeview(frame, columns=("before", "after"), show="tree headings")
+        tree.heading("#0", text="Change", anchor="w")
+        tree.heading("before", text="This plan", anchor="w")
+        tree.heading("after", text=self.fix_text(other_name), anchor="w")
+        tree.column("#0", width=240)
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        for kind in KINDS:
+            changes = diff.by_kind(kind)
+            if not changes:
+                continue
+            parent = tree.insert("", tk.END, text=f"{diff.title(kind)} ({len(changes)})", open=len(changes) <= 50)
+            # Treeview slows down with very many rows; the summary has the full counts
+            for change in changes[:max_rows]:
+                before, after = diff.describe(change)
+                tree.insert(parent, tk.END, text=self.fix_text(change.name),
+                            values=(self.fix_text(before), self.fix_text(after)))
+            if len(changes) > max_rows:
+                tree.insert(parent, tk.END, text=f"... {len(changes) - max_rows} more")
 
     # --- Drag and Drop Logic ---
 
@@ -816,9 +1256,6 @@ class WeddingPlannerGUI:
                         success = self.seating_plan.assign_guest_to_table(self.drag_data["item"], table_id)
                         if not success:
                             messagebox.showwarning("Warning", "Table is full!")
-                        else:
-                            self.refresh_guest_list()
-                            self.refresh_canvas()
                         break
 
         self.drag_data = {"item": None, "x": 0, "y": 0, "type": None}
@@ -835,22 +1272,34 @@ class WeddingPlannerGUI:
                 self.drag_data["type"] = "table"
                 self.drag_data["x"] = event.x
                 self.drag_data["y"] = event.y
+                table = self.seating_plan.tables.get(self.drag_data["item"])
+                if table is not None:
+                    self.drag_data["origin"] = (table.x, table.y)
                 break
 
     def on_canvas_drag(self, event):
         z = getattr(self, "zoom_var", tk.DoubleVar(value=1.0)).get()
         if self.drag_data["item"] is not None and self.drag_data["type"] == "table":
-            dx = (event.x - self.drag_data["x"]) / z
-            dy = (event.y - self.drag_data["y"]) / z
-            table = self.seating_plan.tables[self.drag_data["item"]]
-            table.x += dx
-            table.y += dy
-            self.drag_data["x"] = event.x
-            self.drag_data["y"] = event.y
-            self.refresh_canvas()
+            self._drag_table_to(event, z)
+
+    def _drag_table_to(self, event, z):
+        # Position is derived from the press point so coordinates stay integers
+        # (accumulating per-motion float deltas drifted and produced float x/y)
+        origin_x, origin_y = self.drag_data.get("origin", (0, 0))
+        x = round(origin_x + (event.x - self.drag_data["x"]) / z)
+        y = round(origin_y + (event.y - self.drag_data["y"]) / z)
+        self.seating_plan.move_table(self.drag_data["item"], x, y)
 
     def on_canvas_release(self, event):
         self.drag_data = {"item": None, "x": 0, "y": 0, "type": None}
+        # A whole drag is one undo step
+        self.history.seal()
+
+    def undo(self):
+        self.history.undo()
+
+    def redo(self):
+        self.history.redo()
 
     def on_table_double_click(self, event):
         # Identify table
@@ -880,10 +1329,10 @@ class WeddingPlannerGUI:
                 guest = self.seating_plan.guests[guest_id]
                 display = f"{guest.name} ({guest.size})" if guest.size > 1 else guest.name
                 listbox.insert(tk.END, self.fix_text(display))
-            current_occupancy = sum(self.seating_plan.guests[g_id].size for g_id in table.guest_ids)
+            current_occupancy = self.seating_plan.get_occupancy(table.id)
             occ_label.config(text=f"Guests ({current_occupancy}/{table.capacity})")
 
-        occ_label = ttk.Label(detail_window, text=f"Guests ({current_occupancy}/{table.capacity})", font=Styles.normal_font)
+        occ_label = ttk.Label(detail_window, text=f"Guests ({self.seating_plan.get_occupancy(table.id)}/{table.capacity})", font=Styles.normal_font)
         occ_label.pack(pady=5)
         
         listbox = tk.Listbox(detail_window, font=Styles.normal_font, borderwidth=1, relief="solid")
@@ -908,8 +1357,6 @@ class WeddingPlannerGUI:
                 guest_id = table.guest_ids[index]
                 self.seating_plan.unseat_guest(guest_id)
                 refresh_list()
-                self.refresh_canvas()
-                self.refresh_guest_list()
 
         ttk.Button(detail_window, text="Edit Guest", command=edit_selected_guest, style="Primary.TButton").pack(pady=5)
         ttk.Button(detail_window, text="Remove Selected", command=remove_selected, style="Secondary.TButton").pack(pady=10)
@@ -939,6 +1386,8 @@ class WeddingPlannerGUI:
         menu.add_command(label="Edit Properties (Name/Capacity)", command=lambda: self.edit_table_properties(table_id))
         menu.add_command(label="Edit Table ID", command=lambda: self.edit_table_id(table_id))
         menu.add_command(label="Add Guest to Table", command=lambda: self.add_guest_to_table_dialog(table_id))
+        menu.add_command(label="Seat Category Here", command=lambda: self.seat_category_dialog(table_id))
+        menu.add_command(label="Unseat Everyone", command=lambda: self.seating_plan.unseat_table(table_id))
         menu.add_separator()
         menu.add_command(label="Delete Table", command=lambda: self.delete_table(table_id), foreground="red")
         menu.post(event.x_root, event.y_root)
@@ -954,38 +1403,19 @@ class WeddingPlannerGUI:
         if new_name:
             new_capacity = simpledialog.askinteger("Edit Table", "Capacity:", initialvalue=table.capacity, minvalue=1)
             if new_capacity:
-                table.name = new_name
-                table.capacity = new_capacity
-                self.refresh_canvas()
-                self.update_stats()
+                self.seating_plan.update_table(table_id, name=new_name, capacity=new_capacity)
                 
     def edit_table_id(self, table_id):
         table = self.seating_plan.tables[table_id]
         new_id = simpledialog.askinteger("Edit Table ID", "New Table ID (must be unique):", initialvalue=table.id, minvalue=1)
         if new_id and new_id != table.id:
-            if new_id in self.seating_plan.tables:
+            if not self.seating_plan.change_table_id(table_id, new_id):
                 messagebox.showerror("Error", f"Table ID {new_id} already exists!")
                 return
-            
-            # Update all guest references
-            for guest_id in table.guest_ids:
-                self.seating_plan.guests[guest_id].table_id = new_id
-                
-            table.id = new_id
-            self.seating_plan.tables[new_id] = table
-            del self.seating_plan.tables[table_id]
-            
-            if new_id >= self.seating_plan.next_table_id:
-                self.seating_plan.next_table_id = new_id + 1
-            
-            self.refresh_canvas()
-            self.update_stats()
 
     def delete_table(self, table_id):
         if messagebox.askyesno("Delete Table", "Are you sure you want to delete this table?\nGuests will be unseated."):
             self.seating_plan.remove_table(table_id)
-            self.refresh_canvas()
-            self.refresh_guest_list()
 
     def add_guest_to_table_dialog(self, table_id):
         # Simple dialog to add a NEW guest directly to this table
@@ -999,24 +1429,32 @@ class WeddingPlannerGUI:
              if not success:
                  messagebox.showwarning("Warning", "Table is full!")
                  # maybe roll back guest creation? Or leave it unseated. Leaving it unseated is safer.
-             self.refresh_canvas()
-             self.refresh_guest_list()
+
+    def seat_category_dialog(self, table_id):
+        # Seat every waiting guest of one category at this table, all or nothing
+        category = simpledialog.askstring("Seat Category", "Category:")
+        if not category:
+            return
+        guest_ids = sorted(self.seating_plan.guests_in_category(category) & self.seating_plan.unseated_ids)
+        if not guest_ids:
+            messagebox.showinfo("Seat Category", f"No waiting guests in category '{category}'.")
+            return
+        try:
+            with self.seating_plan.batch():
+                for guest_id in guest_ids:
+                    self.seating_plan.assign_guest_to_table(guest_id, table_id)
+        except CapacityError:
+            messagebox.showwarning("Warning", "Not enough seats at this table for the whole category!")
 
     def add_table_at_pos(self, x, y):
         name = simpledialog.askstring("Add Table", "Table Name:")
         if name:
             if self.auto_use_default_capacity:
-                table = self.seating_plan.add_table(name, self.default_table_capacity)
-                table.x = x
-                table.y = y
-                self.refresh_canvas()
+                self.seating_plan.add_table(name, self.default_table_capacity, x=x, y=y)
             else:
                 capacity = simpledialog.askinteger("Add Table", "Capacity:", minvalue=1, initialvalue=self.default_table_capacity)
                 if capacity:
-                    table = self.seating_plan.add_table(name, capacity)
-                    table.x = x
-                    table.y = y
-                    self.refresh_canvas()
+                    self.seating_plan.add_table(name, capacity, x=x, y=y)
 
     def on_guest_right_click(self, event):
         item = self.guest_tree.identify_row(event.y)
@@ -1043,28 +1481,17 @@ class WeddingPlannerGUI:
             if new_category is not None: # check for None in case of cancel, empty string is valid
                 new_size = simpledialog.askinteger("Edit Guest", "Group Size:", initialvalue=guest.size, minvalue=1)
                 if new_size:
-                    guest.name = new_name
-                    guest.category = new_category
-                    # Check if size change affects seating
-                    old_size = guest.size
-                    guest.size = new_size
+                    self.seating_plan.update_guest(guest_id, name=new_name, category=new_category, size=new_size)
                     
                     if guest.table_id:
                         # Re-validate capacity
                         table = self.seating_plan.tables[guest.table_id]
-                        occupancy = sum(self.seating_plan.guests[g_id].size for g_id in table.guest_ids)
+                        occupancy = self.seating_plan.get_occupancy(table.id)
                         # We already updated size, so occupancy reflects new size
                         if occupancy > table.capacity:
                             messagebox.showwarning("Warning", f"New size exceeds table capacity ({occupancy}/{table.capacity}). Guest unseated.")
                             self.seating_plan.unseat_guest(guest.id)
 
-                self.refresh_guest_list() # Re-draw to show changes
-                if guest.table_id:
-                     self.refresh_canvas() # Update map if seated (initials might change)
-
     def delete_guest(self, guest_id):
         if messagebox.askyesno("Delete Guest", "Are you sure you want to delete this guest?"):
             self.seating_plan.remove_guest(guest_id)
-            self.refresh_guest_list()
-            self.refresh_canvas() # In case they were seated, though this menu is for the unseated list (mostly)
-            self.update_stats()
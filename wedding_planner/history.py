@@ -0,0 +1,97 @@
+from collections import deque
+from typing import List
+
+from .models import PlanEvent, SeatingPlan
+
+
+class PlanHistory:
+    """
+    Undo/redo for a SeatingPlan built from its change events.
+
+    Each entry is the list of deltas one user action produced (a single event or a
+    whole batch), so memory grows with what changed rather than with the plan size.
+    Consecutive moves of the same table are merged into one entry until seal() is
+    called, which keeps a drag from filling the history.
+    Clearing the plan or a batch too large to record (e.g. loading a file) resets
+    the history.
+    """
+
+    def __init__(self, plan: SeatingPlan, max_entries: int = 100):
+        self.plan = plan
+        self._undo: deque = deque(maxlen=max_entries)
+        self._redo: List[List[PlanEvent]] = []
+        self._replaying = False
+        self._sealed = True
+        plan.subscribe(self._on_event)
+
+    def detach(self):
+        self.plan.unsubscribe(self._on_event)
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+        self._sealed = True
+
+    def seal(self):
+        """Ends the current entry; the next change starts a new one (e.g. on mouse release)."""
+        self._sealed = True
+
+    def _on_event(self, event: PlanEvent):
+        if self._replaying:
+            return
+        if event.kind == "plan_cleared" or event.truncated or any(e.kind == "plan_cleared" for e in event.events):
+            self.clear()
+            return
+        if event.kind == "committed" and not event.events:
+            return
+
+        self._redo.clear()
+        last = self._undo[-1] if self._undo else None
+        if (event.kind == "table_moved" and not self._sealed and last is not None
+                and len(last) == 1 and last[0].kind == "table_moved"
+                and last[0].table_ids == event.table_ids):
+            # Keep the start position of the drag and the latest end position
+            merged = PlanEvent("table_moved", guest_ids=set(), table_ids=set(event.table_ids), table=event.table,
+                               old=last[0].old, new=event.new)
+            last[0] = merged
+            return
+
+        self._undo.append([event])
+        self._sealed = event.kind != "table_moved"
+
+    def _replay(self, events: List[PlanEvent], reverse: bool):
+        self._replaying = True
+        try:
+            # Applied through the incremental mutators: cost follows the size of the
+            # entry, not of the plan (a batch would rebuild every index on commit)
+            with self.plan._grouped():
+                for event in (reversed(events) if reverse else events):
+                    self.plan.apply_event(event, reverse=reverse)
+        finally:
+            self._replaying = False
+
+    def undo(self) -> bool:
+        if not self._undo:
+            return False
+        entry = self._undo.pop()
+        self._replay(entry, reverse=True)
+        self._redo.append(entry)
+        self._sealed = True
+        return True
+
+    def redo(self) -> bool:
+        if not self._redo:
+            return False
+        entry = self._redo.pop()
+        self._replay(entry, reverse=False)
+        self._undo.append(entry)
+        self._sealed = True
+        return True
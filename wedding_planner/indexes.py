@@ -0,0 +1,56 @@
+from bisect import bisect_left, insort
+from typing import Iterable, List, Set, Tuple
+
+
+def fold(text) -> str:
+    """Case-folded form used for all name/category lookups."""
+    return str(text).casefold()
+
+
+def _name_keys(name) -> List[str]:
+    # The folded name from the start of every word, so "cohen" and "david co"
+    # both find "David Cohen"
+    words = fold(name).split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+def name_matches(name, query: str) -> bool:
+    """The single-guest version of NamePrefixIndex.search."""
+    query = " ".join(fold(query).split())
+    return any(key.startswith(query) for key in _name_keys(name))
+
+
+class NamePrefixIndex:
+    """
+    Sorted (key, guest id) pairs for word-prefix name search.
+    Lookups are O(log n + matches); adds and removes are a bisect plus a list shift.
+    """
+
+    def __init__(self, items: Iterable[Tuple[int, str]] = ()):
+        self._entries: List[Tuple[str, int]] = sorted(
+            (key, guest_id) for guest_id, name in items for key in _name_keys(name))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, guest_id: int, name):
+        for key in _name_keys(name):
+            insort(self._entries, (key, guest_id))
+
+    def remove(self, guest_id: int, name):
+        entries = self._entries
+        for key in _name_keys(name):
+            index = bisect_left(entries, (key, guest_id))
+            if index < len(entries) and entries[index] == (key, guest_id):
+                del entries[index]
+
+    def search(self, prefix: str) -> Set[int]:
+        """Ids of guests with a word (or run of words) starting with prefix, case-insensitively."""
+        prefix = " ".join(fold(prefix).split())
+        entries = self._entries
+        matches = set()
+        index = bisect_left(entries, (prefix, -float("inf")))
+        while index < len(entries) and entries[index][0].startswith(prefix):
+            matches.add(entries[index][1])
+            index += 1
+        return matches
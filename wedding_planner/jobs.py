@@ -0,0 +1,149 @@
+"""
+Background jobs for the GUI: slow file and network work runs on a worker
+thread while the Tk main loop keeps handling input. Progress and results come
+back through a queue that is polled with root.after, so every callback runs on
+the Tk thread and may touch widgets and the plan.
+"""
+import os
+import queue
+import threading
+from typing import Callable, List, Optional
+
+
+class JobCancelled(Exception):
+    """Raised inside a job's work function once the job has been cancelled."""
+
+
+class Job:
+    """Handle given to a job's work function and returned by JobRunner.submit."""
+
+    def __init__(self, title: str, runner: "JobRunner"):
+        self.title = title
+        self._runner = runner
+        self._cancelled = threading.Event()
+        self.finished = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def check(self):
+        if self._cancelled.is_set():
+            raise JobCancelled(self.title)
+
+    def progress(self, done: int, total: Optional[int] = None, message: Optional[str] = None):
+        """
+        Reports progress (total None = unknown). Also a cancellation point, so
+        passing job.progress as a loader's progress callback makes it cancellable.
+        """
+        self.check()
+        self._runner._post(self, "progress", (done, total, message))
+
+
+class JobRunner:
+    """
+    Runs one function per job on a daemon thread. Callbacks (on_progress,
+    on_done, on_error, on_cancel) are called on the Tk thread; a job's result is
+    only applied by on_done, so a cancelled or failed job changes nothing.
+    """
+
+    def __init__(self, root, poll_ms: int = 50):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.jobs: List[Job] = []
+        self._queue: "queue.Queue" = queue.Queue()
+        self._callbacks = {}
+        self._polling = False
+
+    def submit(self, title: str, work: Callable[[Job], object], on_done: Optional[Callable] = None,
+               on_error: Optional[Callable[[Exception], None]] = None,
+               on_progress: Optional[Callable[[Job, int, Optional[int], Optional[str]], None]] = None,
+               on_cancel: Optional[Callable[[], None]] = None) -> Job:
+        job = Job(title, self)
+        self.jobs.append(job)
+        self._callbacks[job] = (on_done, on_error, on_progress, on_cancel)
+        threading.Thread(target=self._run, args=(job, work), name=f"job: {title}", daemon=True).start()
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+        return job
+
+    @property
+    def busy(self) -> bool:
+        return bool(self.jobs)
+
+    def cancel_all(self):
+        for job in self.jobs:
+            job.cancel()
+
+    def _post(self, job: Job, kind: str, value):
+        self._queue.put((job, kind, value))
+
+    def _run(self, job: Job, work):
+        try:
+            result = work(job)
+            job.check()
+        except JobCancelled:
+            self._post(job, "cancelled", None)
+        except Exception as e:
+            self._post(job, "error", e)
+        else:
+            self._post(job, "done", result)
+
+    def _poll(self):
+        # Only the latest progress of each job is shown; everything else in order
+        latest = {}
+        while True:
+            try:
+                job, kind, value = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                latest[job] = value
+                continue
+            latest.pop(job, None)
+            self._finish(job, kind, value)
+        for job, (done, total, message) in latest.items():
+            on_progress = self._callbacks.get(job, (None,) * 4)[2]
+            if on_progress is not None and not job.finished:
+                on_progress(job, done, total, message)
+
+        if self.jobs:
+            self.root.after(self.poll_ms, self._poll)
+        else:
+            self._polling = False
+
+    def _finish(self, job: Job, kind: str, value):
+        on_done, on_error, _, on_cancel = self._callbacks.pop(job)
+        job.finished = True
+        self.jobs.remove(job)
+        if kind == "done" and job.cancelled:
+            kind = "cancelled"  # cancelled after the work finished but before it was applied
+        if kind == "done":
+            if on_done is not None:
+                on_done(value)
+        elif kind == "error":
+            if on_error is not None:
+                on_error(value)
+        elif on_cancel is not None:
+            on_cancel()
+
+
+def temp_path(filename: str) -> str:
+    """A sibling path with the same extension, so savers pick the same format."""
+    stem, extension = os.path.splitext(filename)
+    return f"{stem}.part{extension}"
+
+
+def save_atomically(save: Callable[[str], None], filename: str):
+    """Calls save(path) on a temporary file and moves it over filename only if it completes."""
+    part = temp_path(filename)
+    try:
+        save(part)
+        os.replace(part, filename)
+    finally:
+        if os.path.exists(part):
+            os.remove(part)
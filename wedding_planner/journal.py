@@ -0,0 +1,200 @@
+import json
+import os
+import threading
+from typing import Iterator, List, Optional, Tuple
+
+from .models import PlanEvent, SeatingPlan
+
+
+def default_autosave_path() -> str:
+    return os.path.join(os.path.expanduser("~"), ".seater_planner", "autosave.seatplan")
+
+
+def _read_segments(filename: str) -> Iterator[Tuple[int, List[dict]]]:
+    """
+    Yields (base fingerprint, records) for every segment of a journal file.
+    A line that does not parse (a write torn by a crash) ends its segment.
+    """
+    if not os.path.exists(filename):
+        return
+    base, records, torn = None, [], False
+    with open(filename, encoding="utf-8") as f:
+        for line in f:
+            try:
+                data = json.loads(line)
+            except ValueError:
+                torn = True
+                continue
+            if "base" in data:
+                if base is not None:
+                    yield base, records
+                base, records, torn = data["base"], [], False
+            elif base is not None and not torn:
+                records.append(data)
+    if base is not None:
+        yield base, records
+
+
+class PlanJournal:
+    """
+    Autosave for a SeatingPlan: every change event is appended as one JSON line to
+    `<path>.journal`, so persisting an edit costs one small write however large the
+    plan is. Once `compact_after` records have piled up, a snapshot of the plan is
+    written to `path` in a background thread (see SeatingPlan.snapshot) and the
+    journal starts over.
+
+    Each journal segment starts with the fingerprint of the plan it applies to. On
+    construction the plan is loaded from the last snapshot and every segment whose
+    base matches is replayed on top, which recovers all changes up to a crash
+    whether or not a compaction was in flight. Batches too large to record (e.g.
+    loading a file) can only be saved as a snapshot: one is started right away, or
+    once the compaction in flight is done, and the events in between are left to it.
+    """
+
+    def __init__(self, plan: SeatingPlan, path: str, compact_after: int = 1000, fsync: bool = False,
+                 recover: bool = True):
+        self.plan = plan
+        self.path = path
+        self.compact_after = compact_after
+        self.fsync = fsync
+        self.journal_path = path + ".journal"
+        self.pending_path = path + ".journal.1"  # rotated out, waiting for its snapshot
+        self.recovered = 0
+        self.error: Optional[Exception] = None
+        self._records = 0
+        self._file = None
+        self._thread: Optional[threading.Thread] = None
+        self._replaying = False
+        self._needs_snapshot = False  # the segment no longer describes the plan
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if recover and any(os.path.exists(p) for p in (path, self.journal_path, self.pending_path)):
+            self._recover()
+            self._open_segment()
+            if self._records >= compact_after:
+                self.compact()
+        else:
+            self.compact()
+        plan.subscribe(self._on_event)
+
+    # --- Recovery ---
+
+    def _recover(self):
+        if os.path.exists(self.path):
+            self.plan.load_from_file(self.path, repair=False)
+        self._replaying = True
+        try:
+            for filename in (self.pending_path, self.journal_path):
+                for base, records in _read_segments(filename):
+                    # Segments already folded into the snapshot no longer match its content
+                    if base != self.plan.fingerprint() or not records:
+                        continue
+                    with self.plan.batch(validate=False):
+                        for data in records:
+                            self.plan.apply_event(PlanEvent.from_dict(data))
+                    self.recovered += len(records)
+                    self._records += len(records)
+        finally:
+            self._replaying = False
+
+    # --- Recording ---
+
+    def _open_segment(self):
+        self._file = open(self.journal_path, "a", encoding="utf-8")
+        if self._file.tell() > 0:
+            self._file.write("\n")  # terminate a line torn by a crash, if any
+        self._append({"base": self.plan.fingerprint()})
+
+    def _append(self, data: dict):
+        self._file.write(json.dumps(data, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def _on_event(self, event: PlanEvent):
+        if self._replaying or self._file is None:
+            return
+        if event.truncated or event.kind == "plan_cleared":
+            # Cheaper (and for truncated batches, only possible) as a fresh snapshot
+            self._needs_snapshot = True
+        if self._needs_snapshot:
+            # Until then nothing is appended: the snapshot will include these events too
+            if not self.compacting:
+                self.compact()
+            return
+        if event.kind == "committed" and not event.events:
+            return
+        self._append(event.to_dict())
+        self._records += 1
+        if self._records >= self.compact_after and not self.compacting:
+            self.compact()
+
+    # --- Compaction ---
+
+    @property
+    def compacting(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def compact(self, wait: bool = False):
+        """
+        Writes a full snapshot and starts a new journal. The snapshot is written in
+        a background thread unless `wait` is set.
+        """
+        self._join()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if os.path.exists(self.journal_path):
+            if os.path.exists(self.pending_path):
+                # The last compaction failed; its records still need this one to succeed
+                with open(self.journal_path, encoding="utf-8") as src, \
+                        open(self.pending_path, "a", encoding="utf-8") as dst:
+                    dst.write("\n" + src.read())
+                os.remove(self.journal_path)
+            else:
+                os.replace(self.journal_path, self.pending_path)
+
+        snapshot = self.plan.snapshot()
+        self._records = 0
+        self._needs_snapshot = False
+        self._open_segment()
+        if wait:
+            self._write_snapshot(snapshot)
+        else:
+            self._thread = threading.Thread(target=self._write_snapshot, args=(snapshot,), daemon=True)
+            self._thread.start()
+
+    def _write_snapshot(self, snapshot):
+        # Same extension, so the snapshot is written in the same format
+        stem, extension = os.path.splitext(self.path)
+        temp_path = stem + ".tmp" + extension
+        try:
+            with snapshot:
+                snapshot.save_to_file(temp_path)
+            with open(temp_path, "rb+") as f:
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+            if os.path.exists(self.pending_path):
+                os.remove(self.pending_path)
+            self.error = None
+        except (OSError, ValueError) as e:
+            # The pending journal is kept, so nothing is lost; the next compaction retries
+            self.error = e
+
+    def wait(self):
+        """Blocks until a background compaction has finished and any that came due meanwhile is done."""
+        self._join()
+        if self._needs_snapshot or self._records >= self.compact_after:
+            self.compact(wait=True)
+
+    def _join(self):
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def close(self):
+        self.plan.unsubscribe(self._on_event)
+        self.wait()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,188 @@
+import gzip
+import json
+import re
+from json.encoder import encode_basestring
+from typing import Callable, Iterator, Optional, Tuple
+
+from .storage import iter_guest_records
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_CHUNK = 1 << 16
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def _value(value) -> str:
+    # Hand-rolled record encoding: much faster than json.dumps per record
+    if value is None:
+        return "null"
+    if type(value) is str:
+        return encode_basestring(value)
+    if type(value) is int:
+        return str(value)
+    return json.dumps(value, ensure_ascii=False)
+
+
+def open_plan_file(filename: str, mode: str, compress: Optional[bool] = None):
+    """
+    Opens a plan file as text. Writing compresses when `compress` is set (default:
+    when the name ends in .gz); reading detects gzip from the file header.
+    """
+    if "r" in mode:
+        with open(filename, "rb") as f:
+            compress = f.read(2) == _GZIP_MAGIC
+    elif compress is None:
+        compress = filename.lower().endswith(".gz")
+    if compress:
+        return gzip.open(filename, mode + "t", encoding="utf-8", compresslevel=6)
+    return open(filename, mode, encoding="utf-8")
+
+
+def write_plan(plan, f, batch_size: int = 2000, progress: Optional[Callable[[int, Optional[int]], None]] = None):
+    """
+    Streams a plan (or PlanSnapshot) to an open text file as compact JSON, one
+    record at a time. The layout is the one load_from_file has always read.
+    progress(records written, total records) is called after every batch.
+    """
+    parts = []
+    total = len(plan.guests) + len(plan.tables)
+    written = 0
+
+    def flush():
+        nonlocal written
+        f.write("".join(parts))
+        written += len(parts)
+        parts.clear()
+        if progress is not None:
+            progress(written, total)
+
+    f.write('{"guests":[')
+    first = True
+    for g_id, name, category, table_id, size in iter_guest_records(plan.guests):
+        parts.append('%s{"id":%s,"name":%s,"category":%s,"table_id":%s,"size":%s}' % (
+            "" if first else ",", _value(g_id), _value(name), _value(category), _value(table_id), _value(size)))
+        first = False
+        if len(parts) >= batch_size:
+            flush()
+    flush()
+
+    f.write('],"tables":[')
+    first = True
+    for t_id in list(plan.tables):
+        table = plan.tables[t_id]
+        parts.append('%s{"id":%s,"name":%s,"capacity":%s,"guest_ids":[%s],"x":%s,"y":%s}' % (
+            "" if first else ",", _value(table.id), _value(table.name), _value(table.capacity),
+            ",".join(_value(g_id) for g_id in table.guest_ids), _value(table.x), _value(table.y)))
+        first = False
+        if len(parts) >= batch_size:
+            flush()
+    flush()
+
+    f.write('],"next_guest_id":%s,"next_table_id":%s}' % (_value(plan.next_guest_id), _value(plan.next_table_id)))
+
+
+class _Reader:
+    """Pulls JSON values out of a text stream without holding the whole file."""
+
+    def __init__(self, f):
+        self.f = f
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(_CHUNK)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop what has been consumed so the buffer stays chunk-sized
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos} of the plan file")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number at the very end of the buffer may continue in the next chunk
+            if end == len(self.buf) and not self.eof and isinstance(value, (int, float)):
+                if self._fill():
+                    continue
+            self.pos = end
+            return value
+
+    def array_items(self) -> Iterator[object]:
+        """Yields the items of the array whose "[" was just consumed."""
+        no_bulk_before = 0
+        while True:
+            if self.peek() == "]":
+                self.pos += 1
+                return
+            # Fast path: every complete object record in the buffer in one json.loads.
+            # A cut inside a string or past the array leaves invalid JSON, which
+            # just sends us down the record-by-record path below.
+            if self.pos >= no_bulk_before:
+                end = self.buf.find("}]", self.pos)
+                cut = self.buf.rfind("},", self.pos, len(self.buf) if end < 0 else end)
+                if cut > self.pos:
+                    try:
+                        items = json.loads("[" + self.buf[self.pos:cut + 1] + "]")
+                    except ValueError:
+                        no_bulk_before = cut + 1
+                    else:
+                        self.pos = cut + 2
+                        yield from items
+                        continue
+            yield self.value()
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("]")
+            return
+
+
+def read_plan(f) -> Iterator[Tuple[str, object]]:
+    """
+    Incrementally parses a plan file, yielding ("guest", dict) and ("table", dict)
+    for each record as soon as it is read, and (key, value) for other top-level keys.
+    Accepts both the compact and the old indented layout.
+    """
+    reader = _Reader(f)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        key = reader.value()
+        reader.expect(":")
+        if key in ("guests", "tables") and reader.peek() == "[":
+            kind = key[:-1]
+            reader.expect("[")
+            for item in reader.array_items():
+                yield kind, item
+        else:
+            yield key, reader.value()
+        if reader.peek() == ",":
+            reader.pos += 1
+            continue
+        reader.expect("}")
+        return
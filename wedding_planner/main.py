@@ -1,10 +1,19 @@
+import multiprocessing
 import tkinter as tk
+from wedding_planner.excel_io import ExcelIO
 from wedding_planner.gui import WeddingPlannerGUI
+from wedding_planner.journal import default_autosave_path
+from wedding_planner.session import default_session_path
+from wedding_planner.workbook_cache import default_cache_directory
 
 def main():
+    # Parsed guest lists are kept on disk too, so re-imports after a restart are quick
+    ExcelIO.cache.directory = default_cache_directory()
     root = tk.Tk()
-    app = WeddingPlannerGUI(root)
+    app = WeddingPlannerGUI(root, autosave_path=default_autosave_path(), session_path=default_session_path())
     root.mainloop()
 
 if __name__ == "__main__":
+    # Workbook merges run in worker processes (see bulk_merge.py)
+    multiprocessing.freeze_support()
     main()
@@ -1,6 +1,12 @@
-import json
-from dataclasses import dataclass, field
-from typing import List, Optional, Dict
+import weakref
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
+from itertools import compress, repeat
+from operator import is_, is_not
+from typing import Callable, Iterable, List, Optional, Dict, Set, Tuple
+
+from .fingerprint import ContentHash
+from .indexes import NamePrefixIndex, fold
 
 @dataclass
 class Guest:
@@ -23,21 +29,99 @@ class Guest:
     def from_dict(cls, data):
         return cls(**data)
 
+    def copy(self) -> "Guest":
+        return Guest(id=self.id, name=self.name, category=self.category, table_id=self.table_id, size=self.size)
+
+class GuestIdList:
+    """
+    Seating order of a table: an insertion-ordered set of guest ids.
+    Supports the list operations the app uses (append, remove, `in`, iteration,
+    indexing) with O(1) membership, append and removal.
+    """
+    __slots__ = ("_ids",)
+
+    def __init__(self, guest_ids: Iterable[int] = ()):
+        self._ids: Dict[int, None] = dict.fromkeys(guest_ids)
+
+    def append(self, guest_id: int):
+        self._ids[guest_id] = None
+
+    def extend(self, guest_ids: Iterable[int]):
+        for guest_id in guest_ids:
+            self._ids[guest_id] = None
+
+    def remove(self, guest_id: int):
+        try:
+            del self._ids[guest_id]
+        except KeyError:
+            raise ValueError(f"{guest_id} is not seated at this table") from None
+
+    def discard(self, guest_id: int):
+        self._ids.pop(guest_id, None)
+
+    def insert(self, index: int, guest_id: int):
+        """Seats guest_id at position index; O(n) unless it goes last."""
+        self._ids.pop(guest_id, None)
+        if index >= len(self._ids):
+            self._ids[guest_id] = None
+            return
+        ids = list(self._ids)
+        ids.insert(index, guest_id)
+        self._ids = dict.fromkeys(ids)
+
+    def clear(self):
+        self._ids.clear()
+
+    def index(self, guest_id: int) -> int:
+        if self._ids and next(reversed(self._ids)) == guest_id:
+            return len(self._ids) - 1
+        for index, other in enumerate(self._ids):
+            if other == guest_id:
+                return index
+        raise ValueError(f"{guest_id} is not seated at this table")
+
+    def __getitem__(self, index):
+        # Positional access is O(n); only used by the table details dialog
+        return list(self._ids)[index]
+
+    def __contains__(self, guest_id) -> bool:
+        return guest_id in self._ids
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __eq__(self, other):
+        if isinstance(other, GuestIdList):
+            return list(self._ids) == list(other._ids)
+        if isinstance(other, (list, tuple)):
+            return list(self._ids) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self._ids))
+
 @dataclass
 class Table:
     id: int
     name: str
     capacity: int
-    guest_ids: List[int] = field(default_factory=list)
+    guest_ids: GuestIdList = field(default_factory=GuestIdList)
     x: int = 0
     y: int = 0
 
+    def __post_init__(self):
+        if not isinstance(self.guest_ids, GuestIdList):
+            self.guest_ids = GuestIdList(self.guest_ids)
+
     def to_dict(self):
         return {
             "id": self.id,
             "name": self.name,
             "capacity": self.capacity,
-            "guest_ids": self.guest_ids,
+            "guest_ids": list(self.guest_ids),
             "x": self.x,
             "y": self.y
         }
@@ -46,96 +130,959 @@ class Table:
     def from_dict(cls, data):
         return cls(**data)
 
+    def copy(self) -> "Table":
+        return Table(id=self.id, name=self.name, capacity=self.capacity, guest_ids=GuestIdList(self.guest_ids), x=self.x, y=self.y)
+
+@dataclass
+class PlanEvent:
+    """
+    Change notification sent to SeatingPlan subscribers.
+
+    kind is one of:
+      guest_added, guest_removed, guest_updated, guest_seated (old_table_id -> new_table_id,
+      either may be None; old["seat"] is the position the guest left), table_added, table_removed, table_moved, table_resized,
+      table_renamed, table_id_changed (old_table_id -> new_table_id), plan_cleared and
+      committed (a whole batch; the individual deltas are in `events`).
+    `old` holds the previous values of the fields that changed and `new` the values
+    they were changed to; added/removed events carry the whole record (to_dict()) in
+    `new`/`old`, so an event is enough to redo or undo it (see SeatingPlan.apply_event).
+    A committed event with `truncated` set was too big to keep its deltas.
+    """
+    kind: str
+    guest_ids: Set[int] = field(default_factory=set)
+    table_ids: Set[int] = field(default_factory=set)
+    guest: Optional[Guest] = None
+    table: Optional[Table] = None
+    old_table_id: Optional[int] = None
+    new_table_id: Optional[int] = None
+    old: Dict[str, object] = field(default_factory=dict)
+    new: Dict[str, object] = field(default_factory=dict)
+    events: List["PlanEvent"] = field(default_factory=list)
+    truncated: bool = False
+
+    def to_dict(self):
+        """JSON-ready form with what apply_event needs (the live guest/table objects are left out)."""
+        data = {"kind": self.kind, "guest_ids": list(self.guest_ids), "table_ids": list(self.table_ids)}
+        if self.old_table_id is not None or self.new_table_id is not None:
+            data["old_table_id"] = self.old_table_id
+            data["new_table_id"] = self.new_table_id
+        if self.old:
+            data["old"] = self.old
+        if self.new:
+            data["new"] = self.new
+        if self.events:
+            data["events"] = [event.to_dict() for event in self.events]
+        if self.truncated:
+            data["truncated"] = True
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["kind"], set(data.get("guest_ids", ())), set(data.get("table_ids", ())),
+                   old_table_id=data.get("old_table_id"), new_table_id=data.get("new_table_id"),
+                   old=data.get("old", {}), new=data.get("new", {}),
+                   events=[cls.from_dict(event) for event in data.get("events", ())],
+                   truncated=data.get("truncated", False))
+
+class CapacityError(ValueError):
+    """Raised when a batch commit would leave tables over capacity."""
+    def __init__(self, table_ids):
+        self.table_ids = sorted(table_ids)
+        super().__init__(f"Tables over capacity: {self.table_ids}")
+
+def _restore_fields(target, original):
+    for f in fields(original):
+        value = getattr(original, f.name)
+        setattr(target, f.name, GuestIdList(value) if f.name == "guest_ids" else value)
+
+class _Batch:
+    """Bookkeeping for an open SeatingPlan.batch() transaction."""
+    # Past this many deltas (bulk loads) the committed event only lists touched ids
+    max_events = 10000
+
+    def __init__(self, plan, validate: bool):
+        self.validate = validate
+        self.depth = 1
+        self.next_guest_id = plan.next_guest_id
+        self.next_table_id = plan.next_table_id
+        self.generation = plan.generation
+        # (live object, original copy) for every record touched in the batch (None = did not exist)
+        self.guests: Dict[int, Optional[tuple]] = {}
+        self.tables: Dict[int, Optional[tuple]] = {}
+        self.events: List[PlanEvent] = []
+        self.truncated = False
+
 class SeatingPlan:
-    def __init__(self):
-        self.guests: Dict[int, Guest] = {}
+    def __init__(self, compact: bool = False):
+        """
+        compact: keep guests in a ColumnarGuestStore (array columns + interned
+        categories) instead of a dict of Guest objects. Meant for very large lists.
+        """
+        if compact:
+            from .storage import ColumnarGuestStore
+            self.guests: Dict[int, Guest] = ColumnarGuestStore()
+        else:
+            self.guests: Dict[int, Guest] = {}
         self.tables: Dict[int, Table] = {}
         self.next_guest_id = 1
         self.next_table_id = 1
+        # Ids of tables and guests stored outside the plan (a partial load from a
+        # database); they are never given to this plan's records
+        self.reserved_table_ids: Set[int] = set()
+        self.reserved_guest_ids: Set[int] = set()
+
+        # Incremental head-count indexes, kept in sync by every mutation below
+        self._occupancy: Dict[int, int] = {}
+        self.total_head_count = 0
+        self.seated_head_count = 0
+        self.total_capacity = 0
+
+        # Secondary indexes for the sidebar: waiting guests, category buckets and
+        # name search. Category buckets and the name index are rebuilt lazily (None = stale).
+        self._unseated: Set[int] = set()
+        self._by_category: Optional[Dict[str, Set[int]]] = {}
+        self._name_index: Optional[NamePrefixIndex] = None
+
+        # Dirty tracking: `revision` counts committed changes; the content hash is
+        # built on first use and then kept up to date (None = stale)
+        self.revision = 0
+        # Bumped when the contents are thrown away (clear, load, replace_with), so
+        # anything holding record ids from before can tell they no longer apply
+        self.generation = 0
+        self._table_revisions: Dict[int, int] = {}
+        self._content_hash: Optional[ContentHash] = None
+
+        self._listeners: List[Callable[[PlanEvent], None]] = []
+        self._batch: Optional[_Batch] = None
+        self._snapshots: List[weakref.ref] = []
+        self._pending: Optional[List[PlanEvent]] = None
+
+    # --- Change notification / transactions ---
+
+    def subscribe(self, callback: Callable[[PlanEvent], None]):
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def unsubscribe(self, callback: Callable[[PlanEvent], None]):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _emit(self, event: PlanEvent):
+        for callback in list(self._listeners):
+            callback(event)
+
+    def _notify(self, kind: str, guest_ids=(), table_ids=(), **payload):
+        # Inside a batch the deltas are queued and delivered in one "committed" event
+        batch = self._batch
+        if batch is not None and batch.truncated:
+            return
+        event = PlanEvent(kind, set(guest_ids), {t_id for t_id in table_ids if t_id is not None}, **payload)
+        if batch is None:
+            self._bump_revision(event.table_ids)
+        if batch is not None:
+            if len(batch.events) >= batch.max_events:
+                batch.events = []
+                batch.truncated = True
+                return
+            batch.events.append(event)
+        elif self._pending is not None:
+            self._pending.append(event)
+        else:
+            self._emit(event)
+
+    def _bump_revision(self, table_ids):
+        self.revision += 1
+        for table_id in table_ids:
+            self._table_revisions[table_id] = self.revision
+
+    def snapshot(self):
+        """
+        Returns a PlanSnapshot: a consistent, read-only view of the plan as it is now,
+        for readers on other threads (background saves and exports). Taking one copies
+        only the id -> record maps; records are copied lazily, just before this plan
+        first changes them.
+        """
+        if self._batch is not None:
+            raise RuntimeError("Cannot take a snapshot inside a batch")
+        from .snapshot import PlanSnapshot
+        snapshot = PlanSnapshot(self)
+        self._snapshots.append(weakref.ref(snapshot))
+        return snapshot
+
+    def _live_snapshots(self):
+        snapshots = [s for s in (ref() for ref in self._snapshots) if s is not None and not s.released]
+        if len(snapshots) != len(self._snapshots):
+            self._snapshots = [weakref.ref(s) for s in snapshots]
+        return snapshots
+
+    def _touch_guest(self, guest_id: int):
+        if self._snapshots:
+            for snapshot in self._live_snapshots():
+                snapshot._preserve_guest(guest_id)
+        batch = self._batch
+        if batch is not None and guest_id not in batch.guests:
+            guest = self.guests.get(guest_id)
+            batch.guests[guest_id] = (guest, guest.copy()) if guest is not None else None
+
+    def _touch_table(self, table_id: int):
+        if self._snapshots:
+            for snapshot in self._live_snapshots():
+                snapshot._preserve_table(table_id)
+        batch = self._batch
+        if batch is not None and table_id not in batch.tables:
+            table = self.tables.get(table_id)
+            batch.tables[table_id] = (table, table.copy()) if table is not None else None
+
+    @contextmanager
+    def _grouped(self):
+        # Cascading changes (e.g. removing a seated guest) reach subscribers as one
+        # "committed" event, without the index rebuild of a full batch
+        if self._batch is not None or self._pending is not None:
+            yield
+            return
+        pending = self._pending = []
+        try:
+            yield
+        finally:
+            self._pending = None
+        if len(pending) == 1:
+            self._emit(pending[0])
+        elif pending:
+            guest_ids = set().union(*(e.guest_ids for e in pending))
+            table_ids = set().union(*(e.table_ids for e in pending))
+            self._emit(PlanEvent("committed", guest_ids, table_ids, events=pending))
+
+    @property
+    def in_batch(self) -> bool:
+        return self._batch is not None
+
+    @contextmanager
+    def batch(self, validate: bool = True):
+        """
+        Groups many mutations into one transaction.
+
+        Inside the block capacity checks, index maintenance and notifications are
+        skipped. On exit the indexes are rebuilt in a single pass, touched tables are
+        validated (when `validate` is set) and subscribers get one "committed" event.
+        Any exception, including a failed validation, rolls the plan back.
+        Nested batches join the outermost one.
+        """
+        if self._batch is not None:
+            self._batch.depth += 1
+            try:
+                yield self
+            finally:
+                self._batch.depth -= 1
+            return
+
+        batch = self._batch = _Batch(self, validate)
+        try:
+            yield self
+            self.rebuild_indexes()
+            if validate:
+                over = [t_id for t_id in batch.tables
+                        if t_id in self.tables and self.get_occupancy(t_id) > self.tables[t_id].capacity]
+                if over:
+                    raise CapacityError(over)
+        except BaseException:
+            self._rollback(batch)
+            raise
+        finally:
+            self._batch = None
+
+        # Guests touched through a table (e.g. seated there) count as touched tables too
+        table_ids = set(batch.tables)
+        for g_id, saved in batch.guests.items():
+            if saved is not None and saved[1].table_id is not None:
+                table_ids.add(saved[1].table_id)
+            guest = self.guests.get(g_id)
+            if guest is not None and guest.table_id is not None:
+                table_ids.add(guest.table_id)
+        if batch.events or batch.truncated:
+            self._bump_revision(table_ids)
+            self._emit(PlanEvent("committed", set(batch.guests), table_ids, events=batch.events,
+                                 truncated=batch.truncated))
+
+    def _replace_contents(self, guests, tables: Dict[int, Table], next_guest_id: int, next_table_id: int):
+        # For loaders that build a whole guest store up front (binary_io): swap it in
+        # without touching records one by one. Subscribers get one truncated
+        # "committed" event, as after any bulk load.
+        if self._batch is not None:
+            raise RuntimeError("Cannot replace the plan's contents inside a batch")
+        guest_ids = set(self.guests)
+        guest_ids.update(guests)
+        table_ids = set(self.tables) | set(tables)
+        self.guests = guests
+        self.tables = tables
+        self.generation += 1
+        self.next_guest_id = next_guest_id
+        self.next_table_id = next_table_id
+        self.rebuild_indexes()
+        self._bump_revision(table_ids)
+        self._emit(PlanEvent("committed", guest_ids, table_ids, truncated=True))
+
+    def replace_with(self, other: "SeatingPlan"):
+        """
+        Takes over the contents of another plan (e.g. one loaded on a worker thread)
+        in a single step. `other` must not be used afterwards.
+        """
+        self._replace_contents(other.guests, other.tables, other.next_guest_id, other.next_table_id)
+
+    def merge_from(self, other, renumber: bool = False, dedup=None) -> Dict[int, int]:
+        """
+        Copies another plan's (or snapshot's) tables and guests into this one as one
+        batch. Records whose id is already taken here, or every record with
+        `renumber`, get fresh ids; guests stay at their (re-keyed) tables in the same
+        seat order. With a dedup.GuestDeduplicator, duplicates of guests already here
+        can be collapsed into them. Returns the old -> new guest id mapping.
+        """
+        table_map: Dict[int, int] = {}
+        guest_map: Dict[int, int] = {}
+        # Seated guests first, table by table, so appending them keeps the seat order
+        order = [g_id for t_id in other.tables for g_id in other.tables[t_id].guest_ids
+                 if g_id in other.guests and other.guests[g_id].table_id == t_id]
+        seated = set(order)
+        order += [g_id for g_id in other.guests if g_id not in seated]
+        if dedup is not None:
+            dedup.next_source()
+        with self.batch(validate=False):
+            for t_id in list(other.tables):
+                table = other.tables[t_id]
+                taken = t_id in self.tables or t_id in self.reserved_table_ids
+                new_id = self.next_table_id if renumber or taken else t_id
+                table_map[t_id] = new_id
+                self.insert_table(Table(id=new_id, name=table.name, capacity=table.capacity, x=table.x, y=table.y))
+            for g_id in order:
+                guest = other.guests[g_id]
+                taken = g_id in self.guests or g_id in self.reserved_guest_ids
+                new_id = self.next_guest_id if renumber or taken else g_id
+                guest_map[g_id] = new_id
+                table_id = guest.table_id
+                if table_id is not None:
+                    table_id = table_map.get(table_id, table_id)
+                if dedup is not None:
+                    kept_id = dedup.absorb(guest.name, guest.category, guest.size, table_id)
+                    if kept_id is not None:
+                        guest_map[g_id] = kept_id
+                        continue
+                self.insert_guest(Guest(id=new_id, name=guest.name, category=guest.category,
+                                        table_id=table_id, size=guest.size))
+                if dedup is not None:
+                    dedup.add(new_id, guest.name, guest.category)
+            if not renumber:
+                self.next_guest_id = max(self.next_guest_id, other.next_guest_id)
+                self.next_table_id = max(self.next_table_id, other.next_table_id)
+        return guest_map
+
+    def _rollback(self, batch: _Batch):
+        # Drop everything created in the batch first, then put the original objects back
+        for g_id, saved in batch.guests.items():
+            if saved is None:
+                self.guests.pop(g_id, None)
+        for t_id, saved in batch.tables.items():
+            if saved is None:
+                self.tables.pop(t_id, None)
+        for g_id, saved in batch.guests.items():
+            if saved is not None:
+                guest, original = saved
+                if isinstance(guest, Guest):
+                    _restore_fields(guest, original)
+                    self.guests[g_id] = guest
+                elif g_id in self.guests:
+                    _restore_fields(self.guests[g_id], original)
+                else:
+                    # Views of deleted rows cannot be revived; store the saved copy
+                    self.guests[g_id] = original
+        for t_id, saved in batch.tables.items():
+            if saved is not None:
+                table, original = saved
+                _restore_fields(table, original)
+                self.tables[t_id] = table
+        self.next_guest_id = batch.next_guest_id
+        self.next_table_id = batch.next_table_id
+        self.generation = batch.generation
+        self.rebuild_indexes()
+
+    # --- Queries ---
+
+    @property
+    def unseated_head_count(self) -> int:
+        return self.total_head_count - self.seated_head_count
+
+    def get_occupancy(self, table_id: int) -> int:
+        """Returns the number of seats taken at a table (sum of group sizes)."""
+        return self._occupancy.get(table_id, 0)
+
+    def fingerprint(self) -> int:
+        """
+        64-bit hash of the plan's content (every guest and table field). It does not
+        depend on insertion or seating order and survives JSON/XLSX round trips, so
+        comparing it with the value at the last save tells whether anything changed.
+        """
+        return self._get_content_hash().total
+
+    def table_fingerprint(self, table_id: int) -> Optional[int]:
+        """Hash of one table's fields and the guests seated there (None if no such table)."""
+        if table_id not in self.tables:
+            return None
+        return self._get_content_hash().tables.get(table_id, 0)
+
+    def table_fingerprints(self) -> Dict[int, int]:
+        content = self._get_content_hash()
+        return {t_id: content.tables.get(t_id, 0) for t_id in self.tables}
+
+    def table_revision(self, table_id: int) -> int:
+        """The plan revision at which this table (or a guest seated there) last changed."""
+        return self._table_revisions.get(table_id, 0)
+
+    def _get_content_hash(self) -> ContentHash:
+        if self._content_hash is None:
+            self._content_hash = ContentHash(
+                self._iter_guest_records(),
+                ((t.id, t.name, t.capacity, t.x, t.y) for t in self.tables.values()))
+        return self._content_hash
+
+    def _hash_guest(self, guest, sign: int = 1):
+        # Adds (sign=1) or removes (sign=-1) the guest's current fields from the content hash
+        if self._content_hash is not None and self._batch is None:
+            self._content_hash.add_guest(guest.id, guest.name, guest.category, guest.table_id, guest.size, sign)
+
+    def _hash_table(self, table, sign: int = 1):
+        if self._content_hash is not None and self._batch is None:
+            self._content_hash.add_table(table.id, table.name, table.capacity, table.x, table.y, sign)
+
+    @property
+    def unseated_ids(self) -> Set[int]:
+        """Ids of guests without a table. Do not modify."""
+        return self._unseated
+
+    @property
+    def categories(self) -> List[str]:
+        return list(self._category_buckets())
+
+    def guests_in_category(self, category: str) -> Set[int]:
+        return set(self._category_buckets().get(category, ()))
+
+    def search_guests(self, query: str, column: str = "All", unseated_only: bool = False) -> Set[int]:
+        """
+        Case-insensitive guest search: names match by word prefix, categories by
+        substring. column is "All", "Name" or "Category". Cost follows the number
+        of matches (and categories), not the number of guests.
+        """
+        query = fold(query).strip()
+        if not query:
+            return set(self._unseated) if unseated_only else set(self.guests)
+        matches = set()
+        if column in ("All", "Name"):
+            if self._name_index is None:
+                self._name_index = NamePrefixIndex((g_id, name) for g_id, name, _, _, _ in self._iter_guest_records())
+            matches |= self._name_index.search(query)
+        if column in ("All", "Category"):
+            for category, bucket in self._category_buckets().items():
+                if query in fold(category):
+                    matches |= bucket
+        if unseated_only:
+            matches &= self._unseated
+        return matches
+
+    def rebuild_indexes(self):
+        """
+        Recomputes the occupancy, head-count and search indexes from scratch.
+        Call this after mutating `guests`/`tables` directly (e.g. bulk loaders).
+        """
+        self._occupancy = {t_id: 0 for t_id in self.tables}
+        self.total_head_count = 0
+        self.seated_head_count = 0
+        self.total_capacity = sum(t.capacity for t in self.tables.values())
+        self._unseated = set()
+        self._by_category = None
+        self._name_index = None
+        self._content_hash = None
+
+        # Column by column: each pass is one C-level loop or a tight comprehension
+        ids, _, _, table_ids, sizes = self._guest_columns()
+        seated_sizes = dict(compress(zip(ids, sizes), map(is_not, table_ids, repeat(None))))
+        self._unseated = set(compress(ids, map(is_, table_ids, repeat(None))))
+        self.total_head_count = sum(sizes)
+        self.seated_head_count = sum(seated_sizes.values())
+
+        seated_size = seated_sizes.get
+        for table in self.tables.values():
+            self._occupancy[table.id] = sum(map(seated_size, table.guest_ids, repeat(0)))
+
+    def _category_buckets(self) -> Dict[str, Set[int]]:
+        if self._by_category is None:
+            by_category = {}
+            ids, _, categories, _, _ = self._guest_columns()
+            for g_id, category in zip(ids, categories):
+                bucket = by_category.get(category)
+                if bucket is None:
+                    bucket = by_category[category] = set()
+                bucket.add(g_id)
+            self._by_category = by_category
+        return self._by_category
+
+    def _guest_columns(self):
+        # (ids, names, categories, table_ids, sizes); packed stores hand over their columns as they are
+        columns = getattr(self.guests, "columns", None)
+        if columns is not None:
+            return columns()
+        return tuple(zip(*self._iter_guest_records())) or ((),) * 5
+
+    def _iter_guest_records(self):
+        # (id, name, category, table_id, size) per guest; reads the columns directly for compact stores
+        iter_records = getattr(self.guests, "iter_records", None)
+        if iter_records is not None:
+            return iter_records()
+        return ((g.id, g.name, g.category, g.table_id, g.size) for g in self.guests.values())
+
+    def _index_guest(self, guest):
+        if guest.table_id is None:
+            self._unseated.add(guest.id)
+        if self._by_category is not None:
+            self._by_category.setdefault(guest.category, set()).add(guest.id)
+        if self._name_index is not None:
+            self._name_index.add(guest.id, guest.name)
+
+    def _unindex_guest(self, guest):
+        self._unseated.discard(guest.id)
+        self._uncategorize(guest.id, guest.category)
+        if self._name_index is not None:
+            self._name_index.remove(guest.id, guest.name)
+
+    def _uncategorize(self, guest_id: int, category: str):
+        if self._by_category is None:
+            return
+        bucket = self._by_category.get(category)
+        if bucket is not None:
+            bucket.discard(guest_id)
+            if not bucket:
+                del self._by_category[category]
+
+    # --- Mutations ---
+
+    def clear(self):
+        guest_ids, table_ids = set(self.guests), set(self.tables)
+        if self._batch is not None:
+            for g_id in guest_ids:
+                self._touch_guest(g_id)
+            for t_id in table_ids:
+                self._touch_table(t_id)
+        self.guests.clear()
+        self.tables.clear()
+        self.generation += 1
+        if self._batch is None:
+            self.rebuild_indexes()
+        self._notify("plan_cleared", guest_ids, table_ids)
 
     def add_guest(self, name: str, category: str = "General", size: int = 1) -> Guest:
         guest = Guest(id=self.next_guest_id, name=name, category=category, size=size)
+        self._touch_guest(guest.id)
         self.guests[guest.id] = guest
+        guest = self.guests[guest.id]  # the stored object (a view for compact stores)
         self.next_guest_id += 1
+        if self._batch is None:
+            self.total_head_count += guest.size
+            self._index_guest(guest)
+        self._hash_guest(guest)
+        self._notify("guest_added", [guest.id], guest=guest, new=guest.to_dict())
+        return guest
+
+    def insert_guest(self, guest: Guest) -> Guest:
+        """
+        Stores a pre-built guest under its own id (used by loaders), replacing any
+        guest with the same id, and links it to its table if that table exists.
+        """
+        if guest.id in self.guests:
+            self.remove_guest(guest.id)
+        self._touch_guest(guest.id)
+        self.guests[guest.id] = guest
+        guest = self.guests[guest.id]
+        self.next_guest_id = max(self.next_guest_id, guest.id + 1)
+
+        table = self.tables.get(guest.table_id) if guest.table_id is not None else None
+        linked = table is not None and guest.id not in table.guest_ids
+        if linked:
+            self._touch_table(table.id)
+            table.guest_ids.append(guest.id)
+
+        if self._batch is None:
+            self.total_head_count += guest.size
+            self._index_guest(guest)
+            if guest.table_id is not None:
+                self.seated_head_count += guest.size
+            if linked:
+                self._occupancy[table.id] = self.get_occupancy(table.id) + guest.size
+        self._hash_guest(guest)
+        self._notify("guest_added", [guest.id], [guest.table_id], guest=guest, new=guest.to_dict())
         return guest
 
     def remove_guest(self, guest_id: int):
-        if guest_id in self.guests:
+        if guest_id not in self.guests:
+            return
+        with self._grouped():
             guest = self.guests[guest_id]
             if guest.table_id is not None:
                 self.unseat_guest(guest_id)
+            self._touch_guest(guest_id)
+            if not isinstance(guest, Guest):
+                guest = guest.copy()  # compact-store views die with their row
             del self.guests[guest_id]
+            if self._batch is None:
+                self.total_head_count -= guest.size
+                self._unindex_guest(guest)
+            self._hash_guest(guest, -1)
+            self._notify("guest_removed", [guest_id], guest=guest, old=guest.to_dict())
+
+    def update_guest(self, guest_id: int, name: Optional[str] = None, category: Optional[str] = None, size: Optional[int] = None) -> Optional[Guest]:
+        """
+        Edits guest properties, keeping the occupancy indexes in sync.
+        Capacity is not re-validated here; callers decide what to do with an overfull table.
+        """
+        if guest_id not in self.guests:
+            return None
+        self._touch_guest(guest_id)
+        guest = self.guests[guest_id]
+        self._hash_guest(guest, -1)
+        old = {}
+        if name is not None and name != guest.name:
+            old["name"] = guest.name
+            if self._batch is None and self._name_index is not None:
+                self._name_index.remove(guest_id, guest.name)
+                self._name_index.add(guest_id, name)
+            guest.name = name
+        if category is not None and category != guest.category:
+            old["category"] = guest.category
+            if self._batch is None:
+                self._uncategorize(guest_id, guest.category)
+                if self._by_category is not None:
+                    self._by_category.setdefault(category, set()).add(guest_id)
+            guest.category = category
+        if size is not None and size != guest.size:
+            old["size"] = guest.size
+            delta = size - guest.size
+            guest.size = size
+            if self._batch is None:
+                self.total_head_count += delta
+                if guest.table_id is not None:
+                    self.seated_head_count += delta
+                    if guest.table_id in self._occupancy and guest_id in self.tables[guest.table_id].guest_ids:
+                        self._occupancy[guest.table_id] += delta
+        self._hash_guest(guest)
+        if old:
+            new = {key: getattr(guest, key) for key in old}
+            self._notify("guest_updated", [guest_id], [guest.table_id], guest=guest, old=old, new=new)
+        return guest
 
     def add_table(self, name: str, capacity: int, x: int = 100, y: int = 100) -> Table:
         table = Table(id=self.next_table_id, name=name, capacity=capacity, x=x, y=y)
+        self._touch_table(table.id)
         self.tables[table.id] = table
         self.next_table_id += 1
+        if self._batch is None:
+            self._occupancy[table.id] = 0
+            self.total_capacity += table.capacity
+        self._hash_table(table)
+        self._notify("table_added", table_ids=[table.id], table=table, new=table.to_dict())
+        return table
+
+    def insert_table(self, table: Table) -> Table:
+        """Stores a pre-built table under its own id (used by loaders), replacing any table with the same id."""
+        if table.id in self.tables:
+            self.remove_table(table.id)
+        self._touch_table(table.id)
+        self.tables[table.id] = table
+        self.next_table_id = max(self.next_table_id, table.id + 1)
+        if self._batch is None:
+            self._occupancy[table.id] = sum(self.guests[g_id].size for g_id in table.guest_ids if g_id in self.guests)
+            self.total_capacity += table.capacity
+        self._hash_table(table)
+        self._notify("table_added", table.guest_ids, [table.id], table=table, new=table.to_dict())
         return table
 
     def remove_table(self, table_id: int):
-        if table_id in self.tables:
+        if table_id not in self.tables:
+            return
+        with self._grouped():
             table = self.tables[table_id]
-            # Unseat all guests at this table
-            for guest_id in list(table.guest_ids):
-                self.unseat_guest(guest_id)
+            self.unseat_table(table_id)
+            self._touch_table(table_id)
             del self.tables[table_id]
+            if self._batch is None:
+                self._occupancy.pop(table_id, None)
+                self.total_capacity -= table.capacity
+            self._hash_table(table, -1)
+            self._notify("table_removed", table_ids=[table_id], table=table, old=table.to_dict())
+
+    def unseat_table(self, table_id: int):
+        """Unseats everyone at a table; linear in the number of seated groups."""
+        table = self.tables.get(table_id)
+        if table is None:
+            return
+        with self._grouped():
+            # Last seat first: each guest is then found at the end of the list
+            for guest_id in reversed(list(table.guest_ids)):
+                guest = self.guests.get(guest_id)
+                if guest is not None and guest.table_id == table_id:
+                    self.unseat_guest(guest_id)
+        if len(table.guest_ids):
+            # Stale ids with no matching guest back-reference
+            self._touch_table(table_id)
+            table.guest_ids.clear()
+            if self._batch is None:
+                self._occupancy[table_id] = 0
+
+    def update_table(self, table_id: int, name: Optional[str] = None, capacity: Optional[int] = None) -> Optional[Table]:
+        if table_id not in self.tables:
+            return None
+        self._touch_table(table_id)
+        table = self.tables[table_id]
+        self._hash_table(table, -1)
+        with self._grouped():
+            if name is not None and name != table.name:
+                old_name = table.name
+                table.name = name
+                self._notify("table_renamed", table_ids=[table_id], table=table,
+                             old={"name": old_name}, new={"name": name})
+            if capacity is not None and capacity != table.capacity:
+                old_capacity = table.capacity
+                if self._batch is None:
+                    self.total_capacity += capacity - table.capacity
+                table.capacity = capacity
+                self._notify("table_resized", table_ids=[table_id], table=table,
+                             old={"capacity": old_capacity}, new={"capacity": capacity})
+        self._hash_table(table)
+        return table
+
+    def move_table(self, table_id: int, x, y) -> Optional[Table]:
+        if table_id not in self.tables:
+            return None
+        table = self.tables[table_id]
+        if (x, y) != (table.x, table.y):
+            self._touch_table(table_id)
+            old = {"x": table.x, "y": table.y}
+            self._hash_table(table, -1)
+            table.x, table.y = x, y
+            self._hash_table(table)
+            self._notify("table_moved", table_ids=[table_id], table=table, old=old, new={"x": x, "y": y})
+        return table
+
+    def change_table_id(self, table_id: int, new_id: int) -> bool:
+        """Re-keys a table and re-points its seated guests. Fails if new_id is taken (or reserved)."""
+        if table_id not in self.tables or new_id in self.tables or new_id in self.reserved_table_ids:
+            return False
+
+        self._touch_table(table_id)
+        self._touch_table(new_id)
+        table = self.tables.pop(table_id)
+        self._hash_table(table, -1)
+        for guest_id in table.guest_ids:
+            self._touch_guest(guest_id)
+            guest = self.guests[guest_id]
+            self._hash_guest(guest, -1)
+            guest.table_id = new_id
+            self._hash_guest(guest)
+
+        table.id = new_id
+        self._hash_table(table)
+        self.tables[new_id] = table
+        if self._batch is None:
+            self._occupancy[new_id] = self._occupancy.pop(table_id, 0)
+
+        if new_id >= self.next_table_id:
+            self.next_table_id = new_id + 1
+        self._notify("table_id_changed", table.guest_ids, [table_id, new_id], table=table,
+                     old_table_id=table_id, new_table_id=new_id)
+        return True
 
-    def assign_guest_to_table(self, guest_id: int, table_id: int) -> bool:
+    def assign_guest_to_table(self, guest_id: int, table_id: int, check_capacity: bool = True,
+                              seat: Optional[int] = None) -> bool:
+        """Seats a guest at a table, last unless seat (a position) is given. False if it does not fit."""
         if guest_id not in self.guests or table_id not in self.tables:
             return False
         
         guest = self.guests[guest_id]
         table = self.tables[table_id]
 
-        # Calculate current occupancy
-        current_occupancy = sum(self.guests[g_id].size for g_id in table.guest_ids)
-
-        # Check capacity
-        if current_occupancy + guest.size > table.capacity:
+        # Check capacity (a guest already at this table does not need extra seats).
+        # Inside a batch the check is deferred to commit.
+        if guest.table_id == table_id:
+            return True
+        if check_capacity and self._batch is None and self.get_occupancy(table_id) + guest.size > table.capacity:
             return False
 
-        # If guest is already seated, unseat them first
-        if guest.table_id is not None:
-            self.unseat_guest(guest_id)
+        # If guest is already seated, take them off the old table first
+        self._hash_guest(guest, -1)
+        old_table_id, old_seat = self._detach_guest(guest)
 
+        self._touch_guest(guest_id)
+        self._touch_table(table_id)
         guest.table_id = table_id
-        table.guest_ids.append(guest_id)
+        if seat is None:
+            table.guest_ids.append(guest_id)
+        else:
+            table.guest_ids.insert(seat, guest_id)
+        if self._batch is None:
+            self._occupancy[table_id] = self.get_occupancy(table_id) + guest.size
+            self.seated_head_count += guest.size
+            self._unseated.discard(guest_id)
+        self._hash_guest(guest)
+        self._notify("guest_seated", [guest_id], [old_table_id, table_id], guest=guest,
+                     old_table_id=old_table_id, new_table_id=table_id, old=old_seat)
         return True
 
     def unseat_guest(self, guest_id: int):
         if guest_id in self.guests:
             guest = self.guests[guest_id]
             if guest.table_id is not None:
-                if guest.table_id in self.tables:
-                    table = self.tables[guest.table_id]
-                    if guest_id in table.guest_ids:
-                        table.guest_ids.remove(guest_id)
-                guest.table_id = None
-
-    def save_to_file(self, filename: str):
-        data = {
-            "guests": [g.to_dict() for g in self.guests.values()],
-            "tables": [t.to_dict() for t in self.tables.values()],
-            "next_guest_id": self.next_guest_id,
-            "next_table_id": self.next_table_id
-        }
-        with open(filename, 'w') as f:
-            json.dump(data, f, indent=4)
+                self._hash_guest(guest, -1)
+                old_table_id, old_seat = self._detach_guest(guest)
+                self._hash_guest(guest)
+                self._notify("guest_seated", [guest_id], [old_table_id], guest=guest,
+                             old_table_id=old_table_id, new_table_id=None, old=old_seat)
 
-    def load_from_file(self, filename: str):
-        with open(filename, 'r') as f:
-            data = json.load(f)
-        
-        self.guests = {}
-        self.tables = {}
-        self.next_guest_id = data.get("next_guest_id", 1)
-        self.next_table_id = data.get("next_table_id", 1)
-
-        for g_data in data.get("guests", []):
-            guest = Guest.from_dict(g_data)
-            self.guests[guest.id] = guest
-        
-        for t_data in data.get("tables", []):
-            table = Table.from_dict(t_data)
-            self.tables[table.id] = table
+    def _detach_guest(self, guest: Guest) -> Tuple[Optional[int], Dict[str, int]]:
+        """
+        Takes a guest off their table without notifying. Returns the old table id and
+        {"seat": position} if the guest was in its seat list (for undo), else {}.
+        """
+        old_table_id = guest.table_id
+        if old_table_id is None:
+            return None, {}
+        old_seat = {}
+        self._touch_guest(guest.id)
+        if old_table_id in self.tables:
+            table = self.tables[old_table_id]
+            if guest.id in table.guest_ids:
+                self._touch_table(old_table_id)
+                old_seat["seat"] = table.guest_ids.index(guest.id)
+                table.guest_ids.remove(guest.id)
+                if self._batch is None:
+                    self._occupancy[table.id] = self.get_occupancy(table.id) - guest.size
+        guest.table_id = None
+        if self._batch is None:
+            self.seated_head_count -= guest.size
+            self._unseated.add(guest.id)
+        return old_table_id, old_seat
+
+    def apply_event(self, event: PlanEvent, reverse: bool = False):
+        """
+        Replays a recorded change, or undoes it when `reverse` is set.
+        Capacity is not re-checked (the change was valid when it was recorded), and
+        indexes are updated record by record, so replaying a few deltas stays cheap
+        on a large plan.
+        """
+        kind = event.kind
+        if kind == "committed":
+            if event.truncated:
+                raise ValueError("Cannot replay a truncated batch")
+            for sub_event in (reversed(event.events) if reverse else event.events):
+                self.apply_event(sub_event, reverse)
+            return
+
+        # Ids as they were when the event was recorded (records may have been re-keyed since)
+        guest_id = next(iter(event.guest_ids), None)
+        table_id = next(iter(event.table_ids), None)
+        values = event.old if reverse else event.new
+        creating = kind.endswith("_added") != reverse
+
+        if kind in ("guest_added", "guest_removed"):
+            record = event.new if kind == "guest_added" else event.old
+            if creating:
+                self.insert_guest(Guest.from_dict(record))
+            else:
+                self.remove_guest(record["id"])
+        elif kind in ("table_added", "table_removed"):
+            record = event.new if kind == "table_added" else event.old
+            if creating:
+                self.insert_table(Table.from_dict(record))
+            else:
+                self.remove_table(record["id"])
+        elif kind == "guest_updated":
+            self.update_guest(guest_id, **values)
+        elif kind == "guest_seated":
+            target = event.old_table_id if reverse else event.new_table_id
+            if target is None:
+                self.unseat_guest(guest_id)
+            else:
+                # Undone, the guest goes back to the seat they left
+                seat = event.old.get("seat") if reverse else None
+                self.assign_guest_to_table(guest_id, target, check_capacity=False, seat=seat)
+        elif kind == "table_moved":
+            self.move_table(table_id, values["x"], values["y"])
+        elif kind in ("table_renamed", "table_resized"):
+            self.update_table(table_id, **values)
+        elif kind == "table_id_changed":
+            if reverse:
+                self.change_table_id(event.new_table_id, event.old_table_id)
+            else:
+                self.change_table_id(event.old_table_id, event.new_table_id)
+        elif kind == "plan_cleared":
+            if reverse:
+                raise ValueError("Cannot undo clearing the plan")
+            self.clear()
+        else:
+            raise ValueError(f"Unknown event kind: {kind}")
+
+    def save_to_file(self, filename: str, compress: Optional[bool] = None,
+                     progress: Optional[Callable[[int, Optional[int]], None]] = None):
+        """
+        Writes the plan as compact JSON, streamed record by record.
+        compress gzips the file (default: when the name ends in .gz).
+        progress(done, total) is called as JSON records are written.
+        Names ending in .seatplan get the packed binary format instead (see binary_io),
+        and .sqlite/.db names a SQLite database (see sqlite_store).
+        """
+        if filename.lower().endswith(".seatplan"):
+            from .binary_io import write_packed
+            with open(filename, 'wb') as f:
+                write_packed(self, f)
+            return
+        if filename.lower().endswith((".sqlite", ".db")):
+            from .sqlite_store import save_sqlite
+            save_sqlite(self, filename)
+            return
+        from .json_io import open_plan_file, write_plan
+        with open_plan_file(filename, 'w', compress) as f:
+            write_plan(self, f, progress=progress)
+
+    def validate(self, repair: bool = False):
+        """Integrity check of the whole plan; see validation.validate_plan. Returns a ValidationReport."""
+        from .validation import validate_plan
+        return validate_plan(self, repair=repair)
+
+    def load_from_file(self, filename: str, repair: bool = True,
+                       progress: Optional[Callable[[int, Optional[int]], None]] = None):
+        """
+        Loads a saved plan. The result is validated (and by default repaired); returns the ValidationReport.
+        progress(records read, None) is called every 1000 JSON records; an exception
+        it raises aborts the load and leaves the plan as it was.
+        """
+        from .binary_io import is_packed_file, load_packed
+        if is_packed_file(filename):
+            # Opened lazily: guests become objects on first lookup
+            return load_packed(self, filename, repair=repair)
+        from .sqlite_store import is_sqlite_file, load_sqlite
+        if is_sqlite_file(filename):
+            return load_sqlite(self, filename, repair=repair)
+
+        from .json_io import open_plan_file, read_plan
+        next_ids = {"next_guest_id": 1, "next_table_id": 1}
+
+        # Records are inserted as they are parsed (gzip or plain, compact or indented)
+        with open_plan_file(filename, 'r') as f, self.batch(validate=False):
+            self.clear()
+
+            for count, (kind, data) in enumerate(read_plan(f), 1):
+                if progress is not None and count % 1000 == 0:
+                    progress(count, None)
+                if kind == "guest":
+                    self.insert_guest(Guest.from_dict(data))
+                elif kind == "table":
+                    self.insert_table(Table.from_dict(data))
+                elif kind in next_ids:
+                    next_ids[kind] = data
 
+            self.next_guest_id = next_ids["next_guest_id"]
+            self.next_table_id = next_ids["next_table_id"]
+            return self.validate(repair=repair)
@@ -0,0 +1,307 @@
+"""
+Import preview for the column-mapping dialog: the first rows of a guest list,
+read without parsing the rest of the file, plus an estimate of how many rows
+(and guests) the whole import would bring in.
+
+Workbooks are read straight from the zip with iterparse: openpyxl would scan the
+whole sheet for its size when the file has no <dimension> (as write-only saves
+do) and load every shared string before the first row. Rows are placed by their
+number, with the blank rows Excel leaves out filled in, as openpyxl does. The
+row count comes from <dimension>, or else from the last <row> in the raw XML.
+"""
+import re
+import zipfile
+from dataclasses import dataclass, field
+from typing import List, Optional
+from xml.etree import ElementTree
+
+from .csv_io import CsvIO, is_csv_file
+from .excel_io import ExcelIO
+
+SAMPLE_ROWS = 50
+
+_CELL_REF = re.compile(r"([A-Z]+)(\d*)")
+_ROW_NUMBER = re.compile(rb"<row [^>]*?\br=\"(\d+)\"")
+
+
+@dataclass
+class PreviewRow:
+    line: int  # row number in the file, header = 1
+    name: str
+    category: str
+    count: int
+    raw_count: object
+    problem: Optional[str] = None  # why the row is skipped, or what was guessed
+
+    @property
+    def skipped(self) -> bool:
+        return self.count <= 0
+
+
+@dataclass
+class ImportPreview:
+    rows: List[PreviewRow]
+    sampled_rows: int  # data rows read, imported or not
+    estimated_rows: int  # data rows in the whole file
+    exact: bool  # True when the whole file was read
+
+    @property
+    def bad_counts(self) -> List[PreviewRow]:
+        """Rows whose count is not a number; the import reads them as 1."""
+        return [row for row in self.rows if row.problem == "count is not a number, read as 1"]
+
+    @property
+    def sample_head_count(self) -> int:
+        return sum(row.count for row in self.rows if not row.skipped)
+
+    @property
+    def estimated_head_count(self) -> int:
+        if self.exact or not self.sampled_rows:
+            return self.sample_head_count
+        return round(self.sample_head_count * self.estimated_rows / self.sampled_rows)
+
+    def summary(self) -> str:
+        about = "" if self.exact else "about "
+        text = f"{about}{self.estimated_rows:,} rows, {about}{self.estimated_head_count:,} guests"
+        if not self.exact:
+            text += f" (estimated from the first {self.sampled_rows} rows)"
+        text += "."
+        if self.bad_counts:
+            text += f"\n{len(self.bad_counts)} of the rows shown have a count that is not a number and will be imported as 1."
+        return text
+
+
+@dataclass
+class SheetSample:
+    """The first rows of a guest list (header first) and its estimated data row count."""
+    rows: List[tuple]
+    estimated_rows: int
+    exact: bool
+    headers: List[str] = field(init=False)
+
+    def __post_init__(self):
+        self.headers = [str(cell) for cell in self.rows[0] if cell is not None] if self.rows else []
+
+    def preview(self, group_col: str, count_col: str, category_col: Optional[str] = None) -> ImportPreview:
+        """What import_groups_to_plan would make of the sampled rows with this column mapping."""
+        group_idx, count_idx, category_idx = ExcelIO._column_indices(self.rows, group_col, count_col, category_col)
+        width = max(index for index in (group_idx, count_idx, category_idx) if index is not None) + 1
+        rows = []
+        for line, row in enumerate(self.rows[1:], 2):
+            row = tuple(row) + (None,) * (width - len(row))
+            name, raw_count = row[group_idx], row[count_idx]
+            # The same rules as ExcelIO._iter_groups, with the reason for each guess kept
+            if not name:
+                if any(cell not in (None, "") for cell in row):
+                    rows.append(PreviewRow(line, "", "", 0, raw_count, "no name, skipped"))
+                continue
+            problem = None
+            try:
+                count = int(raw_count)
+            except (ValueError, TypeError):
+                count, problem = 1, "count is not a number, read as 1"
+            if count <= 0:
+                count, problem = 0, "count is not positive, skipped"
+            category = str(name)
+            if category_idx is not None and row[category_idx]:
+                category = str(row[category_idx])
+            rows.append(PreviewRow(line, str(name), category, count, raw_count, problem))
+        return ImportPreview(rows, len(self.rows) - 1, self.estimated_rows, self.exact)
+
+
+def read_sample(filename: str, sample_rows: int = SAMPLE_ROWS) -> SheetSample:
+    """The header and first sample_rows rows of a CSV/TSV file or of a workbook's active sheet."""
+    if is_csv_file(filename):
+        return _csv_sample(filename, sample_rows)
+    # A workbook imported before is in the parse cache: exact and free
+    cached = ExcelIO.cache.rows(filename)
+    if cached is not None:
+        return SheetSample(cached[:sample_rows + 1], max(len(cached) - 1, 0), True)
+    try:
+        return _xlsx_sample(filename, sample_rows)
+    except (KeyError, IndexError, ValueError, ElementTree.ParseError):
+        # Something our reader does not know; openpyxl reads the rows (more slowly)
+        return _openpyxl_sample(filename, sample_rows)
+
+
+def _csv_sample(filename: str, sample_rows: int) -> SheetSample:
+    f, reader = CsvIO._open(filename)
+    with f:
+        rows = [tuple(row) for row, _ in zip(reader, range(sample_rows + 1))]
+        exact = next(reader, None) is None
+    if exact:
+        return SheetSample(rows, max(len(rows) - 1, 0), True)
+    # Line breaks in the raw bytes (one 0x0A byte each, in UTF-16 too); quoted
+    # line breaks inside cells make it an estimate
+    lines = 0
+    with open(filename, "rb") as raw:
+        for chunk in iter(lambda: raw.read(1 << 20), b""):
+            lines += chunk.count(b"\n")
+    return SheetSample(rows, max(lines - 1, len(rows) - 1), False)
+
+
+def _local(tag: str) -> str:
+    # Transitional and strict workbooks use different namespaces
+    return tag.rsplit("}", 1)[-1]
+
+
+def _column_index(letters: str) -> int:
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - 64
+    return index - 1
+
+
+def _sheet_path(zf: zipfile.ZipFile) -> str:
+    """The part name of the active sheet (what openpyxl's wb.active is)."""
+    workbook = ElementTree.fromstring(zf.read("xl/workbook.xml"))
+    active = 0
+    sheets = []
+    for element in workbook.iter():
+        tag = _local(element.tag)
+        if tag == "workbookView":
+            active = int(element.get("activeTab", 0))
+        elif tag == "sheet":
+            sheets.append(next((value for key, value in element.attrib.items() if _local(key) == "id"), None))
+    rels = ElementTree.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    targets = {rel.get("Id"): rel.get("Target") for rel in rels}
+    target = targets[sheets[active]]
+    return target.lstrip("/") if target.startswith("/") else "xl/" + target
+
+
+def _text(item) -> str:
+    """The value of a shared string <si> or inline <is>: plain or rich text runs, without phonetic hints."""
+    parts = []
+    for child in item:
+        tag = _local(child.tag)
+        if tag == "t":
+            parts.append(child.text or "")
+        elif tag == "r":
+            parts.extend(t.text or "" for t in child if _local(t.tag) == "t")
+    return "".join(parts)
+
+
+class _SharedStrings:
+    """Shared strings parsed only as far as the highest index asked for."""
+
+    def __init__(self, zf: zipfile.ZipFile):
+        self.strings: List[str] = []
+        self._file = self._events = None
+        if "xl/sharedStrings.xml" in zf.namelist():
+            self._file = zf.open("xl/sharedStrings.xml")
+            self._events = ElementTree.iterparse(self._file, ("end",))
+
+    def __getitem__(self, index: int) -> str:
+        while index >= len(self.strings) and self._events is not None:
+            for _, element in self._events:
+                if _local(element.tag) == "si":
+                    self.strings.append(_text(element))
+                    element.clear()
+                    break
+            else:
+                self._events = None
+        return self.strings[index]
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+def _cell_value(cell, shared: _SharedStrings):
+    kind = cell.get("t", "n")
+    if kind == "inlineStr":
+        return next((_text(child) for child in cell if _local(child.tag) == "is"), None)
+    value = next((child.text for child in cell if _local(child.tag) == "v"), None)
+    if value is None:
+        return None
+    if kind == "s":
+        return shared[int(value)]
+    if kind == "b":
+        return value == "1"
+    if kind in ("str", "e", "d"):
+        return value
+    # Numbers the way openpyxl reads them: int unless written with a fraction or exponent
+    return float(value) if any(c in value for c in ".eE") else int(value)
+
+
+def _last_row(zf: zipfile.ZipFile, path: str) -> int:
+    """Number of the last row of a sheet, found in the raw XML without parsing it."""
+    def tags(data):
+        return data.count(b"<row ") + data.count(b"<row>") + data.count(b"<row/>")
+
+    count = last = 0
+    tail = b""
+    with zf.open(path) as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            # The end of the previous chunk goes first, so a tag split across chunks is
+            # seen whole; the tags in it were counted already
+            data = tail + chunk
+            count += tags(data) - tags(tail)
+            start = data.rfind(b"<row ")
+            number = _ROW_NUMBER.match(data, start) if start >= 0 else None
+            if number:
+                last = int(number.group(1))
+            tail = data[-256:]
+    # Rows without an r attribute follow one another
+    return max(count, last)
+
+
+def _xlsx_sample(filename: str, sample_rows: int) -> SheetSample:
+    with zipfile.ZipFile(filename) as zf:
+        path = _sheet_path(zf)
+        shared = _SharedStrings(zf)
+        dimension_rows = None
+        rows: List[tuple] = []
+        exact = True
+        try:
+            with zf.open(path) as f:
+                for event, element in ElementTree.iterparse(f, ("start", "end")):
+                    tag = _local(element.tag)
+                    if event == "start":
+                        if tag == "dimension":
+                            last = _CELL_REF.match(element.get("ref", "A1").split(":")[-1])
+                            if last and last.group(2):
+                                dimension_rows = int(last.group(2))
+                        continue
+                    if tag != "row":
+                        continue
+                    line = int(element.get("r") or len(rows) + 1)
+                    # Blank rows are not written: fill them in
+                    rows.extend([()] * (min(line - 1, sample_rows + 1) - len(rows)))
+                    if line > sample_rows + 1:
+                        exact = False
+                        break
+                    values: list = []
+                    for cell in element:
+                        if _local(cell.tag) != "c":
+                            continue
+                        ref = _CELL_REF.match(cell.get("r", ""))
+                        column = _column_index(ref.group(1)) if ref and ref.group(1) else len(values)
+                        values.extend([None] * (column - len(values)))
+                        values.append(_cell_value(cell, shared))
+                    rows.append(tuple(values))
+                    element.clear()
+        finally:
+            shared.close()
+        # Empty trailing cells are not written either; pad like openpyxl does
+        width = max(map(len, rows), default=0)
+        rows = [row + (None,) * (width - len(row)) for row in rows]
+        if exact:
+            return SheetSample(rows, max(len(rows) - 1, 0), True)
+        if dimension_rows is None or dimension_rows <= len(rows):
+            # No usable <dimension> (write-only saves have none)
+            dimension_rows = _last_row(zf, path)
+    return SheetSample(rows, dimension_rows - 1, False)
+
+
+def _openpyxl_sample(filename: str, sample_rows: int) -> SheetSample:
+    import openpyxl
+    wb = openpyxl.load_workbook(filename, read_only=True, data_only=True)
+    try:
+        ws = wb.active
+        rows = list(ws.iter_rows(max_row=sample_rows + 2, values_only=True))
+        exact = len(rows) <= sample_rows + 1
+        total = len(rows) - 1 if exact else (ws.max_row or len(rows)) - 1
+        return SheetSample(rows[:sample_rows + 1], max(total, 0), exact)
+    finally:
+        wb.close()
@@ -0,0 +1,92 @@
+"""
+Progressive drawing for the floor plan: tables are drawn in short slices
+scheduled with root.after, the ones in view first, so the window keeps
+responding while a large venue is painted.
+"""
+import time
+from collections import deque
+from typing import Callable, Iterable, List, Optional
+
+
+def viewport_order(tables, left: float, top: float, right: float, bottom: float, zoom: float = 1.0,
+                   radius: float = 70) -> List[int]:
+    """
+    Table ids with the tables that overlap the visible area (canvas coordinates)
+    first, then the rest by distance from it, nearest first.
+    """
+    cx, cy = (left + right) / 2, (top + bottom) / 2
+    r = radius * zoom
+
+    def key(table):
+        x, y = table.x * zoom, table.y * zoom
+        dx = max(left - (x + r), 0, (x - r) - right)
+        dy = max(top - (y + r), 0, (y - r) - bottom)
+        visible = dx == 0 and dy == 0
+        return (not visible, dx * dx + dy * dy if not visible else (x - cx) ** 2 + (y - cy) ** 2)
+
+    return [table.id for table in sorted(tables, key=key)]
+
+
+class ProgressiveRenderer:
+    """
+    Calls draw(item) for queued items, at most budget_ms of work per slice and one
+    slice per root.after turn. start() replaces whatever is still queued;
+    discard() drops an item that was drawn some other way in the meantime.
+    on_done() runs once the queue has drained.
+    """
+
+    def __init__(self, root, draw: Callable[[object], None], budget_ms: float = 12,
+                 on_done: Optional[Callable[[], None]] = None):
+        self.root = root
+        self.draw = draw
+        self.budget = budget_ms / 1000
+        self.on_done = on_done
+        self._queue: deque = deque()
+        self._pending = set()
+        self._scheduled = False
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._pending)
+
+    def start(self, items: Iterable, first_slice: bool = True):
+        """Queues items; with first_slice the first one is drawn right away (the visible part)."""
+        self._queue = deque(items)
+        self._pending = set(self._queue)
+        if first_slice:
+            self._slice()
+        elif not self._scheduled:
+            self._schedule()
+
+    def discard(self, item):
+        self._pending.discard(item)
+
+    def finish(self):
+        """Draws everything still queued now (e.g. before a snapshot of the canvas)."""
+        while self._pending:
+            self._draw_next()
+
+    def _schedule(self):
+        self._scheduled = True
+        self.root.after(1, self._run)
+
+    def _run(self):
+        self._scheduled = False
+        if self._pending:
+            self._slice()
+
+    def _slice(self):
+        deadline = time.perf_counter() + self.budget
+        while self._pending and time.perf_counter() < deadline:
+            self._draw_next()
+        if self._pending:
+            if not self._scheduled:
+                self._schedule()
+        elif self.on_done is not None:
+            self.on_done()
+
+    def _draw_next(self):
+        item = self._queue.popleft()
+        if item in self._pending:
+            self._pending.discard(item)
+            self.draw(item)
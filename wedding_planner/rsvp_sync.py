@@ -0,0 +1,228 @@
+"""
+Keeps a plan in step with an RSVP spreadsheet that is still changing.
+
+Each sheet row is matched to the guest it created (or, the first time, to an
+existing guest with the same name signature) by a stable key: the key column if
+there is one, otherwise the normalized group name. A sync only touches guests
+whose row changed since the last sync, so seat assignments survive re-imports.
+"""
+import os
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .dedup import name_signature
+from .csv_io import group_reader
+from .storage import iter_guest_records
+
+
+@dataclass
+class SyncResult:
+    added: List[int] = field(default_factory=list)
+    removed: List[int] = field(default_factory=list)
+    resized: List[int] = field(default_factory=list)
+    recategorized: List[int] = field(default_factory=list)
+    renamed: List[int] = field(default_factory=list)
+    # Seated guests whose new size no longer fit their table
+    unseated: List[int] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.removed or self.resized or self.recategorized or self.renamed)
+
+    def summary(self) -> str:
+        if not self.changed:
+            return "The plan is up to date."
+        parts = [f"{len(ids)} {label}" for label, ids in (
+            ("added", self.added), ("removed", self.removed), ("resized", self.resized),
+            ("recategorized", self.recategorized), ("renamed", self.renamed),
+            ("unseated (table too small)", self.unseated)) if ids]
+        return "Guests " + ", ".join(parts) + "."
+
+
+class RsvpSync:
+    """
+    read() may run on a worker thread; apply() changes the plan and belongs on the
+    thread that owns it. sync() does both.
+    """
+
+    def __init__(self, plan, filename: str, group_col: str, count_col: str, category_col: Optional[str] = None,
+                 key_col: Optional[str] = None):
+        self.plan = plan
+        self.generation = plan.generation
+        self.filename = filename
+        self.columns = (group_col, count_col, category_col, key_col)
+        self.links: Dict[Tuple, int] = {}  # row key -> guest id
+        self.rows: Dict[Tuple, Tuple] = {}  # row key -> (name, category, count) at the last sync
+        self.mtime: Optional[int] = None
+
+    @property
+    def detached(self) -> bool:
+        """True once the plan was cleared or replaced: the links point at guests that are gone."""
+        return self.plan.generation != self.generation
+
+    def _mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.filename).st_mtime_ns
+        except OSError:
+            return None
+
+    def modified(self) -> bool:
+        """True if the file changed since the last sync (False while it is missing)."""
+        mtime = self._mtime()
+        return mtime is not None and mtime != self.mtime
+
+    def read(self, progress=None) -> Tuple[Optional[int], Dict[Tuple, Tuple]]:
+        # mtime first: a change made while reading is picked up by the next sync
+        mtime = self._mtime()
+        rows: Dict[Tuple, Tuple] = {}
+        seen: Dict = {}
+        groups = group_reader(self.filename).read_groups(self.filename, *self.columns, progress=progress)
+        for key_value, name, category, count in groups:
+            base = str(key_value).strip() if key_value not in (None, "") else name_signature(name)
+            # Repeated keys are told apart by their order in the sheet
+            seen[base] = seen.get(base, 0) + 1
+            rows[(base, seen[base])] = (name, category, count)
+        return mtime, rows
+
+    def sync(self, progress=None) -> SyncResult:
+        return self.apply(self.read(progress))
+
+    def apply(self, sheet) -> SyncResult:
+        if self.detached:
+            raise RuntimeError("The plan was replaced since this RSVP sync started")
+        mtime, rows = sheet
+        plan = self.plan
+        result = SyncResult()
+
+        # Work out the deltas first, so an unchanged sheet costs no plan work at all
+        removed = [key for key in self.links if key not in rows]
+        updates = []
+        unlinked = []
+        for key, row in rows.items():
+            g_id = self.links.get(key)
+            if g_id is None:
+                unlinked.append(key)
+                continue
+            previous = self.rows.get(key)
+            if previous != row and g_id in plan.guests:  # guests deleted by hand stay deleted
+                updates.append((g_id, previous, row))
+        added = []
+        if unlinked:
+            matches = self._match(rows, unlinked)
+            for key in unlinked:
+                g_id = matches.get(key)
+                if g_id is None:
+                    added.append(key)
+                else:
+                    self.links[key] = g_id
+                    # Matched by name, so the plan's spelling of it is kept
+                    guest = plan.guests[g_id]
+                    updates.append((g_id, (rows[key][0], guest.category, guest.size), rows[key]))
+
+        if removed or updates or added:
+            # Applied through the plan's incremental mutators: the cost follows the
+            # number of changed rows, not the size of the plan. Subscribers (undo
+            # history, autosave) still see the whole sync as one change.
+            with plan._grouped():
+                for key in removed:
+                    g_id = self.links.pop(key)
+                    if g_id in plan.guests:
+                        plan.remove_guest(g_id)
+                        result.removed.append(g_id)
+                for g_id, previous, (name, category, count) in updates:
+                    self._update(g_id, previous or (None, None, None), name, category, count, result)
+                for key in added:
+                    name, category, count = rows[key]
+                    guest = plan.add_guest(name, category, size=count)
+                    self.links[key] = guest.id
+                    result.added.append(guest.id)
+
+        self.rows = rows
+        self.mtime = mtime
+        return result
+
+    def _update(self, g_id, previous, name, category, count, result: SyncResult):
+        # Only fields that changed in the sheet are written, so edits made in the plan survive
+        plan = self.plan
+        guest = plan.guests[g_id]
+        old_name, old_category, old_count = previous
+        if name != old_name and name != guest.name:
+            plan.update_guest(g_id, name=name)
+            result.renamed.append(g_id)
+        if category != old_category and category != guest.category:
+            plan.update_guest(g_id, category=category)
+            result.recategorized.append(g_id)
+        if count != old_count and count != guest.size:
+            table_id = guest.table_id
+            if table_id is not None and table_id in plan.tables:
+                if plan.get_occupancy(table_id) - guest.size + count > plan.tables[table_id].capacity:
+                    plan.unseat_guest(g_id)
+                    result.unseated.append(g_id)
+            plan.update_guest(g_id, size=count)
+            result.resized.append(g_id)
+
+    def _match(self, rows, keys) -> Dict[Tuple, int]:
+        """Links new rows to guests no row owns yet, by name signature, in plan order."""
+        owned = set(self.links.values())
+        free: Dict[str, deque] = {}
+        for g_id, name, _, _, _ in iter_guest_records(self.plan.guests):
+            if g_id not in owned:
+                free.setdefault(name_signature(name), deque()).append(g_id)
+        matches = {}
+        for key in keys:
+            candidates = free.get(name_signature(rows[key][0]))
+            if candidates:
+                matches[key] = candidates.popleft()
+        return matches
+
+
+class RsvpWatcher:
+    """
+    Polls an RsvpSync's file with root.after and, when it has changed, reads it on
+    a jobs.JobRunner worker and applies it on the Tk thread. on_sync(result) is
+    called after each sync, on_error(exception) when a read fails; a failed
+    version is not retried until the file changes again. It stops by itself once
+    the plan is cleared or replaced.
+    """
+
+    def __init__(self, root, sync: RsvpSync, runner, interval_ms: int = 2000, on_sync=None, on_error=None):
+        self.root = root
+        self.sync = sync
+        self.runner = runner
+        self.interval_ms = interval_ms
+        self.on_sync = on_sync
+        self.on_error = on_error
+        self.running = False
+        self._failed_mtime = None
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            self.root.after(self.interval_ms, self._poll)
+
+    def stop(self):
+        self.running = False
+
+    def _poll(self):
+        if self.sync.detached:
+            self.running = False
+        if not self.running:
+            return
+        mtime = self.sync._mtime()
+        if not self.runner.busy and self.sync.modified() and mtime != self._failed_mtime:
+            self.runner.submit("Syncing RSVPs", lambda job: self.sync.read(job.progress),
+                               on_done=self._apply, on_error=lambda e: self._failed(mtime, e))
+        self.root.after(self.interval_ms, self._poll)
+
+    def _apply(self, sheet):
+        if not self.running or self.sync.detached:
+            return
+        result = self.sync.apply(sheet)
+        if self.on_sync is not None:
+            self.on_sync(result)
+
+    def _failed(self, mtime, error):
+        self._failed_mtime = mtime
+        if self.on_error is not None:
+            self.on_error(error)
@@ -0,0 +1,43 @@
+"""
+What the app remembers between runs: the plan file last opened or saved and
+the floor plan zoom. The plan contents themselves come back from the autosave
+journal (see journal.py).
+"""
+import json
+import os
+from typing import Optional
+
+
+def default_session_path() -> str:
+    return os.path.join(os.path.expanduser("~"), ".seater_planner", "session.json")
+
+
+class Session:
+    def __init__(self, path: str):
+        self.path = path
+        self.last_file: Optional[str] = None
+        self.zoom = 1.0
+        self.load()
+
+    def load(self):
+        # A missing or damaged file just means a fresh start
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.last_file = data.get("last_file") or None
+            self.zoom = float(data.get("zoom", 1.0))
+        except (OSError, ValueError, TypeError, AttributeError):
+            pass
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        part = self.path + ".part"
+        with open(part, "w", encoding="utf-8") as f:
+            json.dump({"last_file": self.last_file, "zoom": self.zoom}, f)
+        os.replace(part, self.path)
+
+    def restorable_file(self) -> Optional[str]:
+        """The last file, if it is still there."""
+        if self.last_file and os.path.isfile(self.last_file):
+            return self.last_file
+        return None
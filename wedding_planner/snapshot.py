@@ -0,0 +1,117 @@
+from collections.abc import Mapping
+from typing import Dict, Optional
+
+from .fingerprint import ContentHash
+from .models import SeatingPlan
+from .storage import PackedGuestStore, iter_guest_records
+
+
+class _FrozenRecords(Mapping):
+    """
+    The records of a plan at snapshot time. The id -> record dict is a private
+    shallow copy; the records themselves are shared with the live plan until it
+    is about to change one, at which point the plan hands us a copy of the
+    original first (see SeatingPlan._touch_guest/_touch_table).
+    Lookups return copies, so callers never see a record change under them.
+    """
+
+    def __init__(self, records: dict):
+        self._records = records
+        self._originals: dict = {}
+
+    def _preserve(self, record_id):
+        # Called on the plan's thread just before the shared record is modified
+        if record_id not in self._originals:
+            record = self._records.get(record_id)
+            if record is not None:
+                self._originals[record_id] = record.copy()
+
+    def __getitem__(self, record_id):
+        original = self._originals.get(record_id)
+        if original is not None:
+            return original
+        shared = self._records[record_id]
+        try:
+            record = shared.copy()
+        except RuntimeError:
+            record = None  # the plan modified it while we were copying
+        # If a change started meanwhile, its original was stored before the change
+        original = self._originals.get(record_id)
+        return original if original is not None else record
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, record_id) -> bool:
+        return record_id in self._records
+
+
+class PlanSnapshot:
+    """
+    Read-only view of a SeatingPlan as it was when SeatingPlan.snapshot() was
+    called. Safe to read from another thread while the plan keeps changing, and
+    accepted anywhere a plan is only read (ExcelIO.save_to_xlsx,
+    GoogleSheetsExporter.export, save_to_file). Returned records are copies;
+    changing them has no effect. Call release() (or use it as a context manager)
+    when done so the plan stops preserving originals for it.
+    """
+
+    def __init__(self, plan: SeatingPlan):
+        self.revision = plan.revision
+        self.next_guest_id = plan.next_guest_id
+        self.next_table_id = plan.next_table_id
+        self.total_head_count = plan.total_head_count
+        self.seated_head_count = plan.seated_head_count
+        self.total_capacity = plan.total_capacity
+        self._occupancy: Dict[int, int] = dict(plan._occupancy)
+        self.released = False
+        self._content_hash: Optional[ContentHash] = None
+
+        if isinstance(plan.guests, dict):
+            self.guests = _FrozenRecords(dict(plan.guests))
+        elif isinstance(plan.guests, PackedGuestStore):
+            # Its copy() is shallow like dict(): the columns never change and built
+            # Guests are shared until the plan is about to change one
+            self.guests = _FrozenRecords(plan.guests.copy())
+        else:
+            # Columnar rows are written in place, so take our own copy of the columns
+            self.guests = plan.guests.copy()
+        self.tables = _FrozenRecords(dict(plan.tables))
+
+    def _preserve_guest(self, guest_id: int):
+        if isinstance(self.guests, _FrozenRecords):
+            self.guests._preserve(guest_id)
+
+    def _preserve_table(self, table_id: int):
+        self.tables._preserve(table_id)
+
+    def release(self):
+        self.released = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    @property
+    def unseated_head_count(self) -> int:
+        return self.total_head_count - self.seated_head_count
+
+    def get_occupancy(self, table_id: int) -> int:
+        return self._occupancy.get(table_id, 0)
+
+    def fingerprint(self) -> int:
+        """Same value SeatingPlan.fingerprint() returned when the snapshot was taken."""
+        if self._content_hash is None:
+            tables = [self.tables[t_id] for t_id in self.tables]
+            self._content_hash = ContentHash(
+                iter_guest_records(self.guests),
+                ((t.id, t.name, t.capacity, t.x, t.y) for t in tables))
+        return self._content_hash.total
+
+    # Writes the same JSON as the plan it came from
+    save_to_file = SeatingPlan.save_to_file
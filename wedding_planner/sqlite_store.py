@@ -0,0 +1,356 @@
+"""
+SQLite storage for seating plans (stdlib sqlite3 only).
+
+A SqlitePlanStore keeps the guests and tables of one plan in a database file
+(WAL journal, indexes on table_id, category and folded name). A SeatingPlan
+opened from it behaves exactly like any other plan; the store listens to its
+change events and writes the touched records back in batched transactions, so
+a plan that holds only part of the database (one set of tables, or only the
+unseated guests) can be edited without disturbing the rest.
+"""
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .indexes import fold
+from .models import Guest, GuestIdList, PlanEvent, SeatingPlan, Table
+from .storage import iter_guest_records
+
+SQLITE_MAGIC = b"SQLite format 3\0"
+SCHEMA_VERSION = 1
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tables (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    capacity INTEGER NOT NULL,
+    x, y
+);
+CREATE TABLE IF NOT EXISTS guests (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    category TEXT NOT NULL,
+    table_id INTEGER,
+    size INTEGER NOT NULL,
+    seat INTEGER,
+    name_key TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS guests_by_table ON guests (table_id, seat);
+CREATE INDEX IF NOT EXISTS guests_by_category ON guests (category);
+CREATE INDEX IF NOT EXISTS guests_by_name ON guests (name_key);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);
+"""
+# SQLite caps the number of parameters per statement
+_MAX_PARAMS = 900
+
+
+def is_sqlite_file(filename: str) -> bool:
+    with open(filename, "rb") as f:
+        return f.read(len(SQLITE_MAGIC)) == SQLITE_MAGIC
+
+
+def _name_key(name) -> str:
+    return " ".join(fold(name).split())
+
+
+def _chunks(values: List, size: int = _MAX_PARAMS) -> Iterable[List]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class SqlitePlanStore:
+    """
+    A plan database. `open_plan` loads all or part of it into a SeatingPlan and
+    keeps the two in sync; `save` writes a whole plan. Changes are written
+    behind: touched records are collected and flushed in one transaction once
+    `batch_size` of them are pending, and on `flush()` / `close()`.
+    """
+
+    def __init__(self, path: str, batch_size: int = 500):
+        self.path = path
+        self.batch_size = batch_size
+        self.plan: Optional[SeatingPlan] = None
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            self._conn.close()
+            raise ValueError(f"{path} was written by a newer version (schema {version})")
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+            self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        self._pending_guests: Set[int] = set()
+        self._pending_tables: Set[int] = set()
+        # Records of the attached plan that have a row already: updated in place.
+        # Any other record is a plain INSERT, so an id held by a record the plan
+        # did not load fails instead of overwriting it.
+        self._stored_tables: Set[int] = set()
+        self._stored_guests: Set[int] = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # --- Whole plans ---
+
+    def save(self, plan: SeatingPlan):
+        """Replaces the database contents with `plan`, in one transaction."""
+        seats = {g_id: seat for table in plan.tables.values() for seat, g_id in enumerate(table.guest_ids)}
+        with self._conn:
+            self._conn.execute("DELETE FROM guests")
+            self._conn.execute("DELETE FROM tables")
+            self._conn.executemany(
+                "INSERT INTO tables VALUES (?, ?, ?, ?, ?)",
+                ((t.id, t.name, t.capacity, t.x, t.y) for t in plan.tables.values()))
+            self._conn.executemany(
+                "INSERT INTO guests VALUES (?, ?, ?, ?, ?, ?, ?)",
+                ((g_id, name, category, table_id, size, seats.get(g_id), _name_key(name))
+                 for g_id, name, category, table_id, size in iter_guest_records(plan.guests)))
+            self._write_counters(plan)
+        self._stored_tables = set(plan.tables)
+        self._stored_guests = set(plan.guests)
+
+    def load(self, plan: SeatingPlan, table_ids: Optional[Iterable[int]] = None, unseated: bool = True):
+        """
+        Replaces the plan's contents with records from the database.
+
+        table_ids limits the load to those tables and the guests seated at them
+        (None loads every table); unseated adds the guests without a table. The
+        loaded part is self-contained, so occupancy and capacity checks stay exact.
+        New ids continue from the database's counters, not the loaded records, and
+        the ids of the tables and guests left out are reserved (see merge_from).
+        """
+        if table_ids is not None:
+            table_ids = sorted(set(table_ids))
+        tables = self._select_tables(table_ids)
+        seat_lists = self._select_seats(table_ids)
+        with plan.batch(validate=False):
+            plan.clear()
+            for t_id, name, capacity, x, y in tables:
+                plan.insert_table(Table(id=t_id, name=name, capacity=capacity,
+                                        guest_ids=GuestIdList(seat_lists.get(t_id, ())), x=x, y=y))
+            for g_id, name, category, table_id, size in self._select_guests(table_ids, unseated):
+                plan.insert_guest(Guest(id=g_id, name=name, category=category, table_id=table_id, size=size))
+            plan.next_guest_id, plan.next_table_id = self._read_counters()
+        self._stored_tables = {t_id for t_id, *_ in tables}
+        self._stored_guests = set(plan.guests)
+        plan.reserved_table_ids = set() if table_ids is None else (
+            {t_id for t_id, in self._conn.execute("SELECT id FROM tables")} - self._stored_tables)
+        plan.reserved_guest_ids = set() if table_ids is None and unseated else (
+            {g_id for g_id, in self._conn.execute("SELECT id FROM guests")} - self._stored_guests)
+
+    def open_plan(self, table_ids: Optional[Iterable[int]] = None, unseated: bool = True,
+                  compact: bool = False) -> SeatingPlan:
+        """Loads a plan (see `load`) and attaches it, so its changes are written back."""
+        plan = SeatingPlan(compact=compact)
+        self.load(plan, table_ids, unseated)
+        self.attach(plan)
+        return plan
+
+    def _select_tables(self, table_ids: Optional[List[int]]) -> List[Tuple]:
+        query = "SELECT id, name, capacity, x, y FROM tables"
+        if table_ids is None:
+            return self._conn.execute(query + " ORDER BY id").fetchall()
+        rows = []
+        for chunk in _chunks(table_ids):
+            rows += self._conn.execute(f"{query} WHERE id IN ({','.join('?' * len(chunk))})", chunk).fetchall()
+        return sorted(rows)
+
+    def _select_seats(self, table_ids: Optional[List[int]]) -> Dict[int, List[int]]:
+        query = "SELECT table_id, id FROM guests WHERE table_id"
+        if table_ids is None:
+            rows = self._conn.execute(query + " IS NOT NULL ORDER BY table_id, seat").fetchall()
+        else:
+            rows = []
+            for chunk in _chunks(table_ids):
+                rows += self._conn.execute(f"{query} IN ({','.join('?' * len(chunk))}) ORDER BY table_id, seat",
+                                           chunk).fetchall()
+        seat_lists: Dict[int, List[int]] = {}
+        for t_id, g_id in rows:
+            seat_lists.setdefault(t_id, []).append(g_id)
+        return seat_lists
+
+    def _select_guests(self, table_ids: Optional[List[int]], unseated: bool) -> List[Tuple]:
+        query = "SELECT id, name, category, table_id, size FROM guests"
+        if table_ids is None:
+            where = "" if unseated else " WHERE table_id IS NOT NULL"
+            return self._conn.execute(query + where + " ORDER BY id").fetchall()
+        rows = []
+        for chunk in _chunks(table_ids):
+            rows += self._conn.execute(f"{query} WHERE table_id IN ({','.join('?' * len(chunk))})", chunk).fetchall()
+        if unseated:
+            rows += self._conn.execute(query + " WHERE table_id IS NULL").fetchall()
+        return sorted(rows)
+
+    def _read_counters(self) -> Tuple[int, int]:
+        meta = dict(self._conn.execute("SELECT key, value FROM meta"))
+        next_guest_id = meta.get("next_guest_id") or 1
+        next_table_id = meta.get("next_table_id") or 1
+        max_guest, = self._conn.execute("SELECT max(id) FROM guests").fetchone()
+        max_table, = self._conn.execute("SELECT max(id) FROM tables").fetchone()
+        return max(next_guest_id, (max_guest or 0) + 1), max(next_table_id, (max_table or 0) + 1)
+
+    def _write_counters(self, plan: SeatingPlan):
+        self._conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                               [("next_guest_id", plan.next_guest_id), ("next_table_id", plan.next_table_id)])
+
+    # --- Write-behind sync ---
+
+    def attach(self, plan: SeatingPlan):
+        self.detach()
+        self.plan = plan
+        plan.subscribe(self._on_event)
+
+    def detach(self):
+        if self.plan is not None:
+            self.flush()
+            self.plan.unsubscribe(self._on_event)
+            self.plan = None
+
+    def _on_event(self, event: PlanEvent):
+        # Only ids are recorded; the records' state is read at flush time, so many
+        # edits of one guest cost a single row write
+        self._pending_guests.update(event.guest_ids)
+        self._pending_tables.update(event.table_ids)
+        if len(self._pending_guests) + len(self._pending_tables) >= self.batch_size:
+            self.flush()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending_guests) + len(self._pending_tables)
+
+    def flush(self):
+        """Writes every pending change in one transaction."""
+        plan = self.plan
+        if plan is None or not (self._pending_guests or self._pending_tables):
+            return
+        guest_ids, table_ids = self._pending_guests, self._pending_tables
+        self._pending_guests, self._pending_tables = set(), set()
+
+        guests, tables = plan.guests, plan.tables
+        for g_id in guest_ids:
+            guest = guests.get(g_id)
+            if guest is not None and guest.table_id is not None:
+                table_ids.add(guest.table_id)
+        # Seat positions shift when a table changes, so its whole seat list is rewritten
+        seats = {}
+        for t_id in table_ids:
+            table = tables.get(t_id)
+            if table is not None:
+                for seat, g_id in enumerate(table.guest_ids):
+                    seats[g_id] = seat
+                    guest_ids.add(g_id)
+
+        updated_guests, new_guests, gone_guests = [], [], []
+        for g_id in guest_ids:
+            guest = guests.get(g_id)
+            if guest is None:
+                if g_id in self._stored_guests:
+                    gone_guests.append((g_id,))
+                continue
+            row = (guest.name, guest.category, guest.table_id, guest.size,
+                   seats.get(g_id) if guest.table_id is not None else None, _name_key(guest.name))
+            if g_id in self._stored_guests:
+                updated_guests.append(row + (g_id,))
+            else:
+                new_guests.append((g_id,) + row)
+        updated_tables, new_tables, gone_tables = [], [], []
+        for t_id in table_ids:
+            table = tables.get(t_id)
+            if table is None:
+                if t_id in self._stored_tables:
+                    gone_tables.append((t_id,))
+            elif t_id in self._stored_tables:
+                updated_tables.append((table.name, table.capacity, table.x, table.y, t_id))
+            else:
+                new_tables.append((t_id, table.name, table.capacity, table.x, table.y))
+
+        try:
+            with self._conn:
+                self._conn.executemany("DELETE FROM guests WHERE id = ?", gone_guests)
+                self._conn.executemany("DELETE FROM tables WHERE id = ?", gone_tables)
+                self._conn.executemany("UPDATE tables SET name = ?, capacity = ?, x = ?, y = ? WHERE id = ?",
+                                       updated_tables)
+                self._conn.executemany("INSERT INTO tables VALUES (?, ?, ?, ?, ?)", new_tables)
+                self._conn.executemany("UPDATE guests SET name = ?, category = ?, table_id = ?, size = ?, seat = ?, "
+                                       "name_key = ? WHERE id = ?", updated_guests)
+                self._conn.executemany("INSERT INTO guests VALUES (?, ?, ?, ?, ?, ?, ?)", new_guests)
+                next_guest_id, next_table_id = self._read_counters()
+                self._conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [
+                    ("next_guest_id", max(next_guest_id, plan.next_guest_id)),
+                    ("next_table_id", max(next_table_id, plan.next_table_id))])
+        except sqlite3.Error:
+            # Nothing was written; keep the changes pending
+            self._pending_guests |= guest_ids
+            self._pending_tables |= table_ids
+            raise
+        self._stored_tables.difference_update(t_id for t_id, in gone_tables)
+        self._stored_tables.update(row[0] for row in new_tables)
+        self._stored_guests.difference_update(g_id for g_id, in gone_guests)
+        self._stored_guests.update(row[0] for row in new_guests)
+
+    def close(self):
+        self.detach()
+        self._conn.close()
+
+    # --- Queries (run against the database, not the loaded plan) ---
+
+    def find_guests(self, category: Optional[str] = None, name_prefix: Optional[str] = None,
+                    table_id: Optional[int] = None, unseated: bool = False, limit: Optional[int] = None) -> List[Guest]:
+        """
+        Guests matching every given filter, by id. name_prefix matches the start of
+        the case-folded name. Each filter is answered from an index.
+        """
+        self.flush()
+        clauses, params = [], []
+        if category is not None:
+            clauses.append("category = ?")
+            params.append(category)
+        if name_prefix:
+            key = _name_key(name_prefix)
+            clauses.append("name_key >= ? AND name_key < ?")
+            params += [key, key + "\U0010ffff"]
+        if table_id is not None:
+            clauses.append("table_id = ?")
+            params.append(table_id)
+        if unseated:
+            clauses.append("table_id IS NULL")
+        query = "SELECT id, name, category, table_id, size FROM guests"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY id"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [Guest(id=g_id, name=name, category=cat, table_id=t_id, size=size)
+                for g_id, name, cat, t_id, size in self._conn.execute(query, params)]
+
+    def categories(self) -> List[str]:
+        self.flush()
+        return [category for category, in self._conn.execute("SELECT DISTINCT category FROM guests ORDER BY category")]
+
+    def head_counts(self) -> Tuple[int, int]:
+        """(total, seated) head count of the whole database."""
+        self.flush()
+        total, seated = self._conn.execute(
+            "SELECT total(size), total(CASE WHEN table_id IS NOT NULL THEN size END) FROM guests").fetchone()
+        return int(total), int(seated)
+
+
+def save_sqlite(plan: SeatingPlan, filename: str):
+    try:
+        with SqlitePlanStore(filename) as store:
+            store.save(plan)
+    except sqlite3.DatabaseError as e:
+        raise ValueError(f"Cannot write {filename}: {e}") from None
+
+
+def load_sqlite(plan: SeatingPlan, filename: str, repair: bool = True):
+    """Loads a whole database into the plan; returns the ValidationReport like load_from_file."""
+    try:
+        with SqlitePlanStore(filename) as store:
+            store.load(plan)
+    except sqlite3.DatabaseError as e:
+        raise ValueError(f"Cannot read {filename}: {e}") from None
+    return plan.validate(repair=repair)
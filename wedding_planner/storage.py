@@ -0,0 +1,437 @@
+from array import array
+from bisect import bisect_left
+from collections.abc import MutableMapping, Sequence
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from .models import Guest
+
+# Sentinel stored in the table_id column for unseated guests
+_NO_TABLE = -(2 ** 63)
+# Sentinel stored in the id column for deleted rows
+_DELETED = -(2 ** 63)
+
+
+class GuestView:
+    """
+    Lightweight stand-in for a Guest stored in a ColumnarGuestStore.
+    Reads and writes go straight to the store's columns, so existing code that
+    does `guest.table_id = ...` or `guest.size` keeps working.
+    """
+    __slots__ = ("_store", "_id")
+
+    def __init__(self, store: "ColumnarGuestStore", guest_id: int):
+        self._store = store
+        self._id = guest_id
+
+    def _row(self) -> int:
+        return self._store._row_of(self._id)
+
+    @property
+    def id(self) -> int:
+        return self._id
+
+    @id.setter
+    def id(self, value: int):
+        # Ids are the store key; only a no-op write (e.g. a rollback) is allowed
+        if value != self._id:
+            raise AttributeError("Guest id cannot be changed in a columnar store")
+
+    @property
+    def name(self) -> str:
+        return self._store._names[self._row()]
+
+    @name.setter
+    def name(self, value: str):
+        self._store._names[self._row()] = value
+
+    @property
+    def category(self) -> str:
+        store = self._store
+        return store._categories[store._cats[self._row()]]
+
+    @category.setter
+    def category(self, value: str):
+        store = self._store
+        store._cats[self._row()] = store._intern(value)
+
+    @property
+    def table_id(self) -> Optional[int]:
+        value = self._store._tables[self._row()]
+        return None if value == _NO_TABLE else value
+
+    @table_id.setter
+    def table_id(self, value: Optional[int]):
+        self._store._tables[self._row()] = _NO_TABLE if value is None else value
+
+    @property
+    def size(self) -> int:
+        return self._store._sizes[self._row()]
+
+    @size.setter
+    def size(self, value: int):
+        self._store._sizes[self._row()] = value
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "category": self.category,
+            "table_id": self.table_id,
+            "size": self.size
+        }
+
+    def copy(self) -> Guest:
+        return Guest(**self.to_dict())
+
+    def __eq__(self, other):
+        if hasattr(other, "to_dict"):
+            return self.to_dict() == other.to_dict()
+        return NotImplemented
+
+    def __repr__(self):
+        return f"GuestView(id={self.id!r}, name={self.name!r}, category={self.category!r}, table_id={self.table_id!r}, size={self.size!r})"
+
+
+class ColumnarGuestStore(MutableMapping):
+    """
+    Compact guest storage: one array per numeric field and an interned category
+    table instead of one dataclass instance per guest. Behaves like the
+    `Dict[int, Guest]` SeatingPlan normally uses (including insertion order);
+    items come back as GuestView.
+    """
+
+    def __init__(self):
+        self._ids = array("q")
+        self._sizes = array("q")
+        self._tables = array("q")
+        self._cats = array("I")
+        self._names: List[str] = []
+        self._count = 0
+
+        # guest id -> row. Ids are small dense counters in practice, so a flat
+        # array indexed by id is far smaller than a dict; outliers go to a dict.
+        self._row_by_id = array("q")
+        self._sparse_rows: Dict[int, int] = {}
+
+        self._categories: List[str] = []
+        self._category_index: Dict[str, int] = {}
+
+    def _intern(self, category: str) -> int:
+        index = self._category_index.get(category)
+        if index is None:
+            index = len(self._categories)
+            self._categories.append(category)
+            self._category_index[category] = index
+        return index
+
+    def _lookup(self, guest_id) -> int:
+        if type(guest_id) is int and 0 <= guest_id < len(self._row_by_id):
+            row = self._row_by_id[guest_id]
+            if row >= 0:
+                return row
+        return self._sparse_rows.get(guest_id, -1)
+
+    def _set_row(self, guest_id: int, row: int):
+        """Maps guest_id to row; row -1 removes the mapping."""
+        dense = self._row_by_id
+        if type(guest_id) is int and 0 <= guest_id < len(dense):
+            dense[guest_id] = row
+        elif row >= 0 and type(guest_id) is int and 0 <= guest_id < max(1024, 4 * len(self._ids)):
+            dense.extend([-1] * (guest_id + 1 - len(dense)))
+            dense[guest_id] = row
+        elif row >= 0:
+            self._sparse_rows[guest_id] = row
+            return
+        self._sparse_rows.pop(guest_id, None)
+
+    def _row_of(self, guest_id) -> int:
+        row = self._lookup(guest_id)
+        if row < 0:
+            raise KeyError(guest_id)
+        return row
+
+    # --- Mapping protocol ---
+
+    def __getitem__(self, guest_id: int) -> GuestView:
+        self._row_of(guest_id)
+        return GuestView(self, guest_id)
+
+    def __setitem__(self, guest_id: int, guest):
+        table_id = _NO_TABLE if guest.table_id is None else guest.table_id
+        category = self._intern(guest.category)
+        row = self._lookup(guest_id)
+        if row < 0:
+            row = len(self._ids)
+            self._ids.append(guest_id)
+            self._names.append(guest.name)
+            self._cats.append(category)
+            self._tables.append(table_id)
+            self._sizes.append(guest.size)
+            self._set_row(guest_id, row)
+            self._count += 1
+        else:
+            self._names[row] = guest.name
+            self._cats[row] = category
+            self._tables[row] = table_id
+            self._sizes[row] = guest.size
+
+    def __delitem__(self, guest_id: int):
+        row = self._row_of(guest_id)
+        self._set_row(guest_id, -1)
+        self._ids[row] = _DELETED  # tombstone, skipped by iteration
+        self._names[row] = None
+        self._count -= 1
+        if len(self._ids) > 1024 and self._count < len(self._ids) // 2:
+            self._compact()
+
+    def _compact(self):
+        # Drop tombstoned rows; views look rows up by id so they stay valid
+        live = [row for row, guest_id in enumerate(self._ids) if guest_id != _DELETED]
+        self._ids = array("q", (self._ids[r] for r in live))
+        self._sizes = array("q", (self._sizes[r] for r in live))
+        self._tables = array("q", (self._tables[r] for r in live))
+        self._cats = array("I", (self._cats[r] for r in live))
+        self._names = [self._names[r] for r in live]
+        self._row_by_id = array("q")
+        self._sparse_rows = {}
+        for row, guest_id in enumerate(self._ids):
+            self._set_row(guest_id, row)
+
+    def __iter__(self) -> Iterator[int]:
+        for guest_id in self._ids:
+            if guest_id != _DELETED:
+                yield guest_id
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, guest_id) -> bool:
+        return self._lookup(guest_id) >= 0
+
+    def clear(self):
+        self.__init__()
+
+    def copy(self) -> "ColumnarGuestStore":
+        """Independent copy; the columns are flat arrays, so this is a few memcpys."""
+        other = ColumnarGuestStore.__new__(ColumnarGuestStore)
+        other._ids = self._ids[:]
+        other._sizes = self._sizes[:]
+        other._tables = self._tables[:]
+        other._cats = self._cats[:]
+        other._names = self._names[:]
+        other._count = self._count
+        other._row_by_id = self._row_by_id[:]
+        other._sparse_rows = self._sparse_rows.copy()
+        other._categories = self._categories[:]
+        other._category_index = self._category_index.copy()
+        return other
+
+    def iter_records(self) -> Iterator[Tuple[int, str, str, Optional[int], int]]:
+        """Yields (id, name, category, table_id, size) tuples straight from the columns."""
+        categories = self._categories
+        for guest_id, name, cat, table_id, size in zip(self._ids, self._names, self._cats, self._tables, self._sizes):
+            if guest_id != _DELETED:
+                yield guest_id, name, categories[cat], None if table_id == _NO_TABLE else table_id, size
+
+
+class PackedStrings:
+    """
+    A packed string table (see binary_io): NUL-terminated UTF-8 text and the byte
+    offset of each string. Strings are decoded one at a time until something
+    needs all of them, which then takes a single decode.
+    """
+
+    def __init__(self, text: bytes, offsets: array, nul_free: bool):
+        self._text = text
+        self._offsets = offsets
+        self._nul_free = nul_free
+        self._decoded: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        if self._decoded is not None:
+            return self._decoded[index]
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return str(self._text[self._offsets[index]:self._offsets[index + 1] - 1], "utf-8")
+
+    def decode_all(self) -> List[str]:
+        if self._decoded is None:
+            if self._nul_free:
+                decoded = str(self._text, "utf-8").split("\0")
+                decoded.pop()  # after the last terminator
+            else:
+                decoded = [self[i] for i in range(len(self))]
+            if len(decoded) != len(self):
+                raise ValueError("Corrupt packed string table")
+            self._decoded = decoded
+        return self._decoded
+
+
+class StringColumn(Sequence):
+    """A column of references into a PackedStrings table, resolved on access."""
+
+    def __init__(self, refs: array, strings: PackedStrings):
+        self._refs = refs
+        self._strings = strings
+
+    def __len__(self) -> int:
+        return len(self._refs)
+
+    def __getitem__(self, row: int) -> str:
+        return self._strings[self._refs[row]]
+
+    def __iter__(self) -> Iterator[str]:
+        return map(self._strings.decode_all().__getitem__, self._refs)
+
+
+def is_ascending(values) -> bool:
+    """True if values are strictly increasing (checked at C speed)."""
+    return len(values) < 2 or (all(map(int.__lt__, values, values[1:])))
+
+
+class PackedGuestStore(MutableMapping):
+    """
+    Guests opened from a packed .seatplan file (see binary_io). The file's records
+    stay in flat columns and a Guest is only built the first time it is looked up;
+    from then on that object is the guest, exactly as in a plain dict. Guests added
+    later are kept as objects. Iterates in file order, then in insertion order.
+    """
+
+    def __init__(self, ids: Optional[array] = None, names: Optional[Sequence[str]] = None,
+                 categories: Optional[Sequence[str]] = None, table_ids: Optional[List[Optional[int]]] = None,
+                 sizes: Optional[array] = None, ascending: Optional[bool] = None):
+        """
+        Columns are parallel sequences, one item per file row (names may be a
+        StringColumn). ascending says whether ids are strictly increasing; None checks.
+        """
+        # The columns are never written to; changes go to the Guest objects
+        self._ids = ids if ids is not None else array("q")
+        self._names = names if names is not None else []
+        self._categories = categories if categories is not None else []
+        self._tables = table_ids if table_ids is not None else []
+        self._sizes = sizes if sizes is not None else array("q")
+        # Ids are saved in creation order, so they are normally ascending and rows can
+        # be found by bisection; otherwise fall back to an id -> row dict
+        self._rows: Optional[Dict[int, int]] = None
+        if not (is_ascending(self._ids) if ascending is None else ascending):
+            self._rows = dict(zip(self._ids, range(len(self._ids))))
+            if len(self._rows) != len(self._ids):
+                raise ValueError("Duplicate guest ids in packed columns")
+
+        self._objects: Dict[int, Guest] = {}  # built or added guests
+        self._deleted: Set[int] = set()       # file rows that were removed
+        self._added = 0                       # objects without a file row
+
+    def _row(self, guest_id) -> int:
+        """File row of guest_id, or -1."""
+        if self._rows is not None:
+            return self._rows.get(guest_id, -1)
+        if type(guest_id) is not int:
+            return -1
+        ids = self._ids
+        row = bisect_left(ids, guest_id)
+        return row if row < len(ids) and ids[row] == guest_id else -1
+
+    def _build(self, row: int) -> Guest:
+        return Guest(id=self._ids[row], name=self._names[row], category=self._categories[row],
+                     table_id=self._tables[row], size=self._sizes[row])
+
+    @property
+    def built_count(self) -> int:
+        """Number of guests that exist as objects (looked up or added since opening)."""
+        return len(self._objects)
+
+    # --- Mapping protocol ---
+
+    def __getitem__(self, guest_id: int) -> Guest:
+        guest = self._objects.get(guest_id)
+        if guest is None:
+            row = self._row(guest_id)
+            if row < 0 or guest_id in self._deleted:
+                raise KeyError(guest_id)
+            guest = self._objects[guest_id] = self._build(row)
+        return guest
+
+    def __setitem__(self, guest_id: int, guest: Guest):
+        if self._row(guest_id) >= 0:
+            self._deleted.discard(guest_id)
+        elif guest_id not in self._objects:
+            self._added += 1
+        self._objects[guest_id] = guest
+
+    def __delitem__(self, guest_id: int):
+        if guest_id not in self:
+            raise KeyError(guest_id)
+        self._objects.pop(guest_id, None)
+        if self._row(guest_id) >= 0:
+            self._deleted.add(guest_id)
+        else:
+            self._added -= 1
+
+    def __iter__(self) -> Iterator[int]:
+        deleted = self._deleted
+        if deleted:
+            yield from [guest_id for guest_id in self._ids if guest_id not in deleted]
+        else:
+            yield from self._ids
+        if self._added:
+            yield from [guest_id for guest_id in self._objects if self._row(guest_id) < 0]
+
+    def __len__(self) -> int:
+        return len(self._ids) - len(self._deleted) + self._added
+
+    def __contains__(self, guest_id) -> bool:
+        if guest_id in self._objects:
+            return True
+        return self._row(guest_id) >= 0 and guest_id not in self._deleted
+
+    def clear(self):
+        self.__init__()
+
+    def copy(self) -> "PackedGuestStore":
+        """
+        Shallow copy, like dict.copy(): the columns and any built Guest objects are
+        shared, so it costs O(guests looked up so far), not O(guests).
+        """
+        other = PackedGuestStore.__new__(PackedGuestStore)
+        other.__dict__.update(self.__dict__)
+        other._objects = self._objects.copy()
+        other._deleted = self._deleted.copy()
+        return other
+
+    def columns(self) -> Tuple[Sequence, ...]:
+        """(ids, names, categories, table_ids, sizes) as parallel sequences. Do not modify."""
+        if not self._objects and not self._deleted:
+            return self._ids, self._names, self._categories, self._tables, self._sizes
+        return tuple(zip(*self._iter_changed_records())) or ((),) * 5
+
+    def iter_records(self) -> Iterator[Tuple[int, str, str, Optional[int], int]]:
+        """Yields (id, name, category, table_id, size), from the columns for guests never looked up."""
+        if not self._objects and not self._deleted:
+            return zip(self._ids, self._names, self._categories, self._tables, self._sizes)
+        return self._iter_changed_records()
+
+    def _iter_changed_records(self) -> Iterator[Tuple[int, str, str, Optional[int], int]]:
+        objects = self._objects
+        deleted = self._deleted
+        for guest_id, name, category, table_id, size in zip(self._ids, self._names, self._categories,
+                                                             self._tables, self._sizes):
+            guest = objects.get(guest_id)
+            if guest is not None:
+                yield guest.id, guest.name, guest.category, guest.table_id, guest.size
+            elif guest_id not in deleted:
+                yield guest_id, name, category, table_id, size
+        if self._added:
+            for guest in [g for g_id, g in objects.items() if self._row(g_id) < 0]:
+                yield guest.id, guest.name, guest.category, guest.table_id, guest.size
+
+
+def iter_guest_records(guests) -> Iterator[Tuple[int, str, str, Optional[int], int]]:
+    """(id, name, category, table_id, size) for every guest, using the columnar fast path when available."""
+    iter_records = getattr(guests, "iter_records", None)
+    if iter_records is not None:
+        return iter_records()
+    return ((g.id, g.name, g.category, g.table_id, g.size) for g in guests.values())
@@ -0,0 +1,193 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .storage import iter_guest_records
+
+
+@dataclass
+class Issue:
+    """
+    One integrity problem. code is one of:
+      id_mismatch, bad_size, bad_capacity, bad_position, missing_guest, stale_seat,
+      missing_table, unlisted_seat, over_capacity, id_counter
+    """
+    code: str
+    message: str
+    guest_id: Optional[int] = None
+    table_id: Optional[int] = None
+
+
+@dataclass
+class ValidationReport:
+    issues: List[Issue] = field(default_factory=list)
+    repaired: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return not self.issues
+
+    def counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for issue in self.issues:
+            counts[issue.code] = counts.get(issue.code, 0) + 1
+        return counts
+
+    def summary(self) -> str:
+        if self.ok:
+            return "No problems found."
+        parts = ", ".join(f"{count} {code.replace('_', ' ')}" for code, count in self.counts().items())
+        return f"{len(self.issues)} problem(s){' repaired' if self.repaired else ''}: {parts}"
+
+
+def _as_int(value) -> Optional[int]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return int(round(number)) if number == number and abs(number) != float("inf") else None
+
+
+def validate_plan(plan, repair: bool = False) -> ValidationReport:
+    """
+    Checks a SeatingPlan in one pass over guests and one over tables:
+    guest <-> table back-references, group sizes, table capacities and positions,
+    capacity against seated head count, and the id counters.
+
+    With repair set, problems are fixed in a single batch: a guest's table_id wins
+    over table seat lists, seats pointing at missing tables are dropped, overfull
+    tables unseat their last-seated groups, numbers are coerced to ints.
+    """
+    report = ValidationReport()
+    issues = report.issues
+    tables = plan.tables
+    guests = plan.guests
+
+    # --- Guests ---
+    seat_of: Dict[int, int] = {}
+    occupancy: Dict[int, int] = {}
+    max_guest_id = 0
+    bad_sizes = {}
+    guest_fixes = []  # (code, guest_id, table_id)
+    if isinstance(guests, dict):
+        records = ((key, g.id, g.table_id, g.size) for key, g in guests.items())
+    else:
+        # Columnar stores are keyed by their id column, so ids cannot disagree
+        records = ((g_id, g_id, table_id, size) for g_id, _, _, table_id, size in iter_guest_records(guests))
+    for guest_id, stored_id, table_id, size in records:
+        if stored_id != guest_id:
+            issues.append(Issue("id_mismatch", f"Guest stored under id {guest_id} says it is {stored_id}", guest_id))
+        if type(guest_id) is int and guest_id > max_guest_id:
+            max_guest_id = guest_id
+
+        fixed_size = size
+        if type(size) is not int or size < 1:
+            fixed_size = max(_as_int(size) or 1, 1)
+            bad_sizes[guest_id] = fixed_size
+            issues.append(Issue("bad_size", f"Guest {guest_id} has group size {size!r}", guest_id))
+
+        if table_id is None:
+            continue
+        table = tables.get(table_id)
+        if table is None:
+            guest_fixes.append(("missing_table", guest_id, table_id))
+            issues.append(Issue("missing_table", f"Guest {guest_id} is seated at missing table {table_id}", guest_id, table_id))
+            continue
+        seat_of[guest_id] = table_id
+        occupancy[table_id] = occupancy.get(table_id, 0) + fixed_size
+        if guest_id not in table.guest_ids:
+            guest_fixes.append(("unlisted_seat", guest_id, table_id))
+            issues.append(Issue("unlisted_seat", f"Guest {guest_id} is not listed at their table {table_id}", guest_id, table_id))
+
+    # --- Tables ---
+    max_table_id = 0
+    table_fixes = []  # (code, table_id, value)
+    for key, table in tables.items():
+        if table.id != key:
+            issues.append(Issue("id_mismatch", f"Table stored under id {key} says it is {table.id}", table_id=key))
+        if type(key) is int and key > max_table_id:
+            max_table_id = key
+
+        capacity = table.capacity
+        if type(capacity) is not int or capacity < 0:
+            capacity = max(_as_int(capacity) or 0, 0)
+            table_fixes.append(("bad_capacity", key, capacity))
+            issues.append(Issue("bad_capacity", f"Table {key} has capacity {table.capacity!r}", table_id=key))
+
+        if type(table.x) is not int or type(table.y) is not int:
+            x, y = _as_int(table.x), _as_int(table.y)
+            table_fixes.append(("bad_position", key, (100 if x is None else x, 100 if y is None else y)))
+            issues.append(Issue("bad_position", f"Table {key} is at ({table.x!r}, {table.y!r})", table_id=key))
+
+        for guest_id in table.guest_ids:
+            if guest_id not in guests:
+                table_fixes.append(("missing_guest", key, guest_id))
+                issues.append(Issue("missing_guest", f"Table {key} lists missing guest {guest_id}", guest_id, key))
+            elif seat_of.get(guest_id) != key:
+                table_fixes.append(("stale_seat", key, guest_id))
+                issues.append(Issue("stale_seat", f"Table {key} lists guest {guest_id} who is seated elsewhere", guest_id, key))
+
+        if occupancy.get(key, 0) > capacity:
+            table_fixes.append(("over_capacity", key, capacity))
+            issues.append(Issue("over_capacity", f"Table {key} seats {occupancy[key]} of {capacity}", table_id=key))
+
+    if plan.next_guest_id <= max_guest_id:
+        issues.append(Issue("id_counter", f"next_guest_id {plan.next_guest_id} is not above guest id {max_guest_id}"))
+    if plan.next_table_id <= max_table_id:
+        issues.append(Issue("id_counter", f"next_table_id {plan.next_table_id} is not above table id {max_table_id}"))
+
+    if repair and issues:
+        with plan.batch(validate=False):
+            _repair(plan, issues, bad_sizes, guest_fixes, table_fixes, max_guest_id, max_table_id)
+        report.repaired = True
+    return report
+
+
+def _repair(plan, issues, bad_sizes, guest_fixes, table_fixes, max_guest_id, max_table_id):
+    for issue in issues:
+        if issue.code == "id_mismatch":
+            if issue.guest_id is not None:
+                plan._touch_guest(issue.guest_id)
+                plan.guests[issue.guest_id].id = issue.guest_id
+            else:
+                plan._touch_table(issue.table_id)
+                plan.tables[issue.table_id].id = issue.table_id
+
+    for guest_id, size in bad_sizes.items():
+        plan._touch_guest(guest_id)
+        plan.guests[guest_id].size = size
+
+    for code, table_id, value in table_fixes:
+        table = plan.tables[table_id]
+        plan._touch_table(table_id)
+        if code == "bad_capacity":
+            table.capacity = value
+        elif code == "bad_position":
+            table.x, table.y = value
+        elif code in ("missing_guest", "stale_seat"):
+            table.guest_ids.discard(value)
+
+    for code, guest_id, table_id in guest_fixes:
+        if code == "missing_table":
+            plan.unseat_guest(guest_id)
+        elif code == "unlisted_seat":
+            plan._touch_table(table_id)
+            plan.tables[table_id].guest_ids.append(guest_id)
+
+    # Capacity last, once every seat list is consistent: unseat the latest arrivals
+    for code, table_id, capacity in table_fixes:
+        if code != "over_capacity":
+            continue
+        table = plan.tables[table_id]
+        seated = sum(plan.guests[g_id].size for g_id in table.guest_ids)
+        for guest_id in reversed(list(table.guest_ids)):
+            if seated <= capacity:
+                break
+            seated -= plan.guests[guest_id].size
+            plan.unseat_guest(guest_id)
+
+    plan.next_guest_id = max(plan.next_guest_id, max_guest_id + 1)
+    plan.next_table_id = max(plan.next_table_id, max_table_id + 1)
@@ -0,0 +1,146 @@
+"""
+Parsed-sheet cache for group imports: the rows of a workbook's active sheet,
+kept after the first full read so header detection, previews and repeated
+imports of an unchanged file do not go through openpyxl again.
+
+Entries are found by content hash (a workbook saved again without changes still
+hits); a (path, size, mtime) map saves hashing files that were not touched.
+Memory use is bounded by a cell count, least recently used first out; with a
+directory the rows are also pickled there and survive restarts.
+"""
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+_FORMAT = 1
+
+
+def default_cache_directory() -> str:
+    return os.path.join(os.path.expanduser("~"), ".seater_planner", "cache")
+
+
+def content_hash(filename: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class WorkbookCache:
+    """
+    rows(filename) returns the cached rows or None; load(filename, read) parses
+    with read(filename, progress) on a miss and keeps the result. A reader that
+    finds a sheet too big to keep (see fits) can return any other iterable of rows
+    instead of a list; it is passed through as is. Safe to use from job threads and
+    the Tk thread at once.
+    """
+
+    def __init__(self, max_cells: int = 4_000_000, directory: Optional[str] = None, max_files: int = 32):
+        self.max_cells = max_cells
+        self.directory = directory
+        self.max_files = max_files
+        self._entries: "OrderedDict[str, List[tuple]]" = OrderedDict()  # content hash -> rows
+        self._cells = 0
+        self._hashes: Dict[Tuple[str, int, int], str] = {}  # (path, size, mtime) -> content hash
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._hashes.clear()
+            self._cells = 0
+
+    def _digest(self, filename: str) -> str:
+        st = os.stat(filename)
+        stamp = (os.path.abspath(filename), st.st_size, st.st_mtime_ns)
+        digest = self._hashes.get(stamp)
+        if digest is None:
+            digest = content_hash(filename)
+            # A file written within the last second could change again without its
+            # size or mtime changing, so it is hashed every time until then
+            if time.time_ns() - st.st_mtime_ns > 1_000_000_000:
+                self._hashes[stamp] = digest
+        return digest
+
+    def fits(self, cells: int) -> bool:
+        return cells <= self.max_cells
+
+    def rows(self, filename: str) -> Optional[List[tuple]]:
+        return self._get(self._digest(filename))
+
+    def load(self, filename: str, read: Callable[..., Iterable[tuple]], progress=None) -> Iterable[tuple]:
+        # Hashed before reading: if the file changes meanwhile, the next load reads it again
+        digest = self._digest(filename)
+        rows = self._get(digest)
+        if rows is None:
+            rows = read(filename, progress)
+            if isinstance(rows, list):
+                self._keep(digest, rows)
+                self._write_file(digest, rows)
+        return rows
+
+    def _get(self, digest: str) -> Optional[List[tuple]]:
+        with self._lock:
+            rows = self._entries.get(digest)
+            if rows is not None:
+                self._entries.move_to_end(digest)
+        if rows is None:
+            rows = self._read_file(digest)
+            if rows is not None:
+                self._keep(digest, rows)
+        if rows is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return rows
+
+    def _keep(self, digest: str, rows: List[tuple]):
+        cells = sum(map(len, rows))
+        if not self.fits(cells):
+            return
+        with self._lock:
+            if digest in self._entries:
+                return
+            self._entries[digest] = rows
+            self._cells += cells
+            while self._cells > self.max_cells:
+                _, dropped = self._entries.popitem(last=False)
+                self._cells -= sum(map(len, dropped))
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, f"{digest}.rows")
+
+    def _read_file(self, digest: str) -> Optional[List[tuple]]:
+        if not self.directory:
+            return None
+        # A missing, damaged or old-format file is just a miss
+        try:
+            with open(self._path(digest), "rb") as f:
+                version, rows = pickle.load(f)
+            os.utime(self._path(digest))
+        except Exception:
+            return None
+        return rows if version == _FORMAT else None
+
+    def _write_file(self, digest: str, rows: List[tuple]):
+        if not self.directory:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            part = self._path(digest) + ".part"
+            with open(part, "wb") as f:
+                pickle.dump((_FORMAT, rows), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(part, self._path(digest))
+            # Least recently used files go first
+            files = sorted((entry for entry in os.scandir(self.directory) if entry.name.endswith(".rows")),
+                           key=lambda entry: entry.stat().st_mtime)
+            for entry in files[:max(0, len(files) - self.max_files)]:
+                os.remove(entry.path)
+        except OSError:
+            pass